@@ -0,0 +1,309 @@
+from __future__ import annotations
+
+import contextlib
+import io
+import statistics
+import subprocess
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.contrib.auth import authenticate
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from core.stats import percentile
+from core.synthetic import SYNTHETIC_PASSWORD, SYNTHETIC_PREFIX
+from custom_auth.models import FrontPermission, User, Vendedor
+from custom_auth.permissions import has_group_action
+from mail.models.mailbox import Message, MessageThread
+from sales.models import PaymentMethod, Product, SaleHistory
+
+# Benchmarks dos caminhos quentes sobre a massa do core.synthetic.
+# Cada benchmark é uma função sem argumentos montada por um "setup" que
+# recebe o BenchContext; o runner cronometra, conta queries e devolve um
+# dicionário pronto para JSON (manage.py run_benchmarks --json/--compare).
+
+
+class NoSyntheticData(Exception):
+    pass
+
+
+@dataclass
+class BenchContext:
+    superuser: Optional[User]
+    seller: User
+    staff: User
+    thread_id: int
+    product_id: int
+    payment_method_id: int
+    front_codename: str
+    loja_id: int
+    clients: dict[str, Client] = field(default_factory=dict)
+
+    def client_for(self, user: User) -> Client:
+        client = self.clients.get(user.username)
+        if client is None:
+            client = self.clients[user.username] = Client()
+            client.force_login(user)
+        return client
+
+    @classmethod
+    def load(cls, *, create_superuser: bool = False) -> "BenchContext":
+        """
+        Contexto a partir da massa do seed_synthetic. Só leitura: sem
+        superusuário no banco, `superuser` fica None, a menos que
+        `create_superuser` (--create-user) peça um sintético ("<prefixo>-root",
+        removido pelo seed_synthetic --purge).
+        """
+        like = f"{SYNTHETIC_PREFIX}-"
+        # o vendedor mais "ocupado" deixa inbox/thread representativos
+        vendedor = (
+            Vendedor.objects.filter(user__username__startswith=like)
+            .annotate(n=Count("user__message_threads"))
+            .select_related("user")
+            .order_by("-n")
+            .first()
+        )
+        staff = User.objects.filter(username__startswith=like, is_staff=True).first()
+        thread = product = None
+        if vendedor is not None:
+            thread = (
+                MessageThread.objects.filter(participants=vendedor.user)
+                .annotate(n=Count("messages"))
+                .order_by("-n")
+                .first()
+            )
+            product = Product.objects.filter(
+                store_id=vendedor.nome_loja_id, stock__isnull=False
+            ).first()
+        if None in (vendedor, staff, thread, product):
+            raise NoSyntheticData(
+                "Sem dados sintéticos suficientes: rode `manage.py seed_synthetic`."
+            )
+        superuser = User.objects.filter(is_superuser=True).first()
+        if superuser is None and create_superuser:
+            superuser = User.objects.create_superuser(
+                f"{like}root", f"{like}root@example.com", SYNTHETIC_PASSWORD
+            )
+        return cls(
+            superuser=superuser,
+            seller=vendedor.user,
+            staff=staff,
+            thread_id=thread.id,
+            product_id=product.id,
+            payment_method_id=PaymentMethod.objects.values_list("id", flat=True)[0],
+            front_codename=FrontPermission.objects.filter(
+                codename__startswith=like, roles__isnull=False
+            ).values_list("codename", flat=True)[0],
+            loja_id=vendedor.nome_loja_id,
+        )
+
+
+BENCHMARKS: dict[str, Callable[[BenchContext], Callable[[], object]]] = {}
+# logam como ctx.superuser
+NEEDS_SUPERUSER: set[str] = set()
+
+
+def benchmark(name: str):
+    def decorator(setup):
+        BENCHMARKS[name] = setup
+        return setup
+
+    return decorator
+
+
+def _get(client: Client, url: str):
+    response = client.get(url)
+    assert response.status_code == 200, f"{url} -> {response.status_code}"
+    return response
+
+
+# ---------- vendas ----------
+
+
+@benchmark("sales.checkout")
+def _checkout(ctx: BenchContext):
+    """Registro de venda + signals (baixa de estoque, notificações); desfeito."""
+
+    def run():
+        with transaction.atomic():
+            SaleHistory.objects.create(
+                sales_by=ctx.seller,
+                product_id=ctx.product_id,
+                payment_method_id=ctx.payment_method_id,
+                quantity=1,
+            )
+            transaction.set_rollback(True)
+
+    return run
+
+
+# ---------- mail ----------
+
+
+@benchmark("mail.inbox")
+def _inbox(ctx: BenchContext):
+    client = ctx.client_for(ctx.seller)
+    url = reverse("mailbox:inbox")
+    return lambda: _get(client, url)
+
+
+@benchmark("mail.thread_detail")
+def _thread_detail(ctx: BenchContext):
+    client = ctx.client_for(ctx.seller)
+    url = reverse("mailbox:thread_detail", args=[ctx.thread_id])
+    return lambda: _get(client, url)
+
+
+# ---------- admin ----------
+
+
+def _changelist(app_label: str, model_name: str):
+    def setup(ctx: BenchContext):
+        client = ctx.client_for(ctx.superuser)
+        url = reverse(f"admin:{app_label}_{model_name}_changelist")
+        return lambda: _get(client, url)
+
+    return setup
+
+
+for _app, _model in (
+    ("sales", "salehistory"),
+    ("mail", "message"),
+    ("subscription", "subscription"),
+    ("custom_auth", "vendedor"),
+    ("custom_auth", "user"),
+):
+    benchmark(f"admin.{_app}.{_model}")(_changelist(_app, _model))
+    NEEDS_SUPERUSER.add(f"admin.{_app}.{_model}")
+
+
+@benchmark("admin.index.staff")
+def _admin_index_staff(ctx: BenchContext):
+    """Index do admin para staff: uma checagem de permissão por modelo."""
+    client = ctx.client_for(ctx.staff)
+    url = reverse("admin:index")
+    return lambda: _get(client, url)
+
+
+# ---------- permissões ----------
+
+
+@benchmark("perms.has_front_perm")
+def _has_front_perm(ctx: BenchContext):
+    """Instância nova a cada chamada (como numa requisição), cache compartilhado."""
+
+    def run():
+        user = User.objects.get(pk=ctx.seller.pk)
+        return user.has_front_perm(ctx.front_codename, loja=ctx.loja_id)
+
+    return run
+
+
+@benchmark("perms.has_group_action")
+def _has_group_action(ctx: BenchContext):
+    return lambda: has_group_action(ctx.staff, "sales.product", "view")
+
+
+# ---------- login ----------
+
+
+@benchmark("auth.login")
+def _login(ctx: BenchContext):
+    """authenticate() com senha certa (inclui o custo do hasher)."""
+    username = ctx.seller.username
+    return lambda: authenticate(username=username, password=SYNTHETIC_PASSWORD)
+
+
+@benchmark("auth.login_unknown_user")
+def _login_unknown(ctx: BenchContext):
+    return lambda: authenticate(username="nao-existe", password="x")
+
+
+# ---------- runner ----------
+
+
+def measure(run: Callable[[], object], iterations: int, warmup: int = 1) -> dict:
+    for _ in range(warmup):
+        run()
+    timings, queries = [], []
+    for _ in range(iterations):
+        with CaptureQueriesContext(connection) as captured:
+            start = time.perf_counter()
+            run()
+            timings.append((time.perf_counter() - start) * 1000)
+        queries.append(len(captured))
+    return {
+        "iterations": iterations,
+        "min_ms": round(min(timings), 3),
+        "median_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(percentile(timings, 95), 3),
+        "mean_ms": round(statistics.fmean(timings), 3),
+        "queries": round(statistics.fmean(queries), 1),
+    }
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(
+    names: list[str] | None = None,
+    *,
+    iterations: int = 20,
+    create_superuser: bool = False,
+    on_result=None,
+) -> dict:
+    ctx = BenchContext.load(create_superuser=create_superuser)
+    selected = [
+        name
+        for name in BENCHMARKS
+        if not names or any(name.startswith(n) for n in names)
+    ]
+    if ctx.superuser is None and NEEDS_SUPERUSER.intersection(selected):
+        raise NoSyntheticData(
+            "Os changelists do admin precisam de um superusuário: crie um "
+            "(createsuperuser) ou rode com --create-user."
+        )
+    results = {}
+    # o test Client fala com o host "testserver"; os profilers de
+    # requisição (core.sql_profiler, perm_audit) ficam fora da medição
+    with override_settings(
+        ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"],
+        SQL_PROFILER_ENABLED=False,
+        PERM_AUDIT_ENABLED=False,
+    ):
+        for name in selected:
+            setup = BENCHMARKS[name]
+            # signals e hooks do admin ainda usam print()
+            with contextlib.redirect_stdout(io.StringIO()):
+                results[name] = measure(setup(ctx), iterations)
+            if on_result:
+                on_result(name, results[name])
+    return {
+        "revision": git_revision(),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "database": connection.vendor,
+        "password_hasher": settings.PASSWORD_HASHERS[0],
+        "dataset": {
+            "users": User.objects.count(),
+            "sales": SaleHistory.objects.count(),
+            "threads": MessageThread.objects.count(),
+            "messages": Message.objects.count(),
+        },
+        "results": results,
+    }
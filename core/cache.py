@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import hashlib
+import time
+from typing import Any, Callable, Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+# Camada de cache comum para os apps. O backend (locmem, arquivo, banco ou
+# Redis), o KEY_PREFIX e o VERSION globais vêm de settings.CACHES; aqui
+# ficam as chaves por namespace e a leitura com proteção contra estouro:
+#   key("mail_unread", 42)     -> "mail_unread:42"
+#   delete("mail_unread", 42)  -> apaga a chave depois do commit
+#   read_through(...)          -> em geral um só processo recalcula um valor
+#                                 ausente ou vencido; os outros esperam
+#                                 (ausente) ou usam o valor antigo (vencido).
+
+_LOCK_SUFFIX = ":lock"
+_MAX_RAW_KEY = 120
+_MISSING = object()
+
+
+def _setting(name: str, default):
+    return getattr(settings, name, default)
+
+
+def key(namespace: str, *parts) -> str:
+    """Chave `namespace:partes`; partes longas viram um hash."""
+    raw = ":".join(str(part) for part in parts)
+    if len(raw) > _MAX_RAW_KEY or any(c.isspace() for c in raw):
+        raw = hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest()
+    return f"{namespace}:{raw}"
+
+
+def delete_many(namespace: str, parts_list: Iterable[Iterable]) -> None:
+    """Apaga chaves do namespace (depois do commit), uma por tupla de partes."""
+    keys = [key(namespace, *parts) for parts in parts_list]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def delete(namespace: str, *parts) -> None:
+    delete_many(namespace, [parts])
+
+
+def read_through(
+    namespace: str,
+    parts: Iterable,
+    compute: Callable[[], Any],
+    *,
+    timeout: Optional[int] = None,
+    stale_grace: Optional[int] = None,
+    lock_timeout: Optional[int] = None,
+    wait: Optional[float] = None,
+) -> Any:
+    """
+    Valor em cache da chave (namespace, *parts), calculado por `compute()` quando
+    ausente ou vencido — com proteção contra estouro (stampede):
+      - vencido (passou `timeout`, ainda dentro de `stale_grace`): quem pegar
+        a trava recalcula; os demais devolvem o valor antigo na hora;
+      - ausente: quem pegar a trava calcula; os demais esperam até `wait`
+        segundos pelo resultado e só então calculam por conta própria.
+    A trava é um cache.add com `lock_timeout` e só exclui de fato onde o add
+    é atômico entre processos (redis, db). No file o add é has_key + set e
+    dois workers podem pegar a trava juntos; no locmem ela vale só dentro do
+    processo. Nesses casos a proteção é de melhor esforço: no pior caso o
+    valor é calculado mais de uma vez, nunca fica errado.
+    """
+    timeout = _setting("CACHE_DEFAULT_TIMEOUT", 300) if timeout is None else timeout
+    if stale_grace is None:
+        stale_grace = _setting("CACHE_STALE_GRACE", 30)
+    if lock_timeout is None:
+        lock_timeout = _setting("CACHE_LOCK_TIMEOUT", 10)
+    wait = _setting("CACHE_LOCK_WAIT", 2.0) if wait is None else wait
+
+    cache_key = key(namespace, *parts)
+    lock_key = cache_key + _LOCK_SUFFIX
+    entry = cache.get(cache_key, _MISSING)
+    if entry is not _MISSING:
+        value, fresh_until = entry
+        if time.time() < fresh_until or not cache.add(lock_key, 1, lock_timeout):
+            return value
+    elif not cache.add(lock_key, 1, lock_timeout):
+        deadline = time.monotonic() + wait
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            entry = cache.get(cache_key, _MISSING)
+            if entry is not _MISSING:
+                return entry[0]
+        return compute()
+
+    try:
+        value = compute()
+        cache.set(cache_key, (value, time.time() + timeout), timeout + stale_grace)
+        return value
+    finally:
+        cache.delete(lock_key)
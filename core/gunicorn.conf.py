@@ -0,0 +1,49 @@
+# Configuração do gunicorn para o perfil de produção (SERVE_PROFILE=prod, ver
+# entrypoint.sh). Tudo pode ser ajustado por variável de ambiente:
+#   SERVE_INTERFACE   wsgi (padrão, workers gthread) ou asgi (workers uvicorn;
+#                     melhor para muitas conexões SSE em /messages/stream/)
+#   WEB_CONCURRENCY   processos (padrão: 2 × núcleos + 1 no wsgi, núcleos no asgi)
+#   WEB_THREADS       threads por processo no wsgi (padrão: 4)
+#   WEB_BIND, WEB_TIMEOUT, WEB_MAX_REQUESTS
+import multiprocessing
+import os
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+
+_interface = os.environ.get("SERVE_INTERFACE", "wsgi")
+_cores = multiprocessing.cpu_count()
+
+bind = os.environ.get("WEB_BIND", "0.0.0.0:8000")
+
+if _interface == "asgi":
+    wsgi_app = "core.asgi:application"
+    worker_class = "uvicorn.workers.UvicornWorker"
+    workers = int(os.environ.get("WEB_CONCURRENCY", _cores))
+else:
+    wsgi_app = "core.wsgi:application"
+    # threads cobrem a espera por banco/cache sem multiplicar a memória
+    worker_class = "gthread"
+    workers = int(os.environ.get("WEB_CONCURRENCY", 2 * _cores + 1))
+    threads = int(os.environ.get("WEB_THREADS", 4))
+
+# carrega o Django uma vez no master; os workers herdam a memória (fork)
+preload_app = True
+
+timeout = int(os.environ.get("WEB_TIMEOUT", 30))
+graceful_timeout = 30
+keepalive = 5
+
+# recicla workers aos poucos (vazamentos lentos), sem reiniciar todos juntos
+max_requests = int(os.environ.get("WEB_MAX_REQUESTS", 2000))
+max_requests_jitter = max_requests // 10
+
+accesslog = "-"
+errorlog = "-"
+
+
+def post_fork(server, worker):
+    # o preload pode ter aberto conexões (migrations/ready()); um socket de
+    # banco não pode ser dividido entre processos
+    from django.db import connections
+
+    connections.close_all()
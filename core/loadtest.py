@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import http.client
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.sessions.backends.db import SessionStore
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from core.benchmarks import BenchContext
+from core.stats import percentile
+
+# Teste de carga HTTP contra um servidor de verdade (runserver ou o perfil
+# prod com gunicorn). Ao contrário de core.benchmarks, que chama as views no
+# mesmo processo, aqui o que se mede é o servidor inteiro: processos,
+# threads, keep-alive e middlewares. Credenciais e ids vêm da massa do
+# seed_synthetic, lida direto do banco que o servidor usa.
+
+
+@dataclass
+class Target:
+    name: str
+    path: str
+    headers: dict = field(default_factory=dict)
+
+
+@dataclass
+class LoadResult:
+    requests: int = 0
+    errors: int = 0
+    latencies: list[float] = field(default_factory=list)
+    statuses: dict[int, int] = field(default_factory=dict)
+
+    def summary(self, seconds: float) -> dict:
+        ordered = self.latencies or [0.0]
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "rps": round(self.requests / seconds, 1),
+            "p50_ms": round(percentile(ordered, 50), 2),
+            "p95_ms": round(percentile(ordered, 95), 2),
+            "statuses": dict(sorted(self.statuses.items())),
+        }
+
+
+def _session_cookie(user) -> str:
+    """Sessão de login gravada direto no banco (como o Client.force_login)."""
+    session = SessionStore()
+    session[SESSION_KEY] = str(user.pk)
+    session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+    session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+    session.save()
+    return f"{settings.SESSION_COOKIE_NAME}={session.session_key}"
+
+
+def build_targets(ctx: BenchContext) -> list[Target]:
+    token = RefreshToken.for_user(ctx.seller).access_token
+    bearer = {"Authorization": f"Bearer {token}"}
+    cookie = {"Cookie": _session_cookie(ctx.seller)}
+    return [
+        Target("api.users.me", "/api/users/me/", bearer),
+        Target("api.vendedores", f"/api/vendedores/?loja={ctx.loja_id}"),
+        Target(
+            "api.vendedores.search", f"/api/vendedores/?loja={ctx.loja_id}&search=1"
+        ),
+        Target("mail.inbox", "/messages/", cookie),
+        Target("mail.thread_detail", f"/messages/thread/{ctx.thread_id}/", cookie),
+        Target("login.page", "/accounts/login/"),
+    ]
+
+
+def _worker(base_url: str, target: Target, deadline: float, result, lock) -> None:
+    parts = urlsplit(base_url)
+    conn_class = (
+        http.client.HTTPSConnection
+        if parts.scheme == "https"
+        else http.client.HTTPConnection
+    )
+    conn = conn_class(parts.netloc, timeout=30)
+    local = LoadResult()
+    headers = {"Host": parts.netloc, **target.headers}
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            conn.request("GET", target.path, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            # conexão caiu (ex.: worker reciclado): reabre e conta como erro
+            conn.close()
+            conn = conn_class(parts.netloc, timeout=30)
+            status = 0
+        local.latencies.append((time.perf_counter() - start) * 1000)
+        local.requests += 1
+        local.statuses[status] = local.statuses.get(status, 0) + 1
+        if not 200 <= status < 400:
+            local.errors += 1
+    conn.close()
+    with lock:
+        result.requests += local.requests
+        result.errors += local.errors
+        result.latencies.extend(local.latencies)
+        for status, count in local.statuses.items():
+            result.statuses[status] = result.statuses.get(status, 0) + count
+
+
+def run_load_test(
+    base_url: str,
+    *,
+    names: Optional[list[str]] = None,
+    duration: float = 10.0,
+    concurrency: int = 16,
+    on_result: Optional[Callable[[str, dict], None]] = None,
+) -> dict:
+    """
+    Para cada alvo, `concurrency` clientes com keep-alive fazem GETs em
+    sequência por `duration` segundos; devolve req/s e latências por alvo.
+    """
+    ctx = BenchContext.load()
+    results = {}
+    for target in build_targets(ctx):
+        if names and not any(target.name.startswith(n) for n in names):
+            continue
+        result, lock = LoadResult(), threading.Lock()
+        deadline = time.perf_counter() + duration
+        threads = [
+            threading.Thread(
+                target=_worker, args=(base_url, target, deadline, result, lock)
+            )
+            for _ in range(concurrency)
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        results[target.name] = result.summary(time.perf_counter() - started)
+        if on_result:
+            on_result(target.name, results[target.name])
+    return {
+        "base_url": base_url,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "duration_s": duration,
+        "concurrency": concurrency,
+        "results": results,
+    }
@@ -0,0 +1,96 @@
+import json
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.core.signals import request_finished, request_started
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from core.stats import percentile
+
+# (rótulo, CONN_MAX_AGE, CONN_HEALTH_CHECKS)
+MODES = (
+    ("sem reuso (CONN_MAX_AGE=0)", 0, False),
+    ("persistente (CONN_MAX_AGE=60)", 60, False),
+    ("persistente + health check", 60, True),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede a latência por requisição com e sem reuso de conexão ao banco "
+        "(ciclo request_started -> query -> request_finished, como numa view). "
+        "Rode contra o Postgres do docker-compose (DB_HOST=localhost)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+        parser.add_argument("--json", dest="json_path", help="Salva o resultado.")
+
+    def _measure(self, connection, requests):
+        timings, opened, last = [], 0, None
+        with connection.cursor() as cursor:  # aquecimento
+            cursor.execute("SELECT 1")
+        for _ in range(requests):
+            start = time.perf_counter()
+            # mesmos sinais do handler: fecham conexões vencidas/quebradas
+            request_started.send(sender=self.__class__)
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            if connection.connection is not last:
+                opened += 1
+                last = connection.connection
+            request_finished.send(sender=self.__class__)
+            timings.append((time.perf_counter() - start) * 1000)
+        return {
+            "requests": requests,
+            "connections_opened": opened,
+            "median_ms": round(statistics.median(timings), 3),
+            "p95_ms": round(percentile(timings, 95), 3),
+            "mean_ms": round(statistics.fmean(timings), 3),
+        }
+
+    def handle(self, *args, **options):
+        connection = connections[options["database"]]
+        settings_dict = connection.settings_dict
+        keys = ("CONN_MAX_AGE", "CONN_HEALTH_CHECKS")
+        original = {key: settings_dict[key] for key in keys}
+        host = settings_dict.get("HOST") or settings_dict.get("NAME")
+        self.stdout.write(f"Banco: {connection.vendor} em {host}\n")
+        if connection.vendor == "sqlite":
+            self.stdout.write(
+                self.style.WARNING(
+                    "SQLite abre arquivo local: a diferença só aparece num "
+                    "servidor (DB_ENGINE=postgres).\n"
+                )
+            )
+        self.stdout.write(
+            f"{'modo':<34}{'mediana ms':>12}{'p95 ms':>10}{'média ms':>10}"
+            f"{'conexões':>10}"
+        )
+
+        results = {}
+        try:
+            for label, max_age, health_checks in MODES:
+                connection.close()
+                settings_dict["CONN_MAX_AGE"] = max_age
+                settings_dict["CONN_HEALTH_CHECKS"] = health_checks
+                result = self._measure(connection, options["requests"])
+                results[label] = result
+                self.stdout.write(
+                    f"{label:<34}{result['median_ms']:>12.3f}{result['p95_ms']:>10.3f}"
+                    f"{result['mean_ms']:>10.3f}{result['connections_opened']:>10}"
+                )
+        finally:
+            connection.close()
+            settings_dict.update(original)
+
+        if options["json_path"]:
+            with open(options["json_path"], "w", encoding="utf-8") as fh:
+                json.dump(
+                    {"database": connection.vendor, "results": results}, fh, indent=2
+                )
+            self.stdout.write(
+                self.style.SUCCESS(f"Resultado salvo em {options['json_path']}")
+            )
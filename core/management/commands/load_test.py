@@ -0,0 +1,60 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmarks import NoSyntheticData
+from core.loadtest import run_load_test
+
+
+class Command(BaseCommand):
+    help = (
+        "Teste de carga HTTP contra um servidor rodando (ex.: SERVE_PROFILE=prod "
+        "./entrypoint.sh): req/s e latência dos endpoints principais, usando "
+        "os dados do seed_synthetic."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "names", nargs="*", help="Prefixos dos alvos (ex.: api mail.inbox)."
+        )
+        parser.add_argument("--url", default="http://127.0.0.1:8000")
+        parser.add_argument(
+            "--duration", type=float, default=10, help="Segundos por alvo."
+        )
+        parser.add_argument(
+            "--concurrency", type=int, default=16, help="Clientes simultâneos."
+        )
+        parser.add_argument("--json", dest="json_path", help="Salva o resultado.")
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"{'alvo':<26}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}"
+            f"{'reqs':>9}{'erros':>8}"
+        )
+
+        def report(name, result):
+            line = (
+                f"{name:<26}{result['rps']:>10.1f}{result['p50_ms']:>10.2f}"
+                f"{result['p95_ms']:>10.2f}{result['requests']:>9}{result['errors']:>8}"
+            )
+            if result["errors"]:
+                line = self.style.WARNING(f"{line}  {result['statuses']}")
+            self.stdout.write(line)
+
+        try:
+            output = run_load_test(
+                options["url"],
+                names=options["names"] or None,
+                duration=options["duration"],
+                concurrency=options["concurrency"],
+                on_result=report,
+            )
+        except NoSyntheticData as exc:
+            raise CommandError(str(exc)) from exc
+
+        if options["json_path"]:
+            with open(options["json_path"], "w", encoding="utf-8") as fh:
+                json.dump(output, fh, indent=2)
+            self.stdout.write(
+                self.style.SUCCESS(f"Resultado salvo em {options['json_path']}")
+            )
@@ -0,0 +1,78 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmarks import BENCHMARKS, NoSyntheticData, run_benchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        "Cronometra os caminhos quentes (venda, inbox, thread, changelists do "
+        "admin, permissões, login) sobre os dados do seed_synthetic."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "names",
+            nargs="*",
+            help="Prefixos dos benchmarks a rodar (ex.: mail admin.sales).",
+        )
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument("--json", dest="json_path", help="Salva o resultado.")
+        parser.add_argument(
+            "--compare",
+            help="JSON de uma execução anterior; mostra a variação da mediana.",
+        )
+        parser.add_argument("--list", action="store_true", help="Lista e sai.")
+        parser.add_argument(
+            "--create-user",
+            action="store_true",
+            help="Cria um superusuário sintético se o banco não tiver nenhum "
+            "(necessário para os changelists do admin).",
+        )
+
+    def handle(self, *args, **options):
+        if options["list"]:
+            for name in BENCHMARKS:
+                self.stdout.write(name)
+            return
+
+        baseline = {}
+        if options["compare"]:
+            with open(options["compare"], encoding="utf-8") as fh:
+                baseline = json.load(fh).get("results", {})
+
+        self.stdout.write(
+            f"{'benchmark':<34}{'mediana ms':>12}{'p95 ms':>10}{'queries':>9}"
+            f"{'vs base':>10}"
+        )
+
+        def report(name, result):
+            delta = ""
+            base = baseline.get(name)
+            if base and base.get("median_ms"):
+                change = result["median_ms"] / base["median_ms"] - 1
+                delta = f"{change:+.0%}"
+                if change > 0.2:
+                    delta = self.style.WARNING(f"{delta:>10}")
+            self.stdout.write(
+                f"{name:<34}{result['median_ms']:>12.2f}{result['p95_ms']:>10.2f}"
+                f"{result['queries']:>9}{delta:>10}"
+            )
+
+        try:
+            output = run_benchmarks(
+                options["names"] or None,
+                iterations=options["iterations"],
+                create_superuser=options["create_user"],
+                on_result=report,
+            )
+        except NoSyntheticData as exc:
+            raise CommandError(str(exc)) from exc
+
+        if options["json_path"]:
+            with open(options["json_path"], "w", encoding="utf-8") as fh:
+                json.dump(output, fh, indent=2)
+            self.stdout.write(
+                self.style.SUCCESS(f"Resultado salvo em {options['json_path']}")
+            )
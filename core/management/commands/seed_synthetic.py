@@ -0,0 +1,58 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.synthetic import SyntheticScale, generate, purge
+
+
+class Command(BaseCommand):
+    help = (
+        "Gera dados sintéticos realistas (lojas, vendedores, produtos, preços, "
+        "vendas, comissões, conversas, assinaturas) para os benchmarks."
+    )
+
+    def add_arguments(self, parser):
+        defaults = SyntheticScale()
+        for name in SyntheticScale.__dataclass_fields__:
+            parser.add_argument(
+                f"--{name.replace('_', '-')}",
+                type=int,
+                default=getattr(defaults, name),
+            )
+        parser.add_argument(
+            "--scale",
+            type=float,
+            default=1.0,
+            help="Multiplica o número de lojas; o volume por loja se mantém.",
+        )
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--tag", help="Sufixo dos nomes (padrão: timestamp).")
+        parser.add_argument(
+            "--purge",
+            action="store_true",
+            help="Remove os dados sintéticos existentes antes de gerar.",
+        )
+        parser.add_argument(
+            "--purge-only", action="store_true", help="Só remove, não gera."
+        )
+
+    def handle(self, *args, **options):
+        if options["purge"] or options["purge_only"]:
+            deleted = purge()
+            self.stdout.write(f"Removidos: {deleted}")
+            if options["purge_only"]:
+                return
+
+        scale = SyntheticScale(
+            **{name: options[name] for name in SyntheticScale.__dataclass_fields__}
+        )
+        scale.stores = max(1, round(scale.stores * options["scale"]))
+        start = time.perf_counter()
+        counts = generate(scale, seed=options["seed"], tag=options["tag"])
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Dados sintéticos gerados em {elapsed:.1f}s: "
+                + ", ".join(f"{k}={v}" for k, v in counts.items())
+            )
+        )
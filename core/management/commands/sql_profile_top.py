@@ -0,0 +1,92 @@
+from contextlib import closing
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.sql_profiler import connect_store, store
+
+_VIEW_ORDER = {
+    "time": "total_ms DESC",
+    "queries": "queries DESC",
+    "avg": "queries * 1.0 / requests DESC",
+    "n+1": "n_plus_one_requests DESC, total_ms DESC",
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Lista as views e queries (fingerprints) que mais custam em SQL, "
+        "a partir do que o SQLProfilerMiddleware gravou."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=15)
+        parser.add_argument(
+            "--by",
+            choices=sorted(_VIEW_ORDER),
+            default="time",
+            help="Ordenação das views (padrão: tempo total).",
+        )
+        parser.add_argument("--view", help="Mostra só as queries desta view.")
+        parser.add_argument(
+            "--reset", action="store_true", help="Apaga as estatísticas gravadas."
+        )
+
+    def handle(self, *args, **options):
+        path = Path(settings.SQL_PROFILER_DB)
+        # grava o que este processo ainda tem em memória (ex.: runserver no shell)
+        store.flush()
+        if not path.exists():
+            raise CommandError(
+                f"Sem dados em {path}: ligue SQL_PROFILER_ENABLED e faça requisições."
+            )
+
+        with closing(connect_store(path)) as conn:
+            if options["reset"]:
+                with conn:
+                    conn.execute("DELETE FROM view_stats")
+                    conn.execute("DELETE FROM query_stats")
+                self.stdout.write(self.style.SUCCESS("Estatísticas apagadas."))
+                return
+
+            limit = options["limit"]
+            if not options["view"]:
+                self._print_views(conn, _VIEW_ORDER[options["by"]], limit)
+            self._print_queries(conn, options["view"], limit)
+
+    def _print_views(self, conn, order, limit):
+        rows = conn.execute(
+            "SELECT view, requests, queries, total_ms, max_queries, "
+            f"n_plus_one_requests FROM view_stats ORDER BY {order} LIMIT ?",
+            (limit,),
+        ).fetchall()
+        self.stdout.write(self.style.MIGRATE_HEADING("Views"))
+        self.stdout.write(
+            f"{'view':<48}{'reqs':>8}{'q/req':>8}{'máx q':>8}"
+            f"{'ms/req':>10}{'ms total':>12}{'reqs N+1':>10}"
+        )
+        for view, requests, queries, total_ms, max_queries, n_plus_one in rows:
+            self.stdout.write(
+                f"{view[:47]:<48}{requests:>8}{queries / requests:>8.1f}"
+                f"{max_queries:>8}{total_ms / requests:>10.2f}{total_ms:>12.1f}"
+                f"{n_plus_one:>10}"
+            )
+        self.stdout.write("")
+
+    def _print_queries(self, conn, view, limit):
+        where, params = ("WHERE view = ?", [view]) if view else ("", [])
+        rows = conn.execute(
+            "SELECT view, fingerprint, sql, calls, total_ms, max_calls_per_request, "
+            f"n_plus_one_requests FROM query_stats {where} "
+            "ORDER BY total_ms DESC LIMIT ?",
+            (*params, limit),
+        ).fetchall()
+        self.stdout.write(self.style.MIGRATE_HEADING("Queries (por tempo total)"))
+        for view_name, key, sql, calls, total_ms, max_calls, n_plus_one in rows:
+            flag = self.style.WARNING(" [N+1]") if n_plus_one else ""
+            self.stdout.write(
+                f"{key}  {total_ms:>10.1f}ms  {calls:>7}x  "
+                f"máx {max_calls}/req  {view_name}{flag}"
+            )
+            self.stdout.write(f"    {sql[:300]}")
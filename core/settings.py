@@ -10,9 +10,13 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 
+import os
+import tempfile
 from datetime import timedelta
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -20,13 +24,32 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/3.2/howto/deployment/checklist/
 
+# Perfil de execução: "dev" (runserver, DEBUG ligado) ou "prod" (gunicorn com
+# core/gunicorn.conf.py, DEBUG desligado). Ver entrypoint.sh.
+SERVE_PROFILE = os.environ.get("SERVE_PROFILE", "dev")
+_PROD = SERVE_PROFILE == "prod"
+# wsgi (runserver / gunicorn gthread) ou asgi (gunicorn + uvicorn)
+SERVE_INTERFACE = os.environ.get("SERVE_INTERFACE", "wsgi")
+
 # SECURITY WARNING: keep the secret key used in production secret!
-SECRET_KEY = "django-insecure-b*j@*p7(4l50=co@4^#rm+p0-ou29wld6&5krj_%ot&0+xo3x%"
+# (a chave fixa abaixo só vale fora do perfil prod)
+SECRET_KEY = os.environ.get("DJANGO_SECRET_KEY", "")
+if not SECRET_KEY:
+    if _PROD:
+        raise ImproperlyConfigured("SERVE_PROFILE=prod exige DJANGO_SECRET_KEY.")
+    SECRET_KEY = "django-insecure-b*j@*p7(4l50=co@4^#rm+p0-ou29wld6&5krj_%ot&0+xo3x%"
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
-
-ALLOWED_HOSTS = []
+# (com DEBUG cada query fica guardada em memória em connection.queries)
+DEBUG = os.environ.get("DJANGO_DEBUG", "0" if _PROD else "1") == "1"
+
+ALLOWED_HOSTS = [
+    host.strip()
+    for host in os.environ.get(
+        "DJANGO_ALLOWED_HOSTS", "localhost,127.0.0.1" if _PROD else ""
+    ).split(",")
+    if host.strip()
+]
 
 
 # Application definition
@@ -44,6 +67,7 @@ INSTALLED_APPS = [
     "subscription",
     "sales",
     "mail",
+    "core",
 ]
 
 AUTH_USER_MODEL = "custom_auth.User"
@@ -55,6 +79,8 @@ LOGOUT_REDIRECT_URL = "login"
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "core.sql_profiler.SQLProfilerMiddleware",
+    "custom_auth.perm_audit.PermissionAuditMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -62,6 +88,10 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
+if _PROD:
+    # sem DEBUG o Django não serve /static/ e o compose não tem proxy reverso:
+    # o WhiteNoise serve o STATIC_ROOT (collectstatic no entrypoint.sh)
+    MIDDLEWARE.insert(1, "whitenoise.middleware.WhiteNoiseMiddleware")
 
 ROOT_URLCONF = "core.urls"
 
@@ -86,14 +116,19 @@ INSTALLED_APPS += [
 ]
 
 AUTHENTICATION_BACKENDS = [
-    "custom_auth.backends.EmailOrUsernameModelBackend",  # e-mail OU username
-    "django.contrib.auth.backends.ModelBackend",
+    # e-mail OU username numa única query; herda de ModelBackend, então
+    # repetir o ModelBackend só faria uma segunda busca em logins inválidos
+    "custom_auth.backends.EmailOrUsernameModelBackend",
 ]
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        # JWTAuthentication com o usuário em cache (sem SELECT por requisição)
+        "custom_auth.authentication.CachedJWTAuthentication",
     ],
+    # assinatura ativa (subscription.permissions.HasActiveSubscription) só
+    # nas views de negócio (BaseFrontPerm): conta, senha e login não dependem
+    # de pagamento
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
@@ -133,27 +168,95 @@ SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=30),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
     "AUTH_HEADER_TYPES": ("Bearer",),
+    "TOKEN_OBTAIN_SERIALIZER": "custom_auth.tokens.FrontPermsTokenObtainPairSerializer",
 }
 
+# TTL (s) do usuário em cache no CachedJWTAuthentication
+JWT_USER_CACHE_TIMEOUT = 60
+
+# Embute as permissões de front (por loja) no access token; o HasFrontPerm
+# passa a autorizar só pelo token enquanto a versão das permissões não mudar.
+FRONT_PERMS_IN_TOKEN = os.environ.get("FRONT_PERMS_IN_TOKEN", "0") == "1"
+
+# Auditoria das checagens de permissão (custom_auth.perm_audit): header
+# X-Perm-Audit por requisição e relatório agregado por view no admin.
+# Desligada por padrão; PERM_AUDIT=1 liga.
+PERM_AUDIT_ENABLED = os.environ.get("PERM_AUDIT", "0") == "1"
+PERM_AUDIT_HEADER = DEBUG
+PERM_AUDIT_FLUSH_INTERVAL = 10
+
+# Profiling de SQL por requisição (core.sql_profiler): header X-SQL-Profile,
+# alerta de N+1 no log e estatísticas por view em SQLite local
+# (`manage.py sql_profile_top`). Desligado por padrão; SQL_PROFILE=1 liga.
+SQL_PROFILER_ENABLED = os.environ.get("SQL_PROFILE", "0") == "1"
+SQL_PROFILER_HEADER = DEBUG
+SQL_PROFILER_DB = BASE_DIR / "sql_profile.sqlite3"
+SQL_PROFILER_N_PLUS_ONE_THRESHOLD = 5
+SQL_PROFILER_FLUSH_INTERVAL = 10
+
+# Novas mensagens na inbox: stream SSE (/messages/stream/) só sob ASGI, onde
+# cada conexão aberta é uma corrotina; sob WSGI ela prenderia uma thread do
+# worker, então a inbox consulta /messages/poll/ a cada MAIL_POLL_INTERVAL s.
+MAIL_STREAM_ENABLED = SERVE_INTERFACE == "asgi"
+MAIL_POLL_INTERVAL = 30
+
+# TTL máximo (s) do cache de assinatura ativa (subscription.entitlement); a
+# entrada também expira na virada do dia de `valido_ate`.
+SUBSCRIPTION_ENTITLEMENT_TIMEOUT = 3600
+
+# TTL (s) das páginas de GET /api/vendedores/ (subscription.lookup); salvar ou
+# apagar um Vendedor já invalida a loja na hora.
+VENDEDORES_LOOKUP_TIMEOUT = 300
+
+# Máximo de vendedores por POST /api/vendedores/import/ (importação roda na
+# requisição); arquivos maiores: manage.py import_vendedores.
+VENDEDOR_IMPORT_MAX_ROWS = 2000
+
+# TTL (s) do bitmask de permissões em cache (custom_auth.perm_cache); a
+# invalidação é por versão/geração, o TTL só limita entradas esquecidas.
+FRONT_PERM_CACHE_TIMEOUT = 300
+
 WSGI_APPLICATION = "core.wsgi.application"
 
 
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
-PSTG = False
+# DB_ENGINE=postgres|sqlite (padrão: postgres quando DB_HOST está definido,
+# como no docker-compose). Conexões persistentes: cada thread de worker
+# reaproveita a sua por DB_CONN_MAX_AGE segundos (0 = uma por requisição,
+# "none" = sem limite), com checagem de saúde antes de reusar.
+# DB_POOL=pgbouncer: o HOST/PORT apontam para um PgBouncer (pool por
+# transação, serviço "pgbouncer" do docker-compose); o Django 4.2 não tem
+# pool próprio, então o pool fica fora do processo.
+PSTG = (
+    os.environ.get("DB_ENGINE", "postgres" if os.environ.get("DB_HOST") else "sqlite")
+    == "postgres"
+)
+DB_POOL = os.environ.get("DB_POOL", "")
+
+_conn_max_age = os.environ.get("DB_CONN_MAX_AGE") or ("60" if _PROD else "0")
 
 
 if PSTG:
     DATABASES = {
         "default": {
             "ENGINE": "django.db.backends.postgresql_psycopg2",
-            "NAME": "postgres",
-            "USER": "postgres",
-            "PASSWORD": "postgres",
-            "HOST": "db",
-            "PORT": "5432",
+            "NAME": os.environ.get("DB_NAME", "postgres"),
+            "USER": os.environ.get("DB_USER", "postgres"),
+            "PASSWORD": os.environ.get("DB_PASSWORD", "postgres"),
+            "HOST": os.environ.get("DB_HOST", "db"),
+            "PORT": os.environ.get("DB_PORT", "5432"),
+            "CONN_MAX_AGE": None if _conn_max_age == "none" else int(_conn_max_age),
+            "CONN_HEALTH_CHECKS": os.environ.get("DB_CONN_HEALTH_CHECKS", "1") == "1",
+            "OPTIONS": {
+                "connect_timeout": int(os.environ.get("DB_CONNECT_TIMEOUT", 5)),
+            },
         }
     }
+    if DB_POOL == "pgbouncer":
+        # cursores com nome (iterator()) não sobrevivem à troca de conexão
+        # do pool por transação
+        DATABASES["default"]["DISABLE_SERVER_SIDE_CURSORS"] = True
 else:
     DATABASES = {
         "default": {
@@ -162,6 +265,60 @@ else:
         }
     }
 
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# CACHE_BACKEND=locmem|file|db|redis (padrão: redis quando REDIS_URL está
+# definido; senão db no perfil prod e locmem em dev). As invalidações
+# (permissões, assinatura, vendedores, mensagens) só valem para todos os
+# workers do gunicorn se o cache for compartilhado: locmem é por processo.
+# As travas de core.cache.read_through precisam de um cache.add atômico
+# entre processos, o que só redis e db têm (no file é has_key + set).
+# db usa a tabela CACHE_LOCATION (criada por `manage.py createcachetable`).
+# Chaves: CACHE_KEY_PREFIX isola projetos no mesmo Redis e CACHE_VERSION
+# descarta o cache inteiro num deploy; namespaces ficam em core.cache.
+CACHE_BACKEND = os.environ.get("CACHE_BACKEND") or (
+    "redis" if os.environ.get("REDIS_URL") else "db" if _PROD else "locmem"
+)
+_CACHE_BACKENDS = {
+    "locmem": ("django.core.cache.backends.locmem.LocMemCache", "default"),
+    # os workers do gunicorn compartilham o diretório (mesma máquina)
+    "file": (
+        "django.core.cache.backends.filebased.FileBasedCache",
+        os.path.join(tempfile.gettempdir(), "pdv_cache"),
+    ),
+    "db": ("django.core.cache.backends.db.DatabaseCache", "django_cache"),
+    "redis": (
+        "django.core.cache.backends.redis.RedisCache",
+        os.environ.get("REDIS_URL", "redis://localhost:6379/0"),
+    ),
+}
+_cache_class, _cache_location = _CACHE_BACKENDS[CACHE_BACKEND]
+
+CACHES = {
+    "default": {
+        "BACKEND": _cache_class,
+        "LOCATION": os.environ.get("CACHE_LOCATION") or _cache_location,
+        "KEY_PREFIX": os.environ.get("CACHE_KEY_PREFIX", "pdv"),
+        "VERSION": int(os.environ.get("CACHE_VERSION", 1)),
+        "TIMEOUT": 300,
+        # o padrão (300 entradas) despeja chaves de versão/geração cedo demais
+        "OPTIONS": {} if CACHE_BACKEND == "redis" else {"MAX_ENTRIES": 20000},
+    }
+}
+
+# core.cache.read_through: TTL padrão (s), tempo extra em que um valor
+# vencido ainda é servido enquanto um único processo recalcula, validade da
+# trava de recálculo e espera máxima (s) de quem não pegou a trava.
+CACHE_DEFAULT_TIMEOUT = 300
+CACHE_STALE_GRACE = 30
+CACHE_LOCK_TIMEOUT = 10
+CACHE_LOCK_WAIT = 2.0
+
+# TTL (s) do contador de mensagens não lidas (mail); enviar ou ler mensagens
+# já invalida o contador do destinatário.
+MAIL_UNREAD_COUNT_TIMEOUT = 60
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -181,6 +338,44 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashing
+# Perfil escolhido por ambiente; o primeiro hasher da lista é o usado para novos
+# hashes, os demais só verificam senhas antigas (e elas são regravadas no login).
+# Meça o custo de cada perfil com: python manage.py bench_hashers
+
+PASSWORD_PBKDF2_ITERATIONS = int(os.environ.get("PASSWORD_PBKDF2_ITERATIONS", 600000))
+PASSWORD_SCRYPT_WORK_FACTOR = int(
+    os.environ.get("PASSWORD_SCRYPT_WORK_FACTOR", 2**14)
+)
+
+PASSWORD_HASHER_PROFILES = {
+    "pbkdf2": [
+        "custom_auth.hashers.TunablePBKDF2PasswordHasher",
+        "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+        "django.contrib.auth.hashers.ScryptPasswordHasher",
+        "django.contrib.auth.hashers.Argon2PasswordHasher",
+        "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    ],
+    "scrypt": [
+        "custom_auth.hashers.TunableScryptPasswordHasher",
+        "custom_auth.hashers.TunablePBKDF2PasswordHasher",
+        "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+        "django.contrib.auth.hashers.Argon2PasswordHasher",
+        "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    ],
+    # requer argon2-cffi
+    "argon2": [
+        "django.contrib.auth.hashers.Argon2PasswordHasher",
+        "custom_auth.hashers.TunablePBKDF2PasswordHasher",
+        "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+        "django.contrib.auth.hashers.ScryptPasswordHasher",
+        "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    ],
+}
+PASSWORD_HASHER_PROFILE = os.environ.get("PASSWORD_HASHER_PROFILE", "pbkdf2")
+PASSWORD_HASHERS = PASSWORD_HASHER_PROFILES[PASSWORD_HASHER_PROFILE]
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/3.2/topics/i18n/
 
@@ -212,6 +407,15 @@ STATICFILES_DIRS = [
     BASE_DIR / "static",  # opcional
 ]
 
+if _PROD:
+    # collectstatic já grava as versões .gz que o WhiteNoise entrega
+    STORAGES = {
+        "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+        "staticfiles": {
+            "BACKEND": "whitenoise.storage.CompressedStaticFilesStorage",
+        },
+    }
+
 TEMPLATES[0]["OPTIONS"]["context_processors"] += [
     "custom_auth.context_processors.theme",
 ]
@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import re
+import sqlite3
+import time
+from collections import Counter
+from contextlib import ExitStack, closing
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from core.stats import BatchAggregator, view_name
+
+logger = logging.getLogger(__name__)
+
+# Profiling de SQL por requisição:
+#   - captura todas as queries (connection.execute_wrapper, vale sem DEBUG);
+#   - normaliza cada SQL num fingerprint (literais/listas viram "?");
+#   - o mesmo fingerprint N vezes na mesma requisição = suspeita de N+1;
+#   - agrega por view e grava num SQLite local (SQL_PROFILER_DB), fora do
+#     banco da aplicação; `manage.py sql_profile_top` lista os piores.
+
+PROFILE_HEADER = "X-SQL-Profile"
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_RE = re.compile(r"%s|\?")
+_IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_VALUES_LIST_RE = re.compile(r"(VALUES\s*)\(\?\)(?:\s*,\s*\(\?\))+", re.IGNORECASE)
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_sql(sql: str) -> str:
+    """SQL sem valores: `id IN (%s, %s)` e `id IN (1, 2, 3)` viram `id IN (?)`."""
+    sql = _STRING_RE.sub("?", sql)
+    sql = _NUMBER_RE.sub("?", sql)
+    sql = _PLACEHOLDER_RE.sub("?", sql)
+    sql = _IN_LIST_RE.sub("(?)", sql)
+    sql = _VALUES_LIST_RE.sub(r"\1(?)", sql)
+    return _SPACE_RE.sub(" ", sql).strip()
+
+
+def fingerprint(normalized_sql: str) -> str:
+    return hashlib.sha1(normalized_sql.encode()).hexdigest()[:12]
+
+
+# ---------- Coleta por requisição ----------
+
+
+@dataclass
+class QueryStats:
+    sql: str
+    calls: int = 0
+    seconds: float = 0.0
+
+
+@dataclass
+class RequestProfile:
+    queries: dict[str, QueryStats] = field(default_factory=dict)
+    exact: Counter = field(default_factory=Counter)
+    count: int = 0
+    seconds: float = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            normalized = normalize_sql(sql)
+            key = fingerprint(normalized)
+            stats = self.queries.get(key)
+            if stats is None:
+                stats = self.queries[key] = QueryStats(normalized)
+            stats.calls += 1
+            stats.seconds += elapsed
+            self.exact[(sql, repr(params))] += 1
+            self.count += 1
+            self.seconds += elapsed
+
+    def n_plus_one(self, threshold: int) -> dict[str, QueryStats]:
+        return {k: q for k, q in self.queries.items() if q.calls >= threshold}
+
+    @property
+    def duplicates(self) -> int:
+        """Queries idênticas (mesmo SQL e parâmetros) repetidas."""
+        return sum(n - 1 for n in self.exact.values() if n > 1)
+
+
+# ---------- Store local (SQLite) ----------
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS view_stats (
+    view TEXT PRIMARY KEY,
+    requests INTEGER NOT NULL DEFAULT 0,
+    queries INTEGER NOT NULL DEFAULT 0,
+    total_ms REAL NOT NULL DEFAULT 0,
+    max_queries INTEGER NOT NULL DEFAULT 0,
+    n_plus_one_requests INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS query_stats (
+    view TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    sql TEXT NOT NULL,
+    calls INTEGER NOT NULL DEFAULT 0,
+    total_ms REAL NOT NULL DEFAULT 0,
+    max_calls_per_request INTEGER NOT NULL DEFAULT 0,
+    n_plus_one_requests INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (view, fingerprint)
+);
+"""
+
+
+def connect_store(path=None) -> sqlite3.Connection:
+    conn = sqlite3.connect(path or settings.SQL_PROFILER_DB, timeout=5)
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def _merge_profile(pending: dict, view: str, profile: RequestProfile, threshold):
+    flagged = profile.n_plus_one(threshold)
+    views = pending.setdefault("views", {})
+    queries = pending.setdefault("queries", {})
+    v = views.setdefault(view, [0, 0, 0.0, 0, 0])
+    v[0] += 1
+    v[1] += profile.count
+    v[2] += profile.seconds * 1000
+    v[3] = max(v[3], profile.count)
+    v[4] += bool(flagged)
+    for key, stats in profile.queries.items():
+        q = queries.setdefault((view, key), [stats.sql, 0, 0.0, 0, 0])
+        q[1] += stats.calls
+        q[2] += stats.seconds * 1000
+        q[3] = max(q[3], stats.calls)
+        q[4] += key in flagged
+
+
+def _write_profile(pending: dict) -> None:
+    """Grava o lote no SQLite local (UPSERT somando aos totais)."""
+    now = time.time()
+    with closing(connect_store()) as conn, conn:
+        conn.executemany(
+            "INSERT INTO view_stats VALUES (?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(view) DO UPDATE SET "
+            "requests = requests + excluded.requests, "
+            "queries = queries + excluded.queries, "
+            "total_ms = total_ms + excluded.total_ms, "
+            "max_queries = MAX(max_queries, excluded.max_queries), "
+            "n_plus_one_requests = "
+            "n_plus_one_requests + excluded.n_plus_one_requests, "
+            "updated_at = excluded.updated_at",
+            [(view, *values, now) for view, values in pending["views"].items()],
+        )
+        conn.executemany(
+            "INSERT INTO query_stats VALUES (?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(view, fingerprint) DO UPDATE SET "
+            "calls = calls + excluded.calls, "
+            "total_ms = total_ms + excluded.total_ms, "
+            "max_calls_per_request = "
+            "MAX(max_calls_per_request, excluded.max_calls_per_request), "
+            "n_plus_one_requests = "
+            "n_plus_one_requests + excluded.n_plus_one_requests",
+            [
+                (view, key, *values)
+                for (view, key), values in pending["queries"].items()
+            ],
+        )
+
+
+store = BatchAggregator(
+    "profiling de SQL", _merge_profile, _write_profile, errors=(sqlite3.Error,)
+)
+
+
+class SQLProfilerMiddleware:
+    """
+    Perfil de SQL da requisição. Com SQL_PROFILER_HEADER devolve
+    X-SQL-Profile, ex.: "queries=42; time=18.30ms; duplicates=30; n+1=2".
+    Views assíncronas só têm capturadas as queries feitas nesta thread.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "SQL_PROFILER_ENABLED", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.header = getattr(settings, "SQL_PROFILER_HEADER", settings.DEBUG)
+        self.threshold = getattr(settings, "SQL_PROFILER_N_PLUS_ONE_THRESHOLD", 5)
+        store.interval = getattr(settings, "SQL_PROFILER_FLUSH_INTERVAL", 10)
+
+    def __call__(self, request):
+        profile = RequestProfile()
+        with ExitStack() as stack:
+            for conn in connections.all():
+                stack.enter_context(conn.execute_wrapper(profile))
+            response = self.get_response(request)
+
+        view = view_name(request)
+
+        flagged = profile.n_plus_one(self.threshold)
+        for stats in flagged.values():
+            logger.warning(
+                "Possível N+1 em %s: %dx %s", view, stats.calls, stats.sql[:200]
+            )
+        if self.header:
+            response[PROFILE_HEADER] = (
+                f"queries={profile.count}; time={profile.seconds * 1000:.2f}ms; "
+                f"duplicates={profile.duplicates}; n+1={len(flagged)}"
+            )
+
+        store.add(view, profile, self.threshold)
+        return response
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import atexit
+import logging
+import math
+import os
+import threading
+import time
+from typing import Callable
+
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+# Estatísticas agregadas por view (custom_auth.perm_audit, core.sql_profiler):
+# a requisição só soma num dicionário em memória; uma thread por processo
+# grava o lote a cada `interval` segundos, e o atexit grava o que sobrou.
+
+NO_ROUTE = "<sem rota>"
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Percentil pelo método nearest-rank (valor de uma amostra, sem interpolar)."""
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def view_name(request) -> str:
+    """
+    Nome da rota resolvida ("namespace:nome"); rota sem nome fica com o
+    padrão de URL (o view_name dela cairia no caminho da função).
+    """
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return NO_ROUTE
+    if match.url_name:
+        return match.view_name
+    return match.route or NO_ROUTE
+
+
+class BatchAggregator:
+    """
+    Acumulador por chave com gravação em lote fora do caminho da requisição.
+    `add(*args)` chama `merge(pending, *args)` sob o lock; o flush troca o
+    lote por um vazio e chama `write(lote)`. Exceções de `errors` em `write`
+    são logadas e o lote é descartado: estatística nunca derruba a aplicação.
+    A thread sobe no primeiro `add` de cada processo (workers do gunicorn
+    nascem de um fork, que não herda threads).
+    """
+
+    def __init__(
+        self,
+        label: str,
+        merge: Callable[..., None],
+        write: Callable[[dict], None],
+        *,
+        errors: tuple[type[BaseException], ...] = (Exception,),
+        interval: float = 10,
+    ):
+        self.label = label
+        self.interval = interval
+        self._merge = merge
+        self._write = write
+        self._errors = errors
+        self._lock = threading.Lock()
+        self._pending: dict = {}
+        self._pid = None
+        atexit.register(self.flush)
+
+    def add(self, *args) -> None:
+        with self._lock:
+            self._merge(self._pending, *args)
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                threading.Thread(
+                    target=self._run, name=f"{self.label}-flush", daemon=True
+                ).start()
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.flush()
+            finally:
+                # conexões desta thread não ficam abertas entre os lotes
+                connections.close_all()
+
+    def flush(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        try:
+            self._write(pending)
+        except self._errors:
+            logger.exception("Falha ao gravar %s; lote descartado", self.label)
@@ -0,0 +1,384 @@
+from __future__ import annotations
+
+import random
+import time
+from dataclasses import dataclass
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import Group
+from django.db import transaction
+from django.utils import timezone
+
+from custom_auth.models import (
+    FrontPermission,
+    GroupObjectPermission,
+    Loja,
+    Role,
+    User,
+    UserRole,
+    Vendedor,
+)
+from custom_auth.perm_bits import allocate_bits
+from mail.models.mailbox import Message, MessageThread
+from sales.models import (
+    Commission,
+    PaymentMethod,
+    PriceProduct,
+    Product,
+    SaleHistory,
+    Stock,
+    TypeProduct,
+)
+from subscription.models import Bills, Subscription
+
+# Dados sintéticos para benchmark (core.benchmarks). Tudo é criado com
+# bulk_create, sem signals (nada de e-mail de boas-vindas, Bill automática
+# ou baixa de estoque), e todo nome começa com SYNTHETIC_PREFIX para o
+# --purge conseguir remover só o que foi gerado aqui.
+
+SYNTHETIC_PREFIX = "synth"
+SYNTHETIC_PASSWORD = "synth-S3nh@"
+BATCH_SIZE = 1000
+
+_WORDS = (
+    "pedido entrega estoque cliente pagamento fatura produto troca prazo "
+    "desconto promoção reposição caixa nota fiscal comissão meta loja "
+    "vitrine inventário fornecedor boleto pix cartão orçamento"
+).split()
+
+
+@dataclass
+class SyntheticScale:
+    stores: int = 10
+    sellers_per_store: int = 5
+    products_per_store: int = 20
+    prices_per_product: int = 5
+    sales_per_store: int = 200
+    threads_per_store: int = 20
+    messages_per_thread: int = 15
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(words)).capitalize() + "."
+
+
+def _bulk(model, objs):
+    return model.objects.bulk_create(objs, batch_size=BATCH_SIZE)
+
+
+def _payment_methods() -> list[PaymentMethod]:
+    methods = list(PaymentMethod.objects.filter(active=True))
+    if not methods:
+        methods = _bulk(
+            PaymentMethod,
+            [
+                PaymentMethod(method_payment=value)
+                for value in PaymentMethod.PaymentChoices.values
+            ],
+        )
+    return methods
+
+
+@transaction.atomic
+def generate(scale: SyntheticScale, *, seed: int = 42, tag: str | None = None) -> dict:
+    """
+    Gera uma massa de dados coerente: lojas (com dono e assinatura), vendedores,
+    produtos com estoque e histórico de preço, vendas com comissão, conversas
+    entre colegas de loja, papéis/permissões de front e um staff com
+    permissões por grupo. Retorna a contagem criada de cada modelo.
+    """
+    rng = random.Random(seed)
+    tag = tag or format(int(time.time()), "x")
+    prefix = f"{SYNTHETIC_PREFIX}-{tag}"
+    password = make_password(SYNTHETIC_PASSWORD)  # 1 hash para todos
+    now = timezone.now()
+    today = date.today()
+
+    # ---------- usuários: donos, vendedores e um staff ----------
+    users = [
+        User(
+            username=f"{prefix}-owner-{s}",
+            email=f"{prefix}-owner-{s}@example.com",
+            first_name=f"Dono {s}",
+            password=password,
+        )
+        for s in range(scale.stores)
+    ]
+    users += [
+        User(
+            username=f"{prefix}-seller-{s}-{v}",
+            email=f"{prefix}-seller-{s}-{v}@example.com",
+            first_name=f"Vendedor {s}.{v}",
+            password=password,
+        )
+        for s in range(scale.stores)
+        for v in range(scale.sellers_per_store)
+    ]
+    users.append(
+        User(
+            username=f"{prefix}-staff",
+            email=f"{prefix}-staff@example.com",
+            password=password,
+            is_staff=True,
+        )
+    )
+    users = _bulk(User, users)
+    owners = users[: scale.stores]
+    seller_users = users[scale.stores : -1]
+    staff = users[-1]
+
+    lojas = _bulk(
+        Loja,
+        [
+            Loja(nome=f"{prefix}-loja-{s}", dono=owner, descricao=_sentence(rng, 8))
+            for s, owner in enumerate(owners)
+        ],
+    )
+    # bulk_create não dispara o signal que vincula o dono à M2M lojas
+    _bulk(
+        User.lojas.through,
+        [User.lojas.through(user_id=loja.dono_id, loja_id=loja.id) for loja in lojas],
+    )
+
+    vendedores = _bulk(
+        Vendedor,
+        [
+            Vendedor(
+                user=user,
+                nome=user.first_name,
+                email=user.email,
+                nome_loja=lojas[i // scale.sellers_per_store],
+            )
+            for i, user in enumerate(seller_users)
+        ],
+    )
+    by_store: dict[int, list[Vendedor]] = {}
+    for vendedor in vendedores:
+        by_store.setdefault(vendedor.nome_loja_id, []).append(vendedor)
+
+    # ---------- produtos, estoque e histórico de preços ----------
+    types = _bulk(
+        TypeProduct,
+        [TypeProduct(type_product=f"{prefix}-tipo-{t}") for t in range(5)],
+    )
+    products = _bulk(
+        Product,
+        [
+            Product(
+                name=f"{prefix}-produto-{loja.id}-{p}",
+                type_product=rng.choice(types),
+                store=loja,
+            )
+            for loja in lojas
+            for p in range(scale.products_per_store)
+        ],
+    )
+    _bulk(
+        Stock,
+        [
+            Stock(
+                product=product,
+                quantity=rng.randint(500, 5000),
+                cost_price=Decimal(rng.randint(500, 20000)) / 100,
+            )
+            for product in products
+        ],
+    )
+    prices = []
+    last_price = {}
+    for product in products:
+        price = Decimal(rng.randint(1000, 50000)) / 100
+        for _ in range(scale.prices_per_product):
+            price = (price * Decimal(rng.uniform(0.9, 1.15))).quantize(Decimal("0.01"))
+            prices.append(PriceProduct(product=product, price=price))
+        last_price[product.id] = price
+    _bulk(PriceProduct, prices)
+
+    # ---------- vendas e comissões ----------
+    methods = _payment_methods()
+    products_by_store: dict[int, list[Product]] = {}
+    for product in products:
+        products_by_store.setdefault(product.store_id, []).append(product)
+
+    sales, sale_meta = [], []
+    for loja in lojas:
+        sellers = by_store.get(loja.id)
+        if not sellers or loja.id not in products_by_store:
+            continue
+        for _ in range(scale.sales_per_store):
+            vendedor = rng.choice(sellers)
+            product = rng.choice(products_by_store[loja.id])
+            method = rng.choice(methods)
+            quantity = rng.randint(1, 3)
+            sales.append(
+                SaleHistory(
+                    sales_by_id=vendedor.user_id,
+                    product=product,
+                    payment_method=method,
+                    quantity=quantity,
+                )
+            )
+            sale_meta.append((vendedor, product, method, quantity))
+    sales = _bulk(SaleHistory, sales)
+    rate = Decimal("5.00")
+    _bulk(
+        Commission,
+        [
+            Commission(
+                sale=sale,
+                seller=vendedor,
+                product=product,
+                payment_method=method,
+                commission_rate=rate,
+                commission_value=(
+                    last_price[product.id] * quantity * rate / 100
+                ).quantize(Decimal("0.01")),
+                paid=rng.random() < 0.5,
+            )
+            for sale, (vendedor, product, method, quantity) in zip(sales, sale_meta)
+        ],
+    )
+
+    # ---------- conversas entre colegas de loja ----------
+    threads, thread_members = [], []
+    for loja in lojas:
+        members = [v.user_id for v in by_store.get(loja.id, [])] + [loja.dono_id]
+        if len(members) < 2:
+            continue
+        for t in range(scale.threads_per_store):
+            threads.append(MessageThread(subject=f"{prefix} {_sentence(rng, 4)} #{t}"))
+            thread_members.append(rng.sample(members, k=min(len(members), 3)))
+    threads = _bulk(MessageThread, threads)
+    _bulk(
+        MessageThread.participants.through,
+        [
+            MessageThread.participants.through(messagethread_id=thread.id, user_id=uid)
+            for thread, members in zip(threads, thread_members)
+            for uid in members
+        ],
+    )
+    messages = []
+    for thread, members in zip(threads, thread_members):
+        start = now - timedelta(days=rng.randint(1, 90))
+        for m in range(scale.messages_per_thread):
+            sender, recipient = rng.sample(members, k=2)
+            messages.append(
+                Message(
+                    thread=thread,
+                    sender_id=sender,
+                    recipient_id=recipient,
+                    body=_sentence(rng, rng.randint(5, 40)),
+                    sent_at=start + timedelta(minutes=37 * m),
+                    is_read=rng.random() < 0.7,
+                )
+            )
+    _bulk(Message, messages)
+
+    # ---------- assinaturas e faturas ----------
+    subscriptions = _bulk(
+        Subscription,
+        [
+            Subscription(
+                loja_responsavel=loja,
+                is_active=rng.random() < 0.8,
+                valido_ate=today + timedelta(days=rng.randint(-30, 30)),
+                pay=rng.random() < 0.7,
+                recurrence=rng.random() < 0.5,
+            )
+            for loja in lojas
+        ],
+    )
+    _bulk(
+        Subscription.user.through,
+        [
+            Subscription.user.through(subscription_id=sub.id, vendedor_id=v.id)
+            for sub in subscriptions
+            for v in by_store.get(sub.loja_responsavel_id, [])
+        ],
+    )
+    bills = _bulk(
+        Bills,
+        [
+            Bills(sub=sub, status=rng.choice(Bills.Status.values))
+            for sub in subscriptions
+            for _ in range(rng.randint(1, 3))
+        ],
+    )
+
+    # ---------- permissões: papel de front por loja e grupo do staff ----------
+    actions = ("view", "add", "change", "delete")
+    perms = _bulk(
+        FrontPermission,
+        [
+            FrontPermission(
+                name=f"{prefix} {action}", codename=f"{prefix}.{action}", bit=bit
+            )
+            for action, bit in zip(actions, allocate_bits(len(actions)))
+        ],
+    )
+    role = Role.objects.create(name=f"{prefix}-vendedor")
+    role.permissions.set(perms[:2])
+    _bulk(
+        UserRole,
+        [
+            UserRole(user_id=v.user_id, role=role, loja_id=v.nome_loja_id)
+            for v in vendedores
+        ],
+    )
+    group = Group.objects.create(name=f"{prefix}-staff")
+    staff.groups.add(group)
+    gop = GroupObjectPermission.objects.create(
+        group=group,
+        action="view",
+        model_names=["sales.product", "sales.salehistory", "mail.message"],
+    )
+    gop.users.add(staff)
+
+    return {
+        "tag": tag,
+        "users": len(users),
+        "lojas": len(lojas),
+        "vendedores": len(vendedores),
+        "products": len(products),
+        "prices": len(prices),
+        "sales": len(sales),
+        "commissions": len(sales),
+        "threads": len(threads),
+        "messages": len(messages),
+        "subscriptions": len(subscriptions),
+        "bills": len(bills),
+    }
+
+
+@transaction.atomic
+def purge() -> dict:
+    """Remove tudo o que generate() criou (identificado pelo prefixo)."""
+    like = f"{SYNTHETIC_PREFIX}-"
+    lojas = Loja.objects.filter(nome__startswith=like)
+    products = Product.objects.filter(store__in=lojas)
+    users = User.objects.filter(username__startswith=like)
+    subscriptions = Subscription.objects.filter(loja_responsavel__in=lojas)
+
+    # ordem respeitando os PROTECT
+    deleted = {}
+    for label, qs in (
+        ("commissions", Commission.objects.filter(product__in=products)),
+        ("sales", SaleHistory.objects.filter(product__in=products)),
+        ("prices", PriceProduct.objects.filter(product__in=products)),
+        ("products", products),
+        ("types", TypeProduct.objects.filter(type_product__startswith=like)),
+        ("messages", Message.objects.filter(thread__subject__startswith=like)),
+        ("threads", MessageThread.objects.filter(subject__startswith=like)),
+        ("bills", Bills.objects.filter(sub__in=subscriptions)),
+        ("subscriptions", subscriptions),
+        ("front_perms", FrontPermission.objects.filter(codename__startswith=like)),
+        ("roles", Role.objects.filter(name__startswith=like)),
+        ("groups", Group.objects.filter(name__startswith=like)),
+        ("vendedores", Vendedor.objects.filter(nome_loja__in=lojas)),
+        ("lojas", lojas),
+        ("users", users),
+    ):
+        deleted[label], _ = qs.delete()
+    return deleted
@@ -0,0 +1,107 @@
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import ResolverMatch
+
+from core.sql_profiler import (
+    PROFILE_HEADER,
+    SQLProfilerMiddleware,
+    fingerprint,
+    normalize_sql,
+    store,
+)
+from core.stats import percentile
+from custom_auth.models import User
+
+
+class PercentileTests(SimpleTestCase):
+    def test_nearest_rank(self):
+        samples = [5.0, 1.0, 4.0, 2.0, 3.0]
+        self.assertEqual(percentile(samples, 50), 3.0)
+        self.assertEqual(percentile(samples, 95), 5.0)
+        self.assertEqual(percentile(samples, 0), 1.0)
+        self.assertEqual(percentile([7.0], 99), 7.0)
+
+
+class NormalizeSqlTests(TestCase):
+    def test_literals_and_lists_collapse(self):
+        self.assertEqual(
+            normalize_sql(
+                "SELECT *  FROM t\n WHERE a = 'it''s' AND b = 1.5 AND id IN (1, 2, 3)"
+            ),
+            "SELECT * FROM t WHERE a = ? AND b = ? AND id IN (?)",
+        )
+        self.assertEqual(
+            normalize_sql('INSERT INTO "t" ("a") VALUES (%s), (%s), (%s)'),
+            'INSERT INTO "t" ("a") VALUES (?)',
+        )
+
+    def test_same_shape_same_fingerprint(self):
+        one = normalize_sql("SELECT * FROM t WHERE id IN (%s)")
+        many = normalize_sql("SELECT * FROM t WHERE id IN (%s, %s, %s)")
+        other = normalize_sql("SELECT * FROM u WHERE id IN (%s)")
+        self.assertEqual(fingerprint(one), fingerprint(many))
+        self.assertNotEqual(fingerprint(one), fingerprint(other))
+
+
+class SQLProfilerMiddlewareTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.db = os.path.join(tmp.name, "sql_profile.sqlite3")
+        self.users = [
+            User.objects.create_user(username=f"u{i}", email=f"u{i}@example.com")
+            for i in range(5)
+        ]
+
+    def request(self, get_response):
+        with override_settings(
+            SQL_PROFILER_ENABLED=True,
+            SQL_PROFILER_HEADER=True,
+            SQL_PROFILER_DB=self.db,
+            SQL_PROFILER_N_PLUS_ONE_THRESHOLD=5,
+        ):
+            request = RequestFactory().get("/lista/")
+            request.resolver_match = ResolverMatch(
+                lambda r: None, (), {}, url_name="lista", route="lista/"
+            )
+            response = SQLProfilerMiddleware(get_response)(request)
+            store.flush()
+            out = StringIO()
+            call_command("sql_profile_top", stdout=out)
+        return response, out.getvalue()
+
+    def test_repeated_query_is_flagged_as_n_plus_one(self):
+        def n_plus_one(request):
+            for user in self.users:
+                User.objects.filter(pk=user.pk).first()
+            User.objects.count()
+            return HttpResponse()
+
+        with self.assertLogs("core.sql_profiler", "WARNING") as logs:
+            response, out = self.request(n_plus_one)
+
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn("5x", logs.output[0])
+        self.assertRegex(
+            response[PROFILE_HEADER], r"^queries=6; time=.*; duplicates=0; n\+1=1$"
+        )
+        flagged = [line for line in out.splitlines() if "[N+1]" in line]
+        self.assertEqual(len(flagged), 1)
+        self.assertIn("5x", flagged[0])
+
+    def test_batched_query_is_not_flagged(self):
+        def batched(request):
+            list(User.objects.filter(pk__in=[u.pk for u in self.users]))
+            list(User.objects.filter(pk__in=[self.users[0].pk]))
+            return HttpResponse()
+
+        response, out = self.request(batched)
+
+        self.assertRegex(response[PROFILE_HEADER], r"^queries=2; .*; n\+1=0$")
+        self.assertNotIn("[N+1]", out)
+        self.assertIn("2x", out)
@@ -11,6 +11,8 @@ from .models import (
     FrontPermission,
     GroupObjectPermission,
     Loja,
+    PermissionAuditCheck,
+    PermissionAuditView,
     Role,
     User,
     UserFrontPermission,
@@ -362,3 +364,87 @@ class GroupObjectPermissionAdmin(admin.ModelAdmin):
         if not request.user.is_superuser:
             return {}
         return super().get_model_perms(request)
+
+
+# -------------------------------------------------
+# 🔹 Auditoria de permissões (custom_auth.perm_audit)
+# -------------------------------------------------
+class PermissionAuditCheckInline(admin.TabularInline):
+    model = PermissionAuditCheck
+    extra = 0
+    can_delete = False
+    fields = ("check_name", "calls", "avg_ms", "total_ms", "hit_ratio")
+    readonly_fields = fields
+    ordering = ("-total_ms",)
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+    def avg_ms(self, obj):
+        return f"{obj.total_ms / obj.calls:.3f}" if obj.calls else "-"
+
+    avg_ms.short_description = "ms/chamada"
+
+    def hit_ratio(self, obj):
+        ratio = obj.cache_hit_ratio
+        return "-" if ratio is None else f"{ratio:.0%}"
+
+    hit_ratio.short_description = "Acerto de cache"
+
+
+@admin.register(PermissionAuditView)
+class PermissionAuditViewAdmin(admin.ModelAdmin):
+    """Relatório: views onde resolver permissões pesa mais na resposta."""
+
+    list_display = (
+        "view_name",
+        "requests",
+        "avg_response_ms",
+        "avg_permission_ms",
+        "share",
+        "updated_at",
+    )
+    search_fields = ("view_name",)
+    ordering = ("-permission_ms",)
+    readonly_fields = (
+        "view_name",
+        "requests",
+        "response_ms",
+        "permission_ms",
+        "updated_at",
+    )
+    inlines = [PermissionAuditCheckInline]
+    actions = ["zerar_estatisticas"]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_view_permission(self, request, obj=None):
+        return request.user.is_superuser
+
+    def has_delete_permission(self, request, obj=None):
+        return request.user.is_superuser
+
+    def avg_response_ms(self, obj):
+        return f"{obj.response_ms / obj.requests:.2f}" if obj.requests else "-"
+
+    avg_response_ms.short_description = "ms/req (resposta)"
+
+    def avg_permission_ms(self, obj):
+        return f"{obj.permission_ms / obj.requests:.2f}" if obj.requests else "-"
+
+    avg_permission_ms.short_description = "ms/req (permissões)"
+    avg_permission_ms.admin_order_field = "permission_ms"
+
+    def share(self, obj):
+        return f"{obj.permission_share:.0%}"
+
+    share.short_description = "% do tempo"
+
+    @admin.action(description="Zerar estatísticas selecionadas")
+    def zerar_estatisticas(self, request, queryset):
+        deleted, _ = queryset.delete()
+        self.message_user(request, f"{deleted} registro(s) removido(s).")
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+from itertools import product
+from typing import Iterable, Optional
+
+from django.db import transaction
+from django.db.models import Q
+
+from custom_auth.models import UserFrontPermission, UserRole
+from custom_auth.perm_cache import bump_front_perm_versions
+
+BULK_BATCH_SIZE = 1000
+
+
+def invalidate_front_perms(user_ids: Iterable[int]) -> None:
+    """
+    Invalidação única para um lote de usuários: muda a versão de todos num
+    set_many (bitmasks em cache e tokens já emitidos deixam de valer).
+    """
+    user_ids = set(user_ids)
+    if not user_ids:
+        return
+    bump_front_perm_versions(user_ids)
+
+
+def _bulk_assign(
+    model, target_field: str, user_ids, target_ids, loja_ids
+) -> tuple[int, set[int]]:
+    user_ids = set(user_ids)
+    target_ids = set(target_ids)
+    loja_ids = set(loja_ids)
+    if not (user_ids and target_ids and loja_ids):
+        return 0, set()
+
+    # NULL (escopo global) não entra no UniqueConstraint, então as linhas
+    # existentes são descontadas antes; ignore_conflicts cobre corridas.
+    scope = Q(loja_id__in=loja_ids - {None})
+    if None in loja_ids:
+        scope |= Q(loja__isnull=True)
+    existing = set(
+        model.objects.filter(
+            scope, user_id__in=user_ids, **{f"{target_field}_id__in": target_ids}
+        ).values_list("user_id", f"{target_field}_id", "loja_id")
+    )
+    wanted = set(product(user_ids, target_ids, loja_ids))
+    missing = wanted - existing
+
+    rows = [
+        model(user_id=u, loja_id=loja, **{f"{target_field}_id": target})
+        for u, target, loja in missing
+    ]
+    model.objects.bulk_create(rows, batch_size=BULK_BATCH_SIZE, ignore_conflicts=True)
+    return len(rows), {u for u, _, _ in missing}
+
+
+def bulk_assign(
+    user_ids: Iterable[int],
+    *,
+    role_ids: Iterable[int] = (),
+    permission_ids: Iterable[int] = (),
+    loja_ids: Iterable[Optional[int]] = (None,),
+) -> dict[str, int]:
+    """
+    Atribui papéis e/ou permissões diretas a vários usuários em várias lojas
+    (None = global) com bulk_create, pulando o que já existe.
+    Os sinais por linha não disparam; a invalidação é feita uma vez no final,
+    só para os usuários que ganharam algo.
+    """
+    user_ids = list(user_ids)
+    loja_ids = list(loja_ids)
+    with transaction.atomic():
+        roles_created, role_users = _bulk_assign(
+            UserRole, "role", user_ids, role_ids, loja_ids
+        )
+        perms_created, perm_users = _bulk_assign(
+            UserFrontPermission, "permission", user_ids, permission_ids, loja_ids
+        )
+        affected = role_users | perm_users
+        transaction.on_commit(lambda: invalidate_front_perms(affected))
+
+    return {
+        "roles_created": roles_created,
+        "permissions_created": perms_created,
+        "users_affected": len(affected),
+    }
@@ -0,0 +1,77 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+_VERSION_KEY = "jwt_user_version:{user_id}"
+_USER_KEY = "jwt_user:{user_id}:{version}"
+
+
+def _user_cache_timeout() -> int:
+    return getattr(settings, "JWT_USER_CACHE_TIMEOUT", 60)
+
+
+def bump_user_cache_version(user_id) -> None:
+    """
+    Invalida o usuário em cache: a próxima requisição com token cai no banco.
+    Chamado em save/delete do User (senha, is_active, etc. — ver signals.py)
+    e em User.objects.filter(...).update(...) (UserQuerySet.update).
+    """
+    try:
+        cache.incr(_VERSION_KEY.format(user_id=user_id))
+    except ValueError:
+        cache.set(_VERSION_KEY.format(user_id=user_id), 1, timeout=None)
+
+
+def bump_user_cache_versions(user_ids) -> None:
+    for user_id in user_ids:
+        bump_user_cache_version(user_id)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication que materializa request.user a partir do cache
+    (chave = id do usuário + versão) em vez de um SELECT por requisição.
+    O cache expira em JWT_USER_CACHE_TIMEOUT segundos e a versão muda a cada
+    save/delete/update() do usuário, então senha trocada ou desativação valem
+    na hora.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            ) from e
+
+        version_key = _VERSION_KEY.format(user_id=user_id)
+        version = cache.get(version_key)
+        if version is None:
+            cache.add(version_key, 1, timeout=None)
+            version = cache.get(version_key, 1)
+        user_key = _USER_KEY.format(user_id=user_id, version=version)
+
+        user = cache.get(user_key)
+        if user is None:
+            # carrega e valida pelo caminho padrão (404, inativo, revogado)
+            user = super().get_user(validated_token)
+            cache.set(user_key, user, timeout=_user_cache_timeout())
+            return user
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(
+                api_settings.REVOKE_TOKEN_CLAIM
+            ) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."),
+                    code="password_changed",
+                )
+
+        return user
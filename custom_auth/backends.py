@@ -1,22 +1,52 @@
 from django.contrib.auth import get_user_model
 from django.contrib.auth.backends import ModelBackend
+from django.db.models import Case, Q, Value, When
+from django.db.models.functions import Lower
+from django.db.models.lookups import Exact
 
 UserModel = get_user_model()
 
+# Senha fixa para o hash de quem não existe: com `password` None o
+# set_password não chama o hasher e a resposta sairia mais rápida.
+_TIMING_PASSWORD = "senha-inexistente"
+
+
+def normalize_login(value: str) -> str:
+    """Forma canônica do login (e-mail ou username) usada nas buscas."""
+    return (value or "").lower()
+
 
 class EmailOrUsernameModelBackend(ModelBackend):
+    def get_user_by_login(self, login: str):
+        """
+        Resolve e-mail OU username numa única query, comparando LOWER(coluna)
+        para usar os índices funcionais idx_user_email_lower/idx_user_username_lower.
+        Se o login casar com o e-mail de um usuário e o username de outro,
+        o e-mail tem prioridade (mesmo comportamento de antes) — decidido no
+        ORDER BY, para não depender da ordem em que o banco devolve as linhas.
+        """
+        login = normalize_login(login)
+        if not login:
+            return None
+        email_match = Q(Exact(Lower("email"), login))
+        return (
+            UserModel._default_manager.filter(
+                email_match | Q(Exact(Lower("username"), login))
+            )
+            .order_by(Case(When(email_match, then=Value(0)), default=Value(1)), "pk")
+            .first()
+        )
+
     def authenticate(self, request, username=None, password=None, **kwargs):
         if username is None:
             username = kwargs.get(UserModel.USERNAME_FIELD)
-        user = None
-        if username:
-            try:
-                user = UserModel.objects.get(email__iexact=username)
-            except UserModel.DoesNotExist:
-                try:
-                    user = UserModel.objects.get(username__iexact=username)
-                except UserModel.DoesNotExist:
-                    return None
-        if user and user.check_password(password) and self.user_can_authenticate(user):
+        user = self.get_user_by_login(username)
+        if user is None:
+            # Roda o hasher padrão mesmo sem usuário: o tempo de resposta
+            # não revela se o login existe (mesmo truque do ModelBackend).
+            UserModel().set_password(_TIMING_PASSWORD)
+            return None
+        # check_password regrava o hash quando o hasher/parâmetros mudaram
+        if user.check_password(password) and self.user_can_authenticate(user):
             return user
         return None
@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, ScryptPasswordHasher
+
+
+class TunablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    PBKDF2-SHA256 com iterações vindas de settings.PASSWORD_PBKDF2_ITERATIONS.
+    Mantém o algorithm "pbkdf2_sha256": hashes antigos continuam válidos e são
+    regravados no próximo login quando as iterações mudam (must_update).
+    """
+
+    @property
+    def iterations(self):
+        return getattr(settings, "PASSWORD_PBKDF2_ITERATIONS", super().iterations)
+
+
+class TunableScryptPasswordHasher(ScryptPasswordHasher):
+    """Scrypt com work_factor configurável (settings.PASSWORD_SCRYPT_WORK_FACTOR)."""
+
+    @property
+    def work_factor(self):
+        return getattr(settings, "PASSWORD_SCRYPT_WORK_FACTOR", super().work_factor)
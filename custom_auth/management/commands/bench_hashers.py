@@ -0,0 +1,109 @@
+import json
+import os
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher,
+    BCryptSHA256PasswordHasher,
+    PBKDF2PasswordHasher,
+    ScryptPasswordHasher,
+)
+from django.core.management.base import BaseCommand
+
+BENCH_PASSWORD = "S3nh@-de-benchmark"
+
+
+def _csv_ints(value):
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede logins/s por núcleo (verificação de senha) para cada configuração "
+        "de hasher, para calibrar PASSWORD_HASHER_PROFILE e iterações."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--pbkdf2-iterations",
+            type=_csv_ints,
+            default=[100_000, 300_000, settings.PASSWORD_PBKDF2_ITERATIONS],
+            help="Lista de iterações PBKDF2 separadas por vírgula.",
+        )
+        parser.add_argument(
+            "--scrypt-work-factors",
+            type=_csv_ints,
+            default=[2**13, 2**14],
+            help="Lista de work_factor do scrypt separados por vírgula.",
+        )
+        parser.add_argument(
+            "--seconds",
+            type=float,
+            default=2.0,
+            help="Tempo mínimo de medição por configuração.",
+        )
+        parser.add_argument("--json", dest="json_path", help="Salva o resultado.")
+
+    def _settings_to_measure(self, options):
+        for iterations in options["pbkdf2_iterations"]:
+            hasher = PBKDF2PasswordHasher()
+            hasher.iterations = iterations
+            yield f"pbkdf2_sha256 iterations={iterations}", hasher
+        for work_factor in options["scrypt_work_factors"]:
+            hasher = ScryptPasswordHasher()
+            hasher.work_factor = work_factor
+            yield f"scrypt work_factor={work_factor}", hasher
+        yield "argon2 (padrão)", Argon2PasswordHasher()
+        yield "bcrypt_sha256 (padrão)", BCryptSHA256PasswordHasher()
+
+    def _measure(self, hasher, seconds):
+        encoded = hasher.encode(BENCH_PASSWORD, hasher.salt())
+        count = 0
+        start = time.perf_counter()
+        elapsed = 0.0
+        while elapsed < seconds or count < 3:
+            hasher.verify(BENCH_PASSWORD, encoded)
+            count += 1
+            elapsed = time.perf_counter() - start
+        return count / elapsed, elapsed / count * 1000
+
+    def handle(self, *args, **options):
+        cores = os.cpu_count() or 1
+        results = []
+
+        self.stdout.write(
+            f"Perfil atual: {settings.PASSWORD_HASHER_PROFILE} "
+            f"({settings.PASSWORD_HASHERS[0]}) — {cores} núcleo(s)\n"
+        )
+        self.stdout.write(
+            f"{'configuração':<36}{'logins/s/núcleo':>18}{'ms/login':>12}"
+            f"{'logins/s total':>18}"
+        )
+
+        for label, hasher in self._settings_to_measure(options):
+            try:
+                per_core, ms = self._measure(hasher, options["seconds"])
+            except ValueError as exc:
+                # biblioteca opcional ausente (argon2-cffi, bcrypt)
+                self.stdout.write(f"{label:<36}{'indisponível':>18}  ({exc})")
+                continue
+            results.append(
+                {
+                    "setting": label,
+                    "algorithm": hasher.algorithm,
+                    "logins_per_sec_per_core": round(per_core, 2),
+                    "ms_per_login": round(ms, 2),
+                    "logins_per_sec_total": round(per_core * cores, 2),
+                }
+            )
+            self.stdout.write(
+                f"{label:<36}{per_core:>18.1f}{ms:>12.1f}{per_core * cores:>18.1f}"
+            )
+
+        if options["json_path"]:
+            with open(options["json_path"], "w", encoding="utf-8") as fh:
+                json.dump({"cores": cores, "results": results}, fh, indent=2)
+            self.stdout.write(
+                self.style.SUCCESS(f"Resultado salvo em {options['json_path']}")
+            )
@@ -0,0 +1,128 @@
+import csv
+import os
+import sys
+import time
+from contextlib import nullcontext
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from custom_auth.models import Loja
+from custom_auth.vendor_import import (
+    FORMATS,
+    IMPORT_CHUNK_SIZE,
+    import_vendedores,
+    parse_vendedores,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Importa vendedores de um CSV (cabeçalho nome,email) ou JSON para uma "
+        "loja: usuários criados em lote, senhas com hash num pool de processos "
+        "e mensagens de boas-vindas em lote."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Arquivo .csv ou .json (- para stdin).")
+        parser.add_argument("--loja", type=int, required=True, help="Id da loja.")
+        parser.add_argument(
+            "--format", choices=FORMATS, help="Padrão: pela extensão do arquivo."
+        )
+        parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+        parser.add_argument(
+            "--workers", type=int, help="Workers de hash (padrão: núcleos, até 8)."
+        )
+        parser.add_argument(
+            "--threads",
+            action="store_true",
+            help="Hash em threads em vez de processos.",
+        )
+        parser.add_argument(
+            "--no-notify",
+            action="store_true",
+            help="Não envia as mensagens de boas-vindas (com a senha temporária).",
+        )
+        parser.add_argument(
+            "--credentials",
+            metavar="PATH",
+            help=(
+                "CSV (email,username,senha) com as senhas temporárias; "
+                "obrigatório com --no-notify."
+            ),
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true", help="Só valida o arquivo."
+        )
+
+    def handle(self, *args, **options):
+        notify = not options["no_notify"]
+        if not notify and not options["credentials"] and not options["dry_run"]:
+            raise CommandError(
+                "--no-notify descarta as senhas temporárias: informe --credentials."
+            )
+
+        try:
+            loja = Loja.objects.get(pk=options["loja"])
+        except Loja.DoesNotExist:
+            raise CommandError(f"Loja {options['loja']} não existe.")
+
+        path = options["path"]
+        fmt = options["format"] or ("json" if path.endswith(".json") else "csv")
+        if path == "-":
+            content = sys.stdin.read()
+        else:
+            content = Path(path).read_text(encoding="utf-8-sig")
+        try:
+            rows, errors = parse_vendedores(content, fmt)
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        for line, error in errors:
+            self.stderr.write(self.style.WARNING(f"linha {line}: {error}"))
+        self.stdout.write(f"{len(rows)} vendedor(es) válido(s), {len(errors)} erro(s).")
+        if options["dry_run"] or not rows:
+            return
+
+        started = time.perf_counter()
+        with self._credentials_file(options["credentials"]) as out:
+            credentials = csv.writer(out) if out else None
+            if credentials:
+                credentials.writerow(["email", "username", "senha"])
+            written = 0
+
+            def progress(result):
+                # cada lote já está no banco: as senhas dele saem agora
+                nonlocal written
+                if credentials:
+                    credentials.writerows(result.credentials[written:])
+                    written = len(result.credentials)
+                self.stdout.write(
+                    f"  lote {result.chunks}: {result.created} criado(s) "
+                    f"({time.perf_counter() - started:.1f}s)"
+                )
+
+            result = import_vendedores(
+                loja,
+                rows,
+                chunk_size=options["chunk_size"],
+                workers=options["workers"],
+                processes=not options["threads"],
+                notify=notify,
+                on_chunk=progress,
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{result.created} vendedor(es) criado(s), {len(result.skipped)} "
+                f"ignorado(s) (e-mail já cadastrado) em "
+                f"{time.perf_counter() - started:.1f}s."
+            )
+        )
+
+    @staticmethod
+    def _credentials_file(path):
+        if not path:
+            return nullcontext()
+        # só o dono lê: o arquivo tem as senhas temporárias em claro
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        return os.fdopen(fd, "w", newline="", encoding="utf-8")
@@ -1,44 +1,132 @@
 # apps/custom_auth/management/commands/seed_front_perms.py
+import re
+
 from django.apps import apps
 from django.core.management.base import BaseCommand
+from django.db import transaction
 
 from custom_auth.models import FrontPermission
+from custom_auth.perm_bits import allocate_bits
+from custom_auth.perm_bits import registry as perm_registry
+
+BASE_ACTIONS = ("view", "add", "change", "delete")
+
+# Formato dos codenames gerados aqui; só estes podem ser removidos com --prune
+# (permissões criadas à mão, ex.: "relatorios.exportar", nunca são tocadas).
+GENERATED_CODENAME_RE = re.compile(r"^\w+\.\w+\.(?:%s)$" % "|".join(BASE_ACTIONS))
+
+
+def desired_front_permissions() -> dict[str, str]:
+    """codename -> name de todas as permissões padrão dos modelos registrados."""
+    desired = {}
+    for model in apps.get_models():
+        model_name = model._meta.model_name
+        verbose_name = model._meta.verbose_name.title()
+        app_label = model._meta.app_label
+
+        # Permissões padrão do Django
+        base_perms = [
+            ("view", f"Listar/visualizar {verbose_name}"),
+            ("add", f"Criar {verbose_name}"),
+            ("change", f"Atualizar {verbose_name}"),
+            ("delete", f"Excluir {verbose_name}"),
+        ]
+        for action, desc in base_perms:
+            desired[f"{app_label}.{model_name}.{action}"] = desc
+    return desired
 
 
 class Command(BaseCommand):
-    help = "Seed automático das permissões de FRONT com base nos modelos registrados"
+    help = (
+        "Seed automático das permissões de FRONT com base nos modelos registrados "
+        "(idempotente: 1 consulta + 1 bulk insert, seguro para rodar em todo deploy)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--prune",
+            action="store_true",
+            help="Remove permissões geradas de modelos/ações que não existem mais.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Só mostra o que seria criado/removido, sem gravar.",
+        )
 
     def handle(self, *args, **options):
-        created = 0
-        skipped = 0
-
-        for model in apps.get_models():
-            model_name = model._meta.model_name
-            verbose_name = model._meta.verbose_name.title()
-            app_label = model._meta.app_label
-
-            # Permissões padrão do Django
-            base_perms = [
-                ("view", f"Listar/visualizar {verbose_name}"),
-                ("add", f"Criar {verbose_name}"),
-                ("change", f"Atualizar {verbose_name}"),
-                ("delete", f"Excluir {verbose_name}"),
-            ]
-
-            for action, desc in base_perms:
-                codename = f"{app_label}.{model_name}.{action}"
-
-                obj, was_created = FrontPermission.objects.get_or_create(
-                    codename=codename, defaults={"name": desc}
+        desired = desired_front_permissions()
+        existing = dict(FrontPermission.objects.values_list("codename", "name"))
+
+        # nome também é único: um nome já usado por outro codename (existente
+        # ou agendado antes nesta rodada) faria o ignore_conflicts descartar a
+        # linha em silêncio
+        taken_names = {name: codename for codename, name in existing.items()}
+        to_create, name_clashes = [], []
+        for codename in sorted(desired.keys() - existing.keys()):
+            name = desired[codename]
+            if name in taken_names:
+                name_clashes.append((codename, taken_names[name]))
+            else:
+                taken_names[name] = codename
+                to_create.append(codename)
+        to_prune = (
+            sorted(
+                codename
+                for codename in existing.keys() - desired.keys()
+                if GENERATED_CODENAME_RE.match(codename)
+            )
+            if options["prune"]
+            else []
+        )
+
+        if options["dry_run"] or options["verbosity"] > 1:
+            for codename in to_create:
+                self.stdout.write(f"+ {codename}  ({desired[codename]})")
+            for codename in to_prune:
+                self.stdout.write(f"- {codename}")
+        for codename, owner in name_clashes:
+            self.stderr.write(
+                f"! {codename}: nome '{desired[codename]}' já usado por {owner}, "
+                "ignorada."
+            )
+
+        if options["dry_run"]:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"[dry-run] {len(to_create)} a criar, {len(to_prune)} a remover, "
+                    f"{len(desired) - len(to_create) - len(name_clashes)} já existem."
                 )
+            )
+            return
+
+        with transaction.atomic():
+            FrontPermission.objects.bulk_create(
+                [
+                    FrontPermission(codename=codename, name=desired[codename], bit=bit)
+                    for codename, bit in zip(to_create, allocate_bits(len(to_create)))
+                ],
+                ignore_conflicts=True,
+            )
+            pruned = 0
+            if to_prune:
+                pruned, _ = FrontPermission.objects.filter(
+                    codename__in=to_prune
+                ).delete()
 
-                if was_created:
-                    created += 1
-                else:
-                    skipped += 1
+        if to_create or to_prune:
+            # bulk_create não dispara post_save; outros processos recarregam
+            # o registro sozinhos no próximo "miss"
+            perm_registry.clear()
 
         self.stdout.write(
             self.style.SUCCESS(
-                f"Permissões geradas: {created} novas, {skipped} já existiam."
+                f"Permissões geradas: {len(to_create)} novas, "
+                f"{len(desired) - len(to_create) - len(name_clashes)} já existiam"
+                + (
+                    f", {len(to_prune)} removidas ({pruned} linhas)."
+                    if to_prune
+                    else "."
+                )
             )
         )
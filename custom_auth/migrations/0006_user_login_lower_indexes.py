@@ -0,0 +1,27 @@
+# Generated by Django 4.2.16 on 2026-10-19 14:06
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("custom_auth", "0005_actionpermission_remove_user_allowed_actions_and_more"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(
+                django.db.models.functions.text.Lower("email"),
+                name="idx_user_email_lower",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(
+                django.db.models.functions.text.Lower("username"),
+                name="idx_user_username_lower",
+            ),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 4.2.16 on 2026-10-19 14:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("custom_auth", "0006_user_login_lower_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PermissionAuditView",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("view_name", models.CharField(max_length=255, unique=True)),
+                ("requests", models.PositiveBigIntegerField(default=0)),
+                ("response_ms", models.FloatField(default=0)),
+                ("permission_ms", models.FloatField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Auditoria de permissões (view)",
+                "verbose_name_plural": "Auditoria de permissões (views)",
+                "ordering": ("-permission_ms",),
+            },
+        ),
+        migrations.CreateModel(
+            name="PermissionAuditCheck",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("check_name", models.CharField(max_length=100)),
+                ("calls", models.PositiveBigIntegerField(default=0)),
+                ("total_ms", models.FloatField(default=0)),
+                ("cache_hits", models.PositiveBigIntegerField(default=0)),
+                ("cache_misses", models.PositiveBigIntegerField(default=0)),
+                (
+                    "view",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="checks",
+                        to="custom_auth.permissionauditview",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Auditoria de permissões (checagem)",
+                "verbose_name_plural": "Auditoria de permissões (checagens)",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="permissionauditcheck",
+            constraint=models.UniqueConstraint(
+                fields=("view", "check_name"), name="uniq_perm_audit_view_check"
+            ),
+        ),
+    ]
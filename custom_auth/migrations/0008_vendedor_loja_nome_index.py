@@ -0,0 +1,18 @@
+# Generated by Django 4.2.16 on 2026-10-19 14:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("custom_auth", "0007_permission_audit"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="vendedor",
+            index=models.Index(
+                fields=["nome_loja", "nome"], name="idx_vendedor_loja_nome"
+            ),
+        ),
+    ]
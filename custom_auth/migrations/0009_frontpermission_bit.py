@@ -0,0 +1,32 @@
+# Generated by Django 4.2.16 on 2026-10-19 18:05
+
+from django.db import migrations, models
+
+
+def assign_dense_bits(apps, schema_editor):
+    """Bits 0..n-1 na ordem dos ids: masks do tamanho do número de permissões."""
+    FrontPermission = apps.get_model("custom_auth", "FrontPermission")
+    perms = list(FrontPermission.objects.order_by("pk"))
+    for bit, perm in enumerate(perms):
+        perm.bit = bit
+    FrontPermission.objects.bulk_update(perms, ["bit"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("custom_auth", "0008_vendedor_loja_nome_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="frontpermission",
+            name="bit",
+            field=models.PositiveIntegerField(editable=False, null=True),
+        ),
+        migrations.RunPython(assign_dense_bits, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="frontpermission",
+            name="bit",
+            field=models.PositiveIntegerField(editable=False, unique=True),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.16 on 2026-10-19 15:17
+
+from django.db import migrations
+
+import custom_auth.models.user
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("custom_auth", "0009_frontpermission_bit"),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name="user",
+            managers=[
+                ("objects", custom_auth.models.user.UserManager()),
+            ],
+        ),
+    ]
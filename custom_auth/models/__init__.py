@@ -1,2 +1,3 @@
+from .audit import *
 from .permissions_groups import *
 from .user import *
@@ -0,0 +1,57 @@
+from django.db import models
+
+
+class PermissionAuditView(models.Model):
+    """
+    Tempo gasto em checagens de permissão, acumulado por view
+    (gravado pelo custom_auth.perm_audit.PermissionAuditMiddleware).
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    view_name = models.CharField(max_length=255, unique=True)
+    requests = models.PositiveBigIntegerField(default=0)
+    response_ms = models.FloatField(default=0)
+    permission_ms = models.FloatField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Auditoria de permissões (view)"
+        verbose_name_plural = "Auditoria de permissões (views)"
+        ordering = ("-permission_ms",)
+
+    def __str__(self) -> str:
+        return self.view_name
+
+    @property
+    def permission_share(self) -> float:
+        """Fração do tempo de resposta gasta resolvendo permissões."""
+        return self.permission_ms / self.response_ms if self.response_ms else 0.0
+
+
+class PermissionAuditCheck(models.Model):
+    id = models.BigAutoField(primary_key=True)
+    view = models.ForeignKey(
+        PermissionAuditView, on_delete=models.CASCADE, related_name="checks"
+    )
+    check_name = models.CharField(max_length=100)
+    calls = models.PositiveBigIntegerField(default=0)
+    total_ms = models.FloatField(default=0)
+    cache_hits = models.PositiveBigIntegerField(default=0)
+    cache_misses = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Auditoria de permissões (checagem)"
+        verbose_name_plural = "Auditoria de permissões (checagens)"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["view", "check_name"], name="uniq_perm_audit_view_check"
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.view.view_name}:{self.check_name}"
+
+    @property
+    def cache_hit_ratio(self):
+        lookups = self.cache_hits + self.cache_misses
+        return self.cache_hits / lookups if lookups else None
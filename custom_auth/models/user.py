@@ -1,20 +1,33 @@
 from __future__ import annotations
 
 import uuid
-from functools import lru_cache
 from typing import Optional
 
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import UserManager as DjangoUserManager
 from django.db import models
 from django.db.models import Q, UniqueConstraint
-from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.db.models.functions import Lower
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
 from django.dispatch import receiver
 from django.utils.crypto import get_random_string
-from django.utils.text import slugify
 from django.utils.translation import gettext_lazy as _
 
-from mail.utils import notificar_usuario
+from custom_auth.authentication import bump_user_cache_versions
+from custom_auth.perm_audit import audited, record_cache
+from custom_auth.perm_bits import allocate_bits, mask_from_bits
+from custom_auth.perm_bits import registry as perm_registry
+from custom_auth.perm_cache import (
+    bump_front_perm_version,
+    bump_role_generations,
+    cached_front_mask,
+)
+from custom_auth.usernames import (
+    create_user_with_unique_username,
+    vendedor_base_username,
+)
+from mail.utils import send_private_messages
 
 
 class ActionPermission(models.Model):
@@ -32,6 +45,20 @@ class ActionPermission(models.Model):
         return self.name
 
 
+class UserQuerySet(models.QuerySet):
+    def update(self, **kwargs):
+        # update() não dispara post_save: invalida aqui a cópia do
+        # CachedJWTAuthentication (senha, is_active...) de cada usuário afetado
+        user_ids = list(self.values_list("pk", flat=True))
+        rows = super().update(**kwargs)
+        bump_user_cache_versions(user_ids)
+        return rows
+
+
+class UserManager(DjangoUserManager.from_queryset(UserQuerySet)):
+    pass
+
+
 class User(AbstractUser):
     """
     Usuário customizado.
@@ -53,55 +80,81 @@ class User(AbstractUser):
         ActionPermission, blank=True, related_name="users"
     )
 
+    objects = UserManager()
+
     USERNAME_FIELD = "username"
     REQUIRED_FIELDS = ["email"]
 
     class Meta:
         verbose_name = _("User")
         verbose_name_plural = _("Users")
+        indexes = [
+            # login por e-mail OU username sem diferenciar maiúsculas (backends.py)
+            models.Index(Lower("email"), name="idx_user_email_lower"),
+            models.Index(Lower("username"), name="idx_user_username_lower"),
+        ]
 
     def __str__(self) -> str:
         return self.display_name or self.get_full_name() or self.username
 
-    @lru_cache(maxsize=512)
-    def _collect_front_codenames(self, loja: "Loja | int | None" = None) -> set[str]:
+    def _collect_front_mask(self, loja: "Loja | int | None" = None) -> int:
+        """
+        Permissões efetivas (diretas + via papéis, globais + da loja) como
+        bitmask indexado por FrontPermission.bit (ver custom_auth.perm_bits).
+        Vem do cache compartilhado (custom_auth.perm_cache) e fica memorizado
+        nesta instância, que dura uma requisição.
+        """
         loja_id = getattr(loja, "id", loja)
+        memo = self.__dict__.setdefault("_front_mask_memo", {})
+        if loja_id in memo:
+            record_cache(hit=True)
+        else:
+            scope = Q(loja__isnull=True) | Q(loja_id=loja_id)
+
+            def load_role_ids():
+                return list(
+                    UserRole.objects.filter(scope, user=self)
+                    .values_list("role_id", flat=True)
+                    .distinct()
+                )
+
+            def compute_mask(role_ids):
+                direct = UserFrontPermission.objects.filter(
+                    scope, user=self
+                ).values_list("permission__bit", flat=True)
+                via_roles = Role.permissions.through.objects.filter(
+                    role_id__in=role_ids
+                ).values_list("frontpermission__bit", flat=True)
+                mask = mask_from_bits(direct)
+                if role_ids:
+                    mask |= mask_from_bits(via_roles)
+                return mask
+
+            memo[loja_id] = cached_front_mask(
+                self.pk, loja_id, load_role_ids, compute_mask
+            )
+        return memo[loja_id]
 
-        direct_global = FrontPermission.objects.filter(
-            user_assignments__user=self, user_assignments__loja__isnull=True
-        ).values_list("codename", flat=True)
-
-        direct_scoped = FrontPermission.objects.filter(
-            user_assignments__user=self, user_assignments__loja_id=loja_id
-        ).values_list("codename", flat=True)
-
-        role_global = FrontPermission.objects.filter(
-            roles__user_memberships__user=self,
-            roles__user_memberships__loja__isnull=True,
-        ).values_list("codename", flat=True)
-
-        role_scoped = FrontPermission.objects.filter(
-            roles__user_memberships__user=self, roles__user_memberships__loja_id=loja_id
-        ).values_list("codename", flat=True)
-
-        return (
-            set(direct_global)
-            | set(direct_scoped)
-            | set(role_global)
-            | set(role_scoped)
-        )
+    def _collect_front_codenames(self, loja: "Loja | int | None" = None) -> set[str]:
+        return perm_registry.codenames(self._collect_front_mask(loja))
 
+    @audited("has_front_perm")
     def has_front_perm(self, codename: str, loja: "Loja | int | None" = None) -> bool:
-        return codename in self._collect_front_codenames(loja)
+        return perm_registry.has(self._collect_front_mask(loja), codename)
 
     def front_perms(self, loja: "Loja | int | None" = None) -> set[str]:
         return self._collect_front_codenames(loja)
 
     def clear_front_perm_cache(self):
-        try:
-            self._collect_front_codenames.cache_clear()
-        except Exception:
-            pass
+        self.__dict__.pop("_front_mask_memo", None)
+        # invalida o bitmask em cache e os tokens com as permissões antigas
+        bump_front_perm_version(self.pk)
+
+    def __getstate__(self):
+        # o memo por requisição não vai junto para o cache (CachedJWTAuthentication)
+        state = super().__getstate__()
+        state.pop("_front_mask_memo", None)
+        return state
 
 
 class Loja(models.Model):
@@ -158,33 +211,49 @@ class Vendedor(models.Model):
     class Meta:
         verbose_name = "Vendedor"
         verbose_name_plural = "Vendedores"
+        indexes = [
+            # lista paginada por loja em ordem de nome (GET /api/vendedores/)
+            models.Index(fields=["nome_loja", "nome"], name="idx_vendedor_loja_nome"),
+        ]
 
     def __str__(self):
         return f"{self.nome} ({self.nome_loja.nome})"
 
+    WELCOME_SUBJECT = "Bem-vindo à plataforma!"
+
+    def welcome_message(self, username: str, password: str) -> str:
+        return (
+            f"Olá {self.nome},\n\n"
+            f"Seu acesso foi criado.\n"
+            f"Usuário: {username}\n"
+            f"Senha temporária: {password}\n\n"
+            f"Por favor, altere sua senha no primeiro login."
+        )
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # loja como veio do banco (sem SELECT extra para saber se ela mudou)
+        if "nome_loja_id" in instance.__dict__:
+            instance._loaded_loja_id = instance.nome_loja_id
+        return instance
+
     def save(self, *args, **kwargs):
         """
         Se ainda não existir um User vinculado, cria automaticamente.
+        Para muitos vendedores de uma vez: custom_auth.onboarding.
         """
         creating = self.pk is None or self.user_id is None
 
         super().save(*args, **kwargs)
+        self._loaded_loja_id = self.nome_loja_id
 
         if creating:
             password = get_random_string(10)
 
-            # Cria um username único por loja
-            loja_slug = slugify(self.nome_loja.nome)[:10]  # exemplo: "loja-super"
-            base_username = slugify(self.email.split("@")[0])
-            unique_username = f"{base_username}_{loja_slug}"
-
-            counter = 1
-            while User.objects.filter(username=unique_username).exists():
-                unique_username = f"{base_username}_{loja_slug}_{counter}"
-                counter += 1
-
-            user = User.objects.create_user(
-                username=unique_username,
+            # Cria um username único por loja ("<email>_<loja>[_<n>]")
+            user = create_user_with_unique_username(
+                vendedor_base_username(self.email, self.nome_loja.nome),
                 email=self.email,
                 password=password,
                 first_name=self.nome,
@@ -193,18 +262,10 @@ class Vendedor(models.Model):
             self.user = user
             super().save(update_fields=["user"])
 
-            # Envia e-mail de boas-vindas
-            message = (
-                f"Olá {self.nome},\n\n"
-                f"Seu acesso foi criado.\n"
-                f"Usuário: {user.username}\n"
-                f"Senha temporária: {password}\n\n"
-                f"Por favor, altere sua senha no primeiro login."
-            )
-            notificar_usuario(
-                destinatarios=self.email,
-                subject="Bem-vindo à plataforma!",
-                message=message,
+            # Envia a mensagem de boas-vindas (thread só do novo usuário)
+            send_private_messages(
+                self.WELCOME_SUBJECT,
+                [(user, self.welcome_message(user.username, password))],
             )
 
 
@@ -215,6 +276,8 @@ class FrontPermission(models.Model):
     id = models.BigAutoField(primary_key=True)
     name = models.CharField(max_length=255, unique=True)
     codename = models.CharField(max_length=120, unique=True)
+    # posição no bitmask de permissões (custom_auth.perm_bits.allocate_bits)
+    bit = models.PositiveIntegerField(unique=True, editable=False)
 
     class Meta:
         verbose_name = "Front permission"
@@ -223,6 +286,11 @@ class FrontPermission(models.Model):
     def __str__(self) -> str:
         return f"{self.codename} — {self.name}"
 
+    def save(self, *args, **kwargs):
+        if self.bit is None:
+            (self.bit,) = allocate_bits(1)
+        super().save(*args, **kwargs)
+
 
 class Role(models.Model):
     id = models.BigAutoField(primary_key=True)
@@ -326,6 +394,21 @@ def _cleanup_user_lojas_on_delete(sender, instance: Loja, **kwargs):
 # --------- INVALIDAÇÃO AUTOMÁTICA DO CACHE DE PERMISSÕES ---------
 
 
+@receiver([post_save, post_delete], sender=FrontPermission)
+def _reset_front_perm_registry(sender, **kwargs):
+    perm_registry.clear()
+
+
+@receiver(pre_delete, sender=FrontPermission)
+def _invalidate_masks_with_freed_bit(sender, instance: FrontPermission, **kwargs):
+    """
+    O bit volta a ficar livre e pode ser dado a outra permissão: masks e
+    tokens dos papéis que o tinham deixam de valer (o cascade apaga as linhas
+    do M2M sem m2m_changed; as UserFrontPermission disparam o post_delete).
+    """
+    bump_role_generations(instance.roles.values_list("id", flat=True))
+
+
 @receiver([post_save, post_delete], sender=UserFrontPermission)
 def _invalidate_user_perm_cache_for_direct(
     sender, instance: UserFrontPermission, **kwargs
@@ -345,18 +428,18 @@ def _invalidate_user_perm_cache_for_role(sender, instance: UserRole, **kwargs):
 
 
 @receiver(m2m_changed, sender=Role.permissions.through)
-def _invalidate_role_permissions_changed(sender, instance: Role, action, **kwargs):
-    if action not in {"post_add", "post_remove", "post_clear"}:
+def _invalidate_role_permissions_changed(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    """
+    Muda a geração dos papéis afetados: O(1) por papel, sem tocar nos membros.
+    reverse=True quando a mudança parte da FrontPermission (pk_set = papéis).
+    """
+    if action not in {"post_add", "post_remove", "pre_clear"}:
         return
-    try:
-        user_ids = list(instance.user_memberships.values_list("user_id", flat=True))
-        for uid in set(user_ids):
-            from custom_auth.models import User
-
-            try:
-                u = User.objects.get(pk=uid)
-                u.clear_front_perm_cache()
-            except User.DoesNotExist:
-                continue
-    except Exception:
-        pass
+    if not reverse:
+        bump_role_generations([instance.pk])
+    elif action == "pre_clear":
+        bump_role_generations(instance.roles.values_list("id", flat=True))
+    else:
+        bump_role_generations(pk_set or ())
@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Lower
+from django.utils.crypto import get_random_string
+
+from custom_auth.models import Loja, User, Vendedor
+from custom_auth.signals import vendedores_bulk_created
+from custom_auth.usernames import (
+    ALLOCATE_ATTEMPTS,
+    free_usernames,
+    taken_usernames,
+    vendedor_base_username,
+)
+from mail.utils import send_private_messages
+
+# Cadastro de vendedores em lote: o mesmo resultado de um Vendedor.save() por
+# pessoa (User com username "<email>_<loja>[_<n>]", senha temporária e
+# mensagem de boas-vindas), mas com os usernames resolvidos numa query,
+# os hashes de senha em paralelo e tudo gravado com bulk_create.
+
+BULK_BATCH_SIZE = 1000
+
+
+@dataclass
+class OnboardingResult:
+    # (vendedor, senha temporária), na ordem da entrada
+    created: list[tuple[Vendedor, str]] = field(default_factory=list)
+    # e-mails já cadastrados (ou repetidos na entrada)
+    skipped: list[str] = field(default_factory=list)
+
+
+def _setup_worker():
+    # processos "spawn" (macOS/Windows) começam sem o Django configurado
+    import django
+
+    django.setup()
+
+
+def password_pool(workers: Optional[int] = None, *, processes: bool = False):
+    """
+    Executor para hash_passwords. Threads bastam na maioria dos casos:
+    PBKDF2/scrypt do hashlib soltam o GIL. Processos isolam totalmente o
+    custo (ex.: hasher em Python puro) ao preço de subir os workers.
+    """
+    workers = workers or min(8, os.cpu_count() or 1)
+    if processes:
+        return ProcessPoolExecutor(max_workers=workers, initializer=_setup_worker)
+    return ThreadPoolExecutor(max_workers=workers)
+
+
+def hash_passwords(
+    passwords: list[str],
+    workers: Optional[int] = None,
+    *,
+    executor: Optional[Executor] = None,
+) -> list[str]:
+    """make_password() para uma lista de senhas, em paralelo."""
+    if executor is not None:
+        chunksize = max(1, len(passwords) // (4 * (workers or os.cpu_count() or 1)))
+        return list(executor.map(make_password, passwords, chunksize=chunksize))
+    if workers == 1 or len(passwords) < 4:
+        return [make_password(p) for p in passwords]
+    with password_pool(workers) as pool:
+        return list(pool.map(make_password, passwords))
+
+
+def _new_entries(entries: Iterable[tuple[str, str]], result: OnboardingResult):
+    wanted, seen = [], set()
+    for nome, email in entries:
+        email = email.strip()
+        key = email.lower()
+        if key in seen:
+            result.skipped.append(email)
+            continue
+        seen.add(key)
+        wanted.append((nome.strip(), email))
+    # comparação sem caixa, como a deduplicação acima
+    existing = {
+        e.lower()
+        for model in (Vendedor, User)
+        for e in model.objects.annotate(email_lower=Lower("email"))
+        .filter(email_lower__in=seen)
+        .values_list("email", flat=True)
+    }
+    fresh = []
+    for nome, email in wanted:
+        if email.lower() in existing:
+            result.skipped.append(email)
+        else:
+            fresh.append((nome, email))
+    return fresh
+
+
+def _create(loja: Loja, entries: list[tuple[str, str]], hashes: list[str]):
+    bases = [vendedor_base_username(email, loja.nome) for _, email in entries]
+    taken = taken_usernames(bases)
+    counts: dict[str, int] = {}
+    for base in bases:
+        counts[base] = counts.get(base, 0) + 1
+    free = {
+        base: iter(free_usernames(base, n, taken[base])) for base, n in counts.items()
+    }
+
+    users = User.objects.bulk_create(
+        [
+            User(
+                username=next(free[base]),
+                email=email,
+                password=password_hash,
+                first_name=nome,
+            )
+            for (nome, email), base, password_hash in zip(entries, bases, hashes)
+        ],
+        batch_size=BULK_BATCH_SIZE,
+    )
+    vendedores = Vendedor.objects.bulk_create(
+        [
+            Vendedor(user=user, nome=nome, email=email, nome_loja=loja)
+            for (nome, email), user in zip(entries, users)
+        ],
+        batch_size=BULK_BATCH_SIZE,
+    )
+    return users, vendedores
+
+
+def onboard_vendedores(
+    loja: Loja,
+    entries: Iterable[tuple[str, str]],
+    *,
+    notify: bool = True,
+    workers: Optional[int] = None,
+    executor: Optional[Executor] = None,
+) -> OnboardingResult:
+    """
+    Cria vendedores (e seus usuários) da loja a partir de pares (nome, e-mail).
+    E-mails já cadastrados são ignorados e listados em `skipped`. Tudo numa
+    transação; se outra criação simultânea tomar um dos usernames, o lote é
+    refeito com os nomes relidos (até ALLOCATE_ATTEMPTS vezes). `executor`
+    (password_pool) reaproveita os workers de hash entre vários lotes.
+    """
+    result = OnboardingResult()
+    entries = _new_entries(entries, result)
+    if not entries:
+        return result
+
+    passwords = [get_random_string(10) for _ in entries]
+    hashes = hash_passwords(passwords, workers, executor=executor)
+
+    for attempt in range(ALLOCATE_ATTEMPTS):
+        try:
+            with transaction.atomic():
+                users, vendedores = _create(loja, entries, hashes)
+                if notify:
+                    send_private_messages(
+                        Vendedor.WELCOME_SUBJECT,
+                        [
+                            (user, vendedor.welcome_message(user.username, password))
+                            for user, vendedor, password in zip(
+                                users, vendedores, passwords
+                            )
+                        ],
+                    )
+                # bulk_create não dispara post_save
+                vendedores_bulk_created.send(
+                    sender=Vendedor, loja_ids={loja.id}, vendedores=vendedores
+                )
+            break
+        except IntegrityError:
+            if attempt == ALLOCATE_ATTEMPTS - 1:
+                raise
+
+    result.created = list(zip(vendedores, passwords))
+    return result
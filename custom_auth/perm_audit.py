@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import Optional
+
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DatabaseError, transaction
+from django.db.models import Case, F, FloatField, PositiveBigIntegerField, Value, When
+from django.utils import timezone
+
+from core.stats import BatchAggregator, view_name
+
+# Auditoria das checagens de permissão (has_group_action, has_group_action_libera,
+# has_front_perm, token_has_front_perm):
+#   - por requisição: chamadas, tempo e acertos de cache de cada checagem,
+#     devolvidos no header X-Perm-Audit;
+#   - agregado por view: acumulado em memória e gravado em lote por uma
+#     thread a cada PERM_AUDIT_FLUSH_INTERVAL segundos (core.stats;
+#     PermissionAuditView/Check no admin).
+# Desligado (PERM_AUDIT_ENABLED=False) o custo é uma leitura de ContextVar.
+
+AUDIT_HEADER = "X-Perm-Audit"
+
+
+@dataclass
+class CheckStats:
+    calls: int = 0
+    seconds: float = 0.0
+    cache_hits: int = 0
+    cache_misses: int = 0
+
+    def merge(self, other: "CheckStats") -> None:
+        self.calls += other.calls
+        self.seconds += other.seconds
+        self.cache_hits += other.cache_hits
+        self.cache_misses += other.cache_misses
+
+
+@dataclass
+class AuditTrail:
+    """Checagens de permissão de uma requisição."""
+
+    checks: dict[str, CheckStats] = field(default_factory=dict)
+    # tempo só das checagens mais externas (has_perm -> has_group_action conta 1x)
+    seconds: float = 0.0
+    _stack: list[str] = field(default_factory=list)
+
+    def stats(self, name: str) -> CheckStats:
+        stats = self.checks.get(name)
+        if stats is None:
+            stats = self.checks[name] = CheckStats()
+        return stats
+
+    def header_value(self, response_seconds: float) -> str:
+        parts = [
+            f"total={self.seconds * 1000:.2f}ms",
+            f"share={self.seconds / response_seconds:.0%}" if response_seconds else "",
+        ]
+        for name, stats in sorted(self.checks.items()):
+            part = f"{name}={stats.calls}/{stats.seconds * 1000:.2f}ms"
+            lookups = stats.cache_hits + stats.cache_misses
+            if lookups:
+                part += f"/hit={stats.cache_hits / lookups:.0%}"
+            parts.append(part)
+        return "; ".join(p for p in parts if p)
+
+
+_trail: ContextVar[Optional[AuditTrail]] = ContextVar("perm_audit_trail", default=None)
+
+
+def audited(name: str):
+    """Decorator: conta e cronometra a checagem na requisição corrente."""
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            trail = _trail.get()
+            if trail is None:
+                return func(*args, **kwargs)
+            trail._stack.append(name)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                trail._stack.pop()
+                stats = trail.stats(name)
+                stats.calls += 1
+                stats.seconds += elapsed
+                if not trail._stack:
+                    trail.seconds += elapsed
+
+        return wrapper
+
+    return decorator
+
+
+def record_cache(hit: bool) -> None:
+    """Registra um acerto/erro de cache na checagem em andamento."""
+    trail = _trail.get()
+    if trail is None or not trail._stack:
+        return
+    stats = trail.stats(trail._stack[-1])
+    if hit:
+        stats.cache_hits += 1
+    else:
+        stats.cache_misses += 1
+
+
+# ---------- Agregado por view ----------
+
+
+@dataclass
+class ViewStats:
+    requests: int = 0
+    response_seconds: float = 0.0
+    permission_seconds: float = 0.0
+    checks: dict[str, CheckStats] = field(default_factory=dict)
+
+
+def _merge_trail(
+    pending: dict, view_name: str, trail: AuditTrail, response_seconds: float
+) -> None:
+    view = pending.get(view_name)
+    if view is None:
+        view = pending[view_name] = ViewStats()
+    view.requests += 1
+    view.response_seconds += response_seconds
+    view.permission_seconds += trail.seconds
+    for name, stats in trail.checks.items():
+        view.checks.setdefault(name, CheckStats()).merge(stats)
+
+
+def _by_pk(deltas: dict, output_field):
+    """Um CASE pk WHEN ... por coluna: o lote inteiro num só UPDATE."""
+    return Case(
+        *(When(pk=pk, then=Value(delta)) for pk, delta in deltas.items()),
+        default=Value(0),
+        output_field=output_field,
+    )
+
+
+def _write_audit(pending: dict[str, ViewStats]) -> None:
+    """Soma o lote aos totais (F() += delta): 2 INSERTs, 2 SELECTs, 2 UPDATEs."""
+    view_model = apps.get_model("custom_auth", "PermissionAuditView")
+    check_model = apps.get_model("custom_auth", "PermissionAuditCheck")
+    with transaction.atomic():
+        view_model.objects.bulk_create(
+            [view_model(view_name=name) for name in pending], ignore_conflicts=True
+        )
+        view_ids = dict(
+            view_model.objects.filter(view_name__in=pending).values_list(
+                "view_name", "id"
+            )
+        )
+        views = {view_ids[name]: stats for name, stats in pending.items()}
+
+        def view_delta(attr, scale=1):
+            return _by_pk(
+                {pk: getattr(s, attr) * scale for pk, s in views.items()},
+                FloatField() if scale != 1 else PositiveBigIntegerField(),
+            )
+
+        view_model.objects.filter(pk__in=views).update(
+            requests=F("requests") + view_delta("requests"),
+            response_ms=F("response_ms") + view_delta("response_seconds", 1000),
+            permission_ms=F("permission_ms") + view_delta("permission_seconds", 1000),
+            updated_at=timezone.now(),
+        )
+
+        pairs = {
+            (view_id, name): check
+            for view_id, stats in views.items()
+            for name, check in stats.checks.items()
+        }
+        if not pairs:
+            return
+        check_model.objects.bulk_create(
+            [check_model(view_id=v, check_name=n) for v, n in pairs],
+            ignore_conflicts=True,
+        )
+        checks = {
+            pk: pairs[(view_id, name)]
+            for view_id, name, pk in check_model.objects.filter(
+                view_id__in=views
+            ).values_list("view_id", "check_name", "id")
+            if (view_id, name) in pairs
+        }
+
+        def check_delta(attr, scale=1):
+            return _by_pk(
+                {pk: getattr(c, attr) * scale for pk, c in checks.items()},
+                FloatField() if scale != 1 else PositiveBigIntegerField(),
+            )
+
+        check_model.objects.filter(pk__in=checks).update(
+            calls=F("calls") + check_delta("calls"),
+            total_ms=F("total_ms") + check_delta("seconds", 1000),
+            cache_hits=F("cache_hits") + check_delta("cache_hits"),
+            cache_misses=F("cache_misses") + check_delta("cache_misses"),
+        )
+
+
+aggregator = BatchAggregator(
+    "auditoria de permissões", _merge_trail, _write_audit, errors=(DatabaseError,)
+)
+
+
+class PermissionAuditMiddleware:
+    """
+    Liga a auditoria por requisição. Com PERM_AUDIT_HEADER devolve o resumo em
+    X-Perm-Audit, ex.: "total=3.10ms; share=12%; has_front_perm=4/0.90ms/hit=75%".
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "PERM_AUDIT_ENABLED", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.header = getattr(settings, "PERM_AUDIT_HEADER", settings.DEBUG)
+        aggregator.interval = getattr(settings, "PERM_AUDIT_FLUSH_INTERVAL", 10)
+
+    def __call__(self, request):
+        trail = AuditTrail()
+        token = _trail.set(trail)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _trail.reset(token)
+        elapsed = time.perf_counter() - start
+
+        if self.header:
+            response[AUDIT_HEADER] = trail.header_value(elapsed)
+
+        aggregator.add(view_name(request), trail, elapsed)
+        return response
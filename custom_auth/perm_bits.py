@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Iterable, Optional
+
+from django.apps import apps
+
+
+def mask_from_bits(bits: Iterable[int]) -> int:
+    """Bitmask com o bit `FrontPermission.bit` ligado para cada permissão."""
+    mask = 0
+    for bit in bits:
+        mask |= 1 << bit
+    return mask
+
+
+def allocate_bits(count: int) -> list[int]:
+    """
+    Os `count` menores bits livres (1 query): os masks crescem com o número
+    de permissões, não com o maior id já usado. Um bit liberado por um
+    delete é reaproveitado; o pre_delete da FrontPermission invalida antes
+    os masks e tokens que ainda o tinham (custom_auth.models.user).
+    """
+    model = apps.get_model("custom_auth", "FrontPermission")
+    used = set(model.objects.values_list("bit", flat=True))
+    bits, candidate = [], 0
+    while len(bits) < count:
+        if candidate not in used:
+            bits.append(candidate)
+        candidate += 1
+    return bits
+
+
+class FrontPermissionRegistry:
+    """
+    Mapa codename <-> bit das FrontPermission.
+    O bit de cada permissão é a coluna `bit` (denso, ver allocate_bits), então
+    as permissões efetivas de um usuário numa loja cabem num único int
+    e checar uma permissão vira um teste de bit.
+    Carregado sob demanda (1 query) e recarregado quando FrontPermission muda
+    neste processo; permissões criadas em outro processo são descobertas
+    recarregando no "miss", no máximo a cada RELOAD_INTERVAL segundos.
+    """
+
+    RELOAD_INTERVAL = 30
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._bits: Optional[dict[str, int]] = None
+        self._names: dict[int, str] = {}
+        self._loaded_at = 0.0
+
+    def _load(self) -> dict[str, int]:
+        model = apps.get_model("custom_auth", "FrontPermission")
+        bits = dict(model.objects.values_list("codename", "bit"))
+        with self._lock:
+            self._bits = bits
+            self._names = {bit: codename for codename, bit in bits.items()}
+            self._loaded_at = time.monotonic()
+        return bits
+
+    def _reload_on_miss(self) -> bool:
+        if time.monotonic() - self._loaded_at < self.RELOAD_INTERVAL:
+            return False
+        self._load()
+        return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._bits = None
+            self._names = {}
+
+    def bit(self, codename: str) -> Optional[int]:
+        bits = self._bits if self._bits is not None else self._load()
+        if codename not in bits and self._reload_on_miss():
+            bits = self._bits
+        return bits.get(codename)
+
+    def has(self, mask: int, codename: str) -> bool:
+        bit = self.bit(codename)
+        return bit is not None and bool(mask >> bit & 1)
+
+    def mask_of(self, codenames: Iterable[str]) -> int:
+        return mask_from_bits(
+            bit for bit in (self.bit(c) for c in codenames) if bit is not None
+        )
+
+    def codenames(self, mask: int) -> set[str]:
+        if self._bits is None:
+            self._load()
+        if mask.bit_length() - 1 > max(self._names, default=-1):
+            self._reload_on_miss()
+        names = self._names
+        result = set()
+        bit = 0
+        while mask:
+            if mask & 1 and bit in names:
+                result.add(names[bit])
+            mask >>= 1
+            bit += 1
+        return result
+
+
+registry = FrontPermissionRegistry()
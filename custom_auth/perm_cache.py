@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import time
+from typing import Callable, Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from custom_auth.perm_audit import record_cache
+
+# Cache das permissões de front (bitmask por usuário/loja) com invalidação por
+# "geração": nada é apagado em massa, só os carimbos mudam.
+#   front_perm_version:<user>  -> muda com permissões diretas/papéis do usuário
+#   role_perm_gen:<role>       -> muda quando as permissões do papel mudam
+# Cada entrada guarda os carimbos com que foi calculada e só vale se eles
+# ainda forem os atuais; editar um papel com 10k membros é O(1).
+# Os carimbos mudam no on_commit e são lidos antes das permissões, então uma
+# entrada calculada com dados antigos nunca fica com o carimbo novo.
+
+_VERSION_KEY = "front_perm_version:{user_id}"
+_ROLE_GEN_KEY = "role_perm_gen:{role_id}"
+# "front_bits" (bits densos) em vez do antigo "front_mask" (bit = id)
+_MASK_KEY = "front_bits:{user_id}:{loja_id}"
+
+
+def _mask_timeout() -> int:
+    return getattr(settings, "FRONT_PERM_CACHE_TIMEOUT", 300)
+
+
+# ---------- Versão por usuário ----------
+
+
+def get_front_perm_version(user_id, create: bool = False) -> Optional[int]:
+    """
+    Versão atual das permissões de front do usuário, guardada no cache.
+    Sem versão no cache (nunca emitida ou despejada) nenhum token é confiável.
+    """
+    key = _VERSION_KEY.format(user_id=user_id)
+    version = cache.get(key)
+    if version is None and create:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_front_perm_version(user_id) -> None:
+    """Invalida permissões em cache e tokens com claims já emitidos do usuário."""
+    bump_front_perm_versions([user_id])
+
+
+def bump_front_perm_versions(user_ids) -> None:
+    """bump_front_perm_version para vários usuários numa só ida ao cache."""
+    keys = [_VERSION_KEY.format(user_id=uid) for uid in user_ids]
+
+    def bump():
+        version = time.time_ns()
+        cache.set_many({key: version for key in keys}, timeout=None)
+
+    transaction.on_commit(bump)
+
+
+# ---------- Geração por papel ----------
+
+
+def get_role_generations(role_ids: Iterable[int]) -> dict[int, int]:
+    """Geração atual de cada papel; papéis sem carimbo ganham um agora."""
+    role_ids = list(role_ids)
+    if not role_ids:
+        return {}
+    keys = {_ROLE_GEN_KEY.format(role_id=rid): rid for rid in role_ids}
+    found = cache.get_many(keys.keys())
+    missing = {key: time.time_ns() for key in keys if key not in found}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        found.update(missing)
+    return {keys[key]: gen for key, gen in found.items()}
+
+
+def bump_role_generations(role_ids: Iterable[int]) -> None:
+    """Invalida, em O(1) por papel, as permissões de todos os membros."""
+    keys = [_ROLE_GEN_KEY.format(role_id=rid) for rid in role_ids]
+
+    def bump():
+        gen = time.time_ns()
+        cache.set_many({key: gen for key in keys}, timeout=None)
+
+    transaction.on_commit(bump)
+
+
+# ---------- Bitmask em cache ----------
+
+
+def cached_front_mask(
+    user_id,
+    loja_id,
+    load_role_ids: Callable[[], list[int]],
+    compute_mask: Callable[[list[int]], int],
+) -> int:
+    """
+    Bitmask de permissões do usuário na loja (None = só globais).
+    Só consulta o banco (load_role_ids + compute_mask) se a entrada não existir
+    ou algum carimbo (usuário/papéis) tiver mudado.
+    """
+    user_version = get_front_perm_version(user_id, create=True)
+    key = _MASK_KEY.format(user_id=user_id, loja_id=loja_id or "g")
+
+    entry = cache.get(key)
+    if entry is not None:
+        version, mask, role_gens = entry
+        if version == user_version and (
+            not role_gens or get_role_generations(role_gens) == role_gens
+        ):
+            record_cache(hit=True)
+            return mask
+
+    record_cache(hit=False)
+
+    role_ids = load_role_ids()
+    role_gens = get_role_generations(role_ids)
+    mask = compute_mask(role_ids)
+    cache.set(key, (user_version, mask, role_gens), timeout=_mask_timeout())
+    return mask
@@ -6,6 +6,8 @@ from django.http import HttpRequest
 from rest_framework.permissions import SAFE_METHODS, BasePermission
 
 from custom_auth.models import GroupObjectPermission
+from custom_auth.perm_audit import audited
+from custom_auth.tokens import token_has_front_perm
 
 LOJA_KWARG = "loja_id"  # se a URL for /lojas/<loja_id>/...
 LOJA_QUERY = "loja_id"  # ?loja_id=123
@@ -55,11 +57,17 @@ class HasFrontPerm(BasePermission):
         loja_id = _extract_loja_id(request, view)
 
         user = request.user
-        return bool(
-            user
-            and user.is_authenticated
-            and user.has_front_perm(codename, loja=loja_id)
+        if not (user and user.is_authenticated):
+            return False
+
+        # Modo FRONT_PERMS_IN_TOKEN: decide só com as claims do JWT (sem banco)
+        decision = token_has_front_perm(
+            getattr(request, "auth", None), codename, loja_id
         )
+        if decision is not None:
+            return decision
+
+        return user.has_front_perm(codename, loja=loja_id)
 
 
 class IsSelfOrAdmin(BasePermission):
@@ -76,6 +84,7 @@ class IsReadOnlyOrAdmin(BasePermission):
         )
 
 
+@audited("has_group_action")
 def has_group_action(user, model_name: str, action: str) -> bool:
     """
     Verifica se o usuário possui permissão (por grupo ou direta)
@@ -120,6 +129,7 @@ def has_group_action(user, model_name: str, action: str) -> bool:
     return False
 
 
+@audited("has_group_action_libera")
 def has_group_action_libera(user, model_name: str, action_name: str) -> bool:
     """
     Variante usada para validar 'actions' customizadas no Django Admin.
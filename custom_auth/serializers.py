@@ -1,7 +1,13 @@
+import json
+
+from django.conf import settings
 from django.contrib.auth import get_user_model, password_validation
 from django.contrib.auth.models import Group
 from rest_framework import serializers
 
+from .models import FrontPermission, Loja, Role
+from .vendor_import import FORMATS, parse_vendedores
+
 User = get_user_model()
 
 
@@ -84,3 +90,93 @@ class PasswordResetConfirmSerializer(serializers.Serializer):
         # valida força
         password_validation.validate_password(attrs["new_password"])
         return attrs
+
+
+class BulkAssignmentSerializer(serializers.Serializer):
+    """
+    Ids em listas simples (validados com 1 query por lista, não 1 por id).
+    lojas vazia + include_global omitido = atribuição global.
+    """
+
+    users = serializers.ListField(child=serializers.IntegerField(), allow_empty=False)
+    roles = serializers.ListField(
+        child=serializers.IntegerField(), required=False, default=list
+    )
+    permissions = serializers.ListField(
+        child=serializers.IntegerField(), required=False, default=list
+    )
+    lojas = serializers.ListField(
+        child=serializers.IntegerField(), required=False, default=list
+    )
+    include_global = serializers.BooleanField(
+        required=False, allow_null=True, default=None
+    )
+
+    @staticmethod
+    def _existing(model, ids, field_name):
+        ids = set(ids)
+        found = set(model.objects.filter(pk__in=ids).values_list("pk", flat=True))
+        missing = ids - found
+        if missing:
+            raise serializers.ValidationError(
+                {field_name: f"Ids inexistentes: {sorted(missing)}"}
+            )
+        return sorted(ids)
+
+    def validate(self, attrs):
+        if not attrs["roles"] and not attrs["permissions"]:
+            raise serializers.ValidationError(
+                "Informe ao menos um papel (roles) ou permissão (permissions)."
+            )
+        attrs["users"] = self._existing(User, attrs["users"], "users")
+        attrs["roles"] = self._existing(Role, attrs["roles"], "roles")
+        attrs["permissions"] = self._existing(
+            FrontPermission, attrs["permissions"], "permissions"
+        )
+        lojas = self._existing(Loja, attrs["lojas"], "lojas")
+
+        include_global = attrs["include_global"]
+        if include_global is None:
+            include_global = not lojas
+        attrs["loja_ids"] = lojas + ([None] if include_global else [])
+        return attrs
+
+
+class VendedorImportSerializer(serializers.Serializer):
+    """
+    Arquivo (multipart: file + format) ou lista JSON em `vendedores`
+    ([{"nome": ..., "email": ...}]). Linhas inválidas voltam em `invalid`;
+    com notify=false, as senhas temporárias voltam em `credentials`.
+    """
+
+    loja = serializers.PrimaryKeyRelatedField(queryset=Loja.objects.all())
+    file = serializers.FileField(required=False)
+    format = serializers.ChoiceField(choices=FORMATS, default="csv")
+    vendedores = serializers.ListField(
+        child=serializers.DictField(), required=False, allow_empty=False
+    )
+    notify = serializers.BooleanField(default=True)
+
+    def validate(self, attrs):
+        upload = attrs.pop("file", None)
+        vendedores = attrs.pop("vendedores", None)
+        if (upload is None) == (vendedores is None):
+            raise serializers.ValidationError(
+                "Envie um arquivo (file) ou a lista vendedores, não os dois."
+            )
+        try:
+            if upload is not None:
+                content = upload.read().decode("utf-8-sig")
+                rows, invalid = parse_vendedores(content, attrs["format"])
+            else:
+                rows, invalid = parse_vendedores(json.dumps(vendedores), "json")
+        except (UnicodeDecodeError, ValueError) as exc:
+            raise serializers.ValidationError({"file": str(exc)})
+
+        limit = settings.VENDEDOR_IMPORT_MAX_ROWS
+        if len(rows) > limit:
+            raise serializers.ValidationError(
+                f"Mais de {limit} vendedores: use `manage.py import_vendedores`."
+            )
+        attrs["rows"], attrs["invalid"] = rows, invalid
+        return attrs
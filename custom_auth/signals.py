@@ -1,10 +1,15 @@
 from django.contrib.auth.models import Group, Permission
 from django.contrib.contenttypes.models import ContentType
-from django.db.models.signals import post_migrate
-from django.dispatch import receiver
+from django.db.models.signals import post_delete, post_migrate, post_save
+from django.dispatch import Signal, receiver
 
+from .authentication import bump_user_cache_version
 from .models import User
 
+# Enviado por custom_auth.onboarding depois de criar vendedores com bulk_create
+# (que não dispara post_save). kwargs: loja_ids, vendedores.
+vendedores_bulk_created = Signal()
+
 DEFAULT_GROUPS = {
     "Administrators": {
         "permissions": ["add_user", "change_user", "delete_user", "view_user"],
@@ -37,3 +42,12 @@ def create_default_groups(sender, **kwargs):
             [perms_by_codename[c] for c in cfg["permissions"] if c in perms_by_codename]
         )
         group.save()
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_cached_jwt_user(sender, instance: User, **kwargs):
+    """
+    Qualquer alteração no usuário (senha, is_active, dados) invalida a cópia
+    usada pelo CachedJWTAuthentication.
+    """
+    bump_user_cache_version(instance.pk)
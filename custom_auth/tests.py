@@ -1,3 +1,713 @@
-from django.test import TestCase
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import authenticate, get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import ResolverMatch, reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.stats import NO_ROUTE, view_name
+from custom_auth import onboarding
+from custom_auth.assignments import bulk_assign
+from custom_auth.authentication import CachedJWTAuthentication
+from custom_auth.backends import EmailOrUsernameModelBackend
+from custom_auth.models import (
+    FrontPermission,
+    Loja,
+    PermissionAuditView,
+    Role,
+    UserFrontPermission,
+    UserRole,
+    Vendedor,
+)
+from custom_auth.perm_audit import (
+    AUDIT_HEADER,
+    AuditTrail,
+    CheckStats,
+    PermissionAuditMiddleware,
+    _merge_trail,
+    _write_audit,
+    aggregator,
+)
+from custom_auth.perm_bits import registry as perm_registry
+from custom_auth.tokens import (
+    FrontPermsTokenObtainPairSerializer,
+    encode_front_perms,
+    token_has_front_perm,
+)
+from custom_auth.usernames import taken_usernames
+from custom_auth.vendor_import import import_vendedores, parse_vendedores
+from mail.models.mailbox import Message
+
+User = get_user_model()
+
+
+class EmailOrUsernameBackendTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # o username de um é o e-mail do outro
+        cls.by_username = User.objects.create_user(
+            username="joao@example.com", email="outro@example.com", password="a"
+        )
+        cls.by_email = User.objects.create_user(
+            username="joao", email="Joao@Example.com", password="b"
+        )
+
+    def test_email_match_wins_over_username_match(self):
+        backend = EmailOrUsernameModelBackend()
+        self.assertEqual(backend.get_user_by_login("JOAO@example.com"), self.by_email)
+
+    def test_authenticate_uses_email_owner(self):
+        self.assertEqual(
+            authenticate(username="joao@example.com", password="b"), self.by_email
+        )
+        self.assertIsNone(authenticate(username="joao@example.com", password="a"))
+
+    def test_username_login(self):
+        self.assertEqual(authenticate(username="JOAO", password="b"), self.by_email)
+        self.assertIsNone(authenticate(username="ninguem", password="b"))
+
+
+class LoginTimingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username="ana", email="ana@example.com", password="senha-123"
+        )
+
+    def test_unknown_login_still_runs_the_hasher(self):
+        for password in ("qualquer", None):
+            with mock.patch(
+                "django.contrib.auth.base_user.make_password", wraps=make_password
+            ) as hashed:
+                self.assertIsNone(authenticate(username="ninguem", password=password))
+            ((raw,), _) = hashed.call_args
+            self.assertIsInstance(raw, str)
+
+    def test_login_is_not_stripped(self):
+        self.assertIsNone(authenticate(username=" ana ", password="senha-123"))
+        self.assertEqual(authenticate(username="ANA", password="senha-123"), self.user)
+
+    def test_login_rehashes_with_current_iterations(self):
+        with override_settings(PASSWORD_PBKDF2_ITERATIONS=1000):
+            self.user.set_password("senha-123")
+            self.user.save()
+        self.assertIn("$1000$", self.user.password)
+
+        with override_settings(PASSWORD_PBKDF2_ITERATIONS=1200):
+            self.assertEqual(
+                authenticate(username="ana@example.com", password="senha-123"),
+                self.user,
+            )
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith("pbkdf2_sha256$1200$"))
+
+
+class FrontPermissionBitTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        perm_registry.clear()
+        self.user = User.objects.create_user(
+            username="ana", email="ana@example.com", password="x"
+        )
+
+    def create_perms(self, *codenames):
+        return [
+            FrontPermission.objects.create(codename=c, name=c.title())
+            for c in codenames
+        ]
+
+    def test_bits_are_dense_and_reused(self):
+        a, b, c = self.create_perms("a", "b", "c")
+        self.assertEqual([a.bit, b.bit, c.bit], [0, 1, 2])
+        b.delete()
+        (d,) = self.create_perms("d")
+        self.assertEqual(d.bit, 1)
+
+    def test_token_claim_does_not_grow_with_ids(self):
+        for i in range(20):
+            self.create_perms(f"tmp{i}")
+        FrontPermission.objects.all().delete()
+        (perm,) = self.create_perms("vendas.ver")
+        self.assertGreater(perm.pk, 20)
+        UserFrontPermission.objects.create(user=self.user, permission=perm)
+        self.assertEqual(encode_front_perms(self.user), {"g": "1"})
+
+    def test_freed_bit_is_not_inherited_by_role_members(self):
+        old, keep = self.create_perms("old", "keep")
+        role = Role.objects.create(name="caixa")
+        with self.captureOnCommitCallbacks(execute=True):
+            role.permissions.set([old, keep])
+            UserRole.objects.create(user=self.user, role=role)
+        self.assertTrue(User.objects.get(pk=self.user.pk).has_front_perm("old"))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            old.delete()
+        (new,) = self.create_perms("new")
+        self.assertEqual(new.bit, old.bit)
+
+        user = User.objects.get(pk=self.user.pk)
+        self.assertFalse(user.has_front_perm("new"))
+        self.assertTrue(user.has_front_perm("keep"))
+
+
+class RoleGenerationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        perm_registry.clear()
+        self.user = User.objects.create_user(
+            username="ana", email="ana@example.com", password="x"
+        )
+        self.vender = FrontPermission.objects.create(codename="vender", name="V")
+        self.estornar = FrontPermission.objects.create(codename="estornar", name="E")
+        self.role = Role.objects.create(name="caixa")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.role.permissions.set([self.vender])
+            UserRole.objects.create(user=self.user, role=self.role)
+
+    def has(self, codename):
+        # instância nova: sem o memo por requisição, só o cache compartilhado
+        return User.objects.get(pk=self.user.pk).has_front_perm(codename)
+
+    def token(self):
+        return FrontPermsTokenObtainPairSerializer.get_token(self.user).access_token
+
+    def test_cached_mask_is_reused_until_the_role_changes(self):
+        self.assertFalse(self.has("estornar"))
+        user = User.objects.get(pk=self.user.pk)
+        with self.assertNumQueries(0):
+            self.assertFalse(user.has_front_perm("estornar"))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.role.permissions.add(self.estornar)
+        self.assertTrue(self.has("estornar"))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.estornar.roles.remove(self.role)
+        self.assertFalse(self.has("estornar"))
+
+    def test_membership_change_invalidates_cached_mask(self):
+        self.assertTrue(self.has("vender"))
+        with self.captureOnCommitCallbacks(execute=True):
+            UserRole.objects.filter(user=self.user).delete()
+        self.assertFalse(self.has("vender"))
+
+        gerente = Role.objects.create(name="gerente")
+        with self.captureOnCommitCallbacks(execute=True):
+            gerente.permissions.set([self.estornar])
+            UserRole.objects.create(user=self.user, role=gerente)
+        self.assertTrue(self.has("estornar"))
+
+    @override_settings(FRONT_PERMS_IN_TOKEN=True)
+    def test_role_change_revokes_issued_tokens(self):
+        token = self.token()
+        self.assertIs(token_has_front_perm(token, "vender"), True)
+        self.assertIs(token_has_front_perm(token, "estornar"), False)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.role.permissions.add(self.estornar)
+        # o token não decide mais: o chamador cai para has_front_perm()
+        self.assertIsNone(token_has_front_perm(token, "vender"))
+        self.assertIs(token_has_front_perm(self.token(), "estornar"), True)
+
+    @override_settings(FRONT_PERMS_IN_TOKEN=True)
+    def test_membership_change_revokes_issued_tokens(self):
+        token = self.token()
+        with self.captureOnCommitCallbacks(execute=True):
+            UserRole.objects.filter(user=self.user).delete()
+        self.assertIsNone(token_has_front_perm(token, "vender"))
+        self.assertIs(token_has_front_perm(self.token(), "vender"), False)
+
+
+@override_settings(FRONT_PERMS_IN_TOKEN=True)
+class FrontPermsTokenTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        perm_registry.clear()
+        self.user = User.objects.create_user(
+            username="ana", email="ana@example.com", password="x"
+        )
+        owner = User.objects.create_user(username="dono", password="x")
+        self.loja = Loja.objects.create(nome="Centro", dono=owner)
+        self.other_loja = Loja.objects.create(nome="Norte", dono=owner)
+        self.vender = FrontPermission.objects.create(codename="vender", name="V")
+        self.estornar = FrontPermission.objects.create(codename="estornar", name="E")
+        self.relatorio = FrontPermission.objects.create(codename="relatorio", name="R")
+        self.role = Role.objects.create(name="gerente")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.role.permissions.set([self.relatorio])
+            UserRole.objects.create(user=self.user, role=self.role, loja=self.loja)
+            UserFrontPermission.objects.create(user=self.user, permission=self.vender)
+            UserFrontPermission.objects.create(
+                user=self.user, permission=self.estornar, loja=self.loja
+            )
+
+    def token(self):
+        return FrontPermsTokenObtainPairSerializer.get_token(self.user).access_token
+
+    def test_claims_decide_without_queries(self):
+        token = self.token()
+        perm_registry.codenames(0)  # registro carregado uma vez por processo
+        with self.assertNumQueries(0):
+            self.assertIs(token_has_front_perm(token, "vender"), True)
+            self.assertIs(
+                token_has_front_perm(token, "vender", self.other_loja.pk), True
+            )
+            self.assertIs(token_has_front_perm(token, "estornar"), False)
+            self.assertIs(token_has_front_perm(token, "estornar", self.loja.pk), True)
+            self.assertIs(
+                token_has_front_perm(token, "estornar", self.other_loja.pk), False
+            )
+            self.assertIs(token_has_front_perm(token, "relatorio", self.loja.pk), True)
+            self.assertIs(token_has_front_perm(token, "relatorio"), False)
+
+    def test_direct_permission_change_revokes_token(self):
+        token = self.token()
+        with self.captureOnCommitCallbacks(execute=True):
+            UserFrontPermission.objects.filter(permission=self.vender).delete()
+        self.assertIsNone(token_has_front_perm(token, "vender"))
+        self.assertIs(token_has_front_perm(self.token(), "vender"), False)
+
+    def test_role_change_revokes_token(self):
+        token = self.token()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.role.permissions.remove(self.relatorio)
+        self.assertIsNone(token_has_front_perm(token, "relatorio", self.loja.pk))
+        self.assertIs(
+            token_has_front_perm(self.token(), "relatorio", self.loja.pk), False
+        )
+
+    def test_token_without_claims_or_mode_off_does_not_decide(self):
+        token = self.token()
+        with override_settings(FRONT_PERMS_IN_TOKEN=False):
+            self.assertIsNone(token_has_front_perm(token, "vender"))
+            plain = FrontPermsTokenObtainPairSerializer.get_token(self.user)
+        self.assertIsNone(token_has_front_perm(plain.access_token, "vender"))
+
+    def test_evicted_version_does_not_decide(self):
+        token = self.token()
+        cache.clear()
+        self.assertIsNone(token_has_front_perm(token, "vender"))
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="ana", password="x")
+        self.auth = CachedJWTAuthentication()
+        self.token = AccessToken.for_user(self.user)
+
+    def test_cached_user_is_served_without_queries(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self.auth.get_user(self.token), self.user)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.auth.get_user(self.token), self.user)
+
+    def test_password_change_drops_cached_user(self):
+        self.auth.get_user(self.token)
+        self.user.set_password("nova")
+        self.user.save()
+        with self.assertNumQueries(1):
+            cached = self.auth.get_user(self.token)
+        self.assertTrue(cached.check_password("nova"))
+
+    def test_deactivation_rejects_cached_user(self):
+        self.auth.get_user(self.token)
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.get_user(self.token)
+
+    def test_queryset_update_invalidates_cached_user(self):
+        self.auth.get_user(self.token)
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.get_user(self.token)
+
+
+class BulkAssignTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_superuser(
+            username="admin", email="admin@example.com", password="x"
+        )
+        self.ana = User.objects.create_user(
+            username="ana", email="ana@example.com", password="x"
+        )
+        self.bia = User.objects.create_user(
+            username="bia", email="bia@example.com", password="x"
+        )
+        self.centro = Loja.objects.create(nome="Centro", dono=self.admin)
+        self.norte = Loja.objects.create(nome="Norte", dono=self.admin)
+        self.role = Role.objects.create(name="gerente")
+        self.vender = FrontPermission.objects.create(codename="vender", name="V")
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def post(self, payload):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(
+                reverse("permissions_bulk_assign"), payload, format="json"
+            )
+
+    def test_existing_rows_are_skipped_including_global_scope(self):
+        UserRole.objects.create(user=self.ana, role=self.role, loja=None)
+        UserRole.objects.create(user=self.ana, role=self.role, loja=self.centro)
+
+        result = bulk_assign(
+            [self.ana.pk, self.bia.pk],
+            role_ids=[self.role.pk],
+            loja_ids=[None, self.centro.pk],
+        )
+
+        self.assertEqual(result["roles_created"], 2)
+        self.assertEqual(result["users_affected"], 1)
+        self.assertEqual(UserRole.objects.filter(user=self.ana).count(), 2)
+        self.assertEqual(
+            set(UserRole.objects.filter(user=self.bia).values_list("loja", flat=True)),
+            {None, self.centro.pk},
+        )
+
+    def test_include_global_defaults_to_lojas_being_empty(self):
+        response = self.post({"users": [self.ana.pk], "permissions": [self.vender.pk]})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            list(UserFrontPermission.objects.values_list("loja", flat=True)), [None]
+        )
+
+        UserFrontPermission.objects.all().delete()
+        self.post(
+            {
+                "users": [self.ana.pk],
+                "permissions": [self.vender.pk],
+                "lojas": [self.norte.pk],
+            }
+        )
+        self.assertEqual(
+            list(UserFrontPermission.objects.values_list("loja", flat=True)),
+            [self.norte.pk],
+        )
+
+        UserFrontPermission.objects.all().delete()
+        self.post(
+            {
+                "users": [self.ana.pk],
+                "permissions": [self.vender.pk],
+                "lojas": [self.norte.pk],
+                "include_global": True,
+            }
+        )
+        self.assertEqual(
+            set(UserFrontPermission.objects.values_list("loja", flat=True)),
+            {None, self.norte.pk},
+        )
+
+    def test_unknown_ids_are_rejected(self):
+        response = self.post(
+            {"users": [self.ana.pk, 999999], "roles": [self.role.pk], "lojas": [888]}
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("999999", str(response.data["users"]))
+        self.assertFalse(UserRole.objects.exists())
+
+        response = self.post({"users": [self.ana.pk]})
+        self.assertEqual(response.status_code, 400)
+
+    def test_invalidates_once_per_affected_user_after_commit(self):
+        UserRole.objects.create(user=self.ana, role=self.role, loja=None)
+        with mock.patch(
+            "custom_auth.assignments.bump_front_perm_versions"
+        ) as bump, self.captureOnCommitCallbacks(execute=True):
+            result = bulk_assign(
+                [self.ana.pk, self.bia.pk, self.admin.pk],
+                role_ids=[self.role.pk],
+                permission_ids=[self.vender.pk],
+            )
+            bump.assert_not_called()
+
+        self.assertEqual(result["users_affected"], 3)
+        bump.assert_called_once()
+        self.assertEqual(
+            set(bump.call_args.args[0]), {self.ana.pk, self.bia.pk, self.admin.pk}
+        )
+
+
+class SeedFrontPermsTests(TestCase):
+    def seed(self, desired):
+        out, err = StringIO(), StringIO()
+        with mock.patch(
+            "custom_auth.management.commands.seed_front_perms"
+            ".desired_front_permissions",
+            return_value=desired,
+        ):
+            call_command("seed_front_perms", stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def test_new_codenames_sharing_a_name_are_reported(self):
+        out, err = self.seed(
+            {"a.item.view": "Listar Item", "b.item.view": "Listar Item"}
+        )
+        self.assertEqual(
+            list(FrontPermission.objects.values_list("codename", flat=True)),
+            ["a.item.view"],
+        )
+        self.assertIn("b.item.view", err)
+        self.assertIn("a.item.view", err)
+        self.assertIn("1 novas", out)
+
+    def test_name_taken_by_existing_permission_is_reported(self):
+        FrontPermission.objects.create(codename="manual", name="Listar Item")
+        out, err = self.seed({"a.item.view": "Listar Item"})
+        self.assertFalse(FrontPermission.objects.filter(codename="a.item.view"))
+        self.assertIn("manual", err)
+
+
+class PermissionAuditWriteTests(TestCase):
+    def trail(self, **checks):
+        trail = AuditTrail(seconds=0.002)
+        for name, calls in checks.items():
+            trail.checks[name] = CheckStats(
+                calls=calls, seconds=0.001, cache_hits=calls, cache_misses=0
+            )
+        return trail
+
+    def test_batch_is_added_to_existing_totals(self):
+        for _ in range(2):
+            pending = {}
+            _merge_trail(pending, "api:a", self.trail(has_front_perm=2), 0.01)
+            _merge_trail(pending, "api:a", self.trail(has_front_perm=1), 0.01)
+            _merge_trail(pending, "api:b", self.trail(), 0.01)
+            with self.assertNumQueries(6 + 2):  # + SAVEPOINT/RELEASE
+                _write_audit(pending)
+
+        a = PermissionAuditView.objects.get(view_name="api:a")
+        self.assertEqual(a.requests, 4)
+        self.assertAlmostEqual(a.response_ms, 40)
+        self.assertAlmostEqual(a.permission_ms, 8)
+        check = a.checks.get(check_name="has_front_perm")
+        self.assertEqual((check.calls, check.cache_hits), (6, 6))
+        self.assertEqual(PermissionAuditView.objects.get(view_name="api:b").requests, 2)
+
+    def test_middleware_is_off_by_default(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            PermissionAuditMiddleware(lambda request: HttpResponse())
+
+    @override_settings(PERM_AUDIT_ENABLED=True, PERM_AUDIT_HEADER=True)
+    def test_middleware_reports_and_records_checks(self):
+        cache.clear()
+        perm_registry.clear()
+        user = User.objects.create_user(username="ana", password="x")
+        FrontPermission.objects.create(codename="vender", name="V")
+
+        def view(request):
+            user.has_front_perm("vender")
+            user.has_front_perm("vender")
+            return HttpResponse()
+
+        request = RequestFactory().get("/x/")
+        request.resolver_match = ResolverMatch(
+            lambda r: None, (), {}, url_name="x", route="x/"
+        )
+        response = PermissionAuditMiddleware(view)(request)
+        aggregator.flush()
+
+        self.assertIn("has_front_perm=2/", response[AUDIT_HEADER])
+        audit = PermissionAuditView.objects.get(view_name="x")
+        self.assertEqual(audit.requests, 1)
+        self.assertEqual(audit.checks.get(check_name="has_front_perm").calls, 2)
+
+    def test_view_name_uses_route_not_private_func_path(self):
+        request = RequestFactory().get("/x/")
+        self.assertEqual(view_name(request), NO_ROUTE)
+        request.resolver_match = ResolverMatch(lambda r: None, (), {}, route="x/")
+        self.assertEqual(view_name(request), "x/")
+        request.resolver_match = ResolverMatch(
+            lambda r: None, (), {}, url_name="x", route="x/"
+        )
+        self.assertEqual(view_name(request), "x")
+
+
+class OnboardingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        owner = User.objects.create_user(username="dono", password="x")
+        cls.loja = Loja.objects.create(nome="Centro", dono=owner)
+
+    def onboard(self, entries, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return onboarding.onboard_vendedores(self.loja, entries, **kwargs)
+
+    def usernames(self, result):
+        return [vendedor.user.username for vendedor, _ in result.created]
+
+    def take(self, username):
+        User.objects.create_user(
+            username=username, email=f"{username}@outro.com", password="x"
+        )
+
+    def test_usernames_take_the_first_free_suffixes(self):
+        self.take("ana_centro")
+        self.take("ana_centro_2")
+        result = self.onboard(
+            [("Ana", "ana@a.com"), ("Ana B", "ana@b.com"), ("Ana C", "ana@c.com")]
+        )
+        self.assertEqual(
+            self.usernames(result), ["ana_centro_1", "ana_centro_3", "ana_centro_4"]
+        )
+
+    def test_created_users_log_in_and_get_welcome_message(self):
+        result = self.onboard([("Bia", "bia@example.com")])
+        ((vendedor, password),) = result.created
+        self.assertEqual(
+            authenticate(username="bia@example.com", password=password), vendedor.user
+        )
+        message = Message.objects.get(recipient=vendedor.user)
+        self.assertIn(password, message.body)
+
+    def test_existing_and_repeated_emails_are_skipped(self):
+        self.onboard([("Ana", "ana@example.com")])
+        result = self.onboard(
+            [
+                ("Ana", "ANA@example.com"),
+                ("Bia", "bia@example.com"),
+                ("Bia 2", "Bia@Example.com"),
+            ]
+        )
+        self.assertEqual(self.usernames(result), ["bia_centro"])
+        self.assertCountEqual(result.skipped, ["ANA@example.com", "Bia@Example.com"])
+
+    def test_username_race_is_retried_with_fresh_names(self):
+        # outra transação levou "ana_centro" depois da leitura dos usernames
+        self.take("ana_centro")
+        reads = []
+
+        def stale_then_real(bases):
+            reads.append(bases)
+            if len(reads) == 1:
+                return {base: set() for base in bases}
+            return taken_usernames(bases)
+
+        with mock.patch.object(onboarding, "taken_usernames", stale_then_real):
+            result = self.onboard([("Ana", "ana@example.com")])
+        self.assertEqual(len(reads), 2)
+        self.assertEqual(self.usernames(result), ["ana_centro_1"])
+        self.assertEqual(Vendedor.objects.filter(nome_loja=self.loja).count(), 1)
+
+    def test_gives_up_after_allocate_attempts(self):
+        self.take("ana_centro")
+        stale = mock.Mock(side_effect=lambda bases: {b: set() for b in bases})
+        with mock.patch.object(onboarding, "taken_usernames", stale):
+            with self.assertRaises(IntegrityError):
+                self.onboard([("Ana", "ana@example.com")])
+        self.assertEqual(stale.call_count, onboarding.ALLOCATE_ATTEMPTS)
+        self.assertFalse(Vendedor.objects.exists())
+
+
+class VendedorImportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(
+            username="admin", email="admin@example.com", password="x"
+        )
+        cls.loja = Loja.objects.create(nome="Centro", dono=cls.admin)
+
+    def import_rows(self, rows, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return import_vendedores(self.loja, rows, workers=1, **kwargs)
+
+    def test_csv_errors_are_reported_by_line(self):
+        content = (
+            "Nome,E-mail\n"  # cabeçalho sem "email": todas as linhas sem e-mail
+            "Ana,ana@example.com\n"
+        )
+        rows, errors = parse_vendedores(content, "csv")
+        self.assertEqual(rows, [])
+        self.assertEqual(errors, [(2, "e-mail inválido: ''")])
+
+        content = "nome,email\nAna,ana@example.com\n,sem@nome.com\nBia,bia@\n"
+        rows, errors = parse_vendedores(content, "csv")
+        self.assertEqual(rows, [("Ana", "ana@example.com")])
+        self.assertEqual(errors, [(3, "nome vazio"), (4, "e-mail inválido: 'bia@'")])
+
+    def test_json_errors(self):
+        rows, errors = parse_vendedores(
+            '[{"nome": "Ana", "email": "ana@example.com"}, "x"]', "json"
+        )
+        self.assertEqual(rows, [("Ana", "ana@example.com")])
+        self.assertEqual(errors, [(2, "nome vazio")])
+        for content in ("[{", '{"nome": "Ana"}'):
+            with self.assertRaises(ValueError):
+                parse_vendedores(content, "json")
+        with self.assertRaises(ValueError):
+            parse_vendedores("", "xml")
+
+    def test_duplicates_across_chunks_are_skipped(self):
+        result = self.import_rows(
+            [
+                ("Ana", "ana@example.com"),
+                ("Bia", "bia@example.com"),
+                ("Ana de novo", "Ana@Example.com"),
+            ],
+            chunk_size=1,
+        )
+        self.assertEqual((result.created, result.chunks), (2, 3))
+        self.assertEqual(result.skipped, ["Ana@Example.com"])
+        self.assertEqual(Vendedor.objects.filter(nome_loja=self.loja).count(), 2)
+
+    def test_without_notify_credentials_are_returned(self):
+        result = self.import_rows([("Ana", "ana@example.com")], notify=False)
+        ((email, username, password),) = result.credentials
+        self.assertEqual((email, username), ("ana@example.com", "ana_centro"))
+        self.assertIsNotNone(authenticate(username=username, password=password))
+        self.assertFalse(Message.objects.exists())
+
+        notified = self.import_rows([("Bia", "bia@example.com")])
+        self.assertEqual(notified.credentials, [])
+
+    def test_endpoint_returns_credentials_without_notify(self):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        response = client.post(
+            reverse("vendedores_import"),
+            {
+                "loja": self.loja.pk,
+                "notify": False,
+                "vendedores": [{"nome": "Ana", "email": "ana@example.com"}],
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201, response.data)
+        (credential,) = response.data["credentials"]
+        self.assertIsNotNone(
+            authenticate(username=credential["email"], password=credential["password"])
+        )
+
+    def test_command_requires_credentials_file_without_notify(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, "vendedores.csv")
+            with open(source, "w") as f:
+                f.write("nome,email\nAna,ana@example.com\n")
+            args = [source, "--loja", str(self.loja.pk), "--threads", "--no-notify"]
+            with self.assertRaises(CommandError):
+                call_command("import_vendedores", *args, stdout=StringIO())
+
+            out = os.path.join(tmp, "senhas.csv")
+            call_command(
+                "import_vendedores", *args, "--credentials", out, stdout=StringIO()
+            )
+            with open(out) as f:
+                header, line = f.read().splitlines()
+            self.assertEqual(header, "email,username,senha")
+            email, username, password = line.split(",")
+            self.assertIsNotNone(authenticate(username=username, password=password))
+            self.assertEqual(os.stat(out).st_mode & 0o777, 0o600)
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+from typing import Optional
+
+from django.conf import settings
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.settings import api_settings
+
+from custom_auth.models import UserFrontPermission, UserRole
+from custom_auth.perm_audit import audited, record_cache
+from custom_auth.perm_bits import registry as perm_registry
+from custom_auth.perm_cache import get_front_perm_version, get_role_generations
+
+# Claims do modo "permissões no token" (settings.FRONT_PERMS_IN_TOKEN);
+# "fpb" (bits densos) substitui o antigo "fp" (bit = id), que fica ignorado.
+FRONT_PERMS_CLAIM = "fpb"
+FRONT_PERMS_VERSION_CLAIM = "fpv"
+FRONT_PERMS_ROLES_CLAIM = "fpr"
+GLOBAL_SCOPE = "g"
+
+
+def front_perms_in_token_enabled() -> bool:
+    return getattr(settings, "FRONT_PERMS_IN_TOKEN", False)
+
+
+# ---------- Codificação das claims ----------
+
+
+def encode_front_perms(user) -> dict[str, str]:
+    """
+    Permissões efetivas do usuário em formato compacto: bitmasks em hex
+    (bit = FrontPermission.bit, ver custom_auth.perm_bits):
+      {"g": <globais>, "<loja_id>": <apenas as específicas da loja>}
+    As globais valem em qualquer loja e não se repetem por loja.
+    """
+    pairs = set(
+        UserFrontPermission.objects.filter(user=user).values_list(
+            "loja_id", "permission__bit"
+        )
+    )
+    pairs |= set(
+        UserRole.objects.filter(user=user, role__permissions__isnull=False).values_list(
+            "loja_id", "role__permissions__bit"
+        )
+    )
+
+    masks: dict[str, int] = {}
+    for loja_id, bit in pairs:
+        scope = GLOBAL_SCOPE if loja_id is None else str(loja_id)
+        masks[scope] = masks.get(scope, 0) | 1 << bit
+
+    global_mask = masks.get(GLOBAL_SCOPE, 0)
+    return {
+        scope: format(mask if scope == GLOBAL_SCOPE else mask & ~global_mask, "x")
+        for scope, mask in masks.items()
+    }
+
+
+def encode_role_generations(user) -> dict[str, int]:
+    """Geração (custom_auth.perm_cache) de cada papel do usuário, por id."""
+    role_ids = UserRole.objects.filter(user=user).values_list("role_id", flat=True)
+    return {
+        str(role_id): gen
+        for role_id, gen in get_role_generations(set(role_ids)).items()
+    }
+
+
+def _role_generations_current(role_gens: dict) -> bool:
+    if not role_gens:
+        return True
+    current = get_role_generations(int(role_id) for role_id in role_gens)
+    return all(current.get(int(role_id)) == gen for role_id, gen in role_gens.items())
+
+
+@audited("token_has_front_perm")
+def token_has_front_perm(token, codename: str, loja_id=None) -> Optional[bool]:
+    """
+    Decide a permissão só com o token.
+    Retorna None quando o token não pode decidir (modo desligado, sem claims,
+    versão do usuário ou geração de algum papel mudou) — aí o chamador deve
+    cair para user.has_front_perm().
+    """
+    if token is None or not front_perms_in_token_enabled():
+        return None
+    try:
+        claims = token.get(FRONT_PERMS_CLAIM)
+        version = token.get(FRONT_PERMS_VERSION_CLAIM)
+        user_id = token.get(api_settings.USER_ID_CLAIM)
+        role_gens = token.get(FRONT_PERMS_ROLES_CLAIM) or {}
+    except AttributeError:
+        return None
+    if claims is None or version is None or user_id is None:
+        return None
+    if get_front_perm_version(user_id) != version or not _role_generations_current(
+        role_gens
+    ):
+        record_cache(hit=False)
+        return None
+    record_cache(hit=True)
+
+    mask = int(claims.get(GLOBAL_SCOPE, "0"), 16)
+    if loja_id is not None:
+        mask |= int(claims.get(str(loja_id), "0"), 16)
+    return perm_registry.has(mask, codename)
+
+
+class FrontPermsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """
+    TokenObtainPairSerializer que, com FRONT_PERMS_IN_TOKEN ligado, embute as
+    permissões de front (por loja), a versão delas e a geração de cada papel
+    no token. O access gerado pelo refresh herda as claims; versão e gerações
+    (lidas antes das permissões) garantem a revogação.
+    """
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        if front_perms_in_token_enabled():
+            token[FRONT_PERMS_VERSION_CLAIM] = get_front_perm_version(
+                user.pk, create=True
+            )
+            token[FRONT_PERMS_ROLES_CLAIM] = encode_role_generations(user)
+            token[FRONT_PERMS_CLAIM] = encode_front_perms(user)
+        return token
@@ -3,11 +3,13 @@ from rest_framework.routers import DefaultRouter
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
 from .views import (
+    BulkPermissionAssignmentView,
     CustomLoginView,
     GroupViewSet,
     PasswordResetConfirmView,
     PasswordResetRequestView,
     UserViewSet,
+    VendedorImportView,
 )
 
 router = DefaultRouter()
@@ -28,6 +30,16 @@ urlpatterns = [
         PasswordResetConfirmView.as_view(),
         name="password_reset_confirm",
     ),
+    path(
+        "permissions/bulk-assign/",
+        BulkPermissionAssignmentView.as_view(),
+        name="permissions_bulk_assign",
+    ),
+    path(
+        "vendedores/import/",
+        VendedorImportView.as_view(),
+        name="vendedores_import",
+    ),
     path("permissions/", include("rest_framework.urls", namespace="rest_framework")),
     path("accounts/login/", CustomLoginView.as_view(), name="login"),
 ]
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import re
+from functools import reduce
+from operator import or_
+from typing import Iterable
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils.text import slugify
+
+# Alocação de usernames "<email>_<loja>[_<n>]" para vendedores. Em vez de
+# testar base, base_1, base_2... uma query por tentativa, busca de uma vez
+# todos os usernames que começam com a base e escolhe os sufixos livres;
+# a corrida com outra criação simultânea é resolvida tentando de novo
+# (savepoint + IntegrityError), sem checar-e-inserir em duas etapas.
+
+USERNAME_MAX_LENGTH = 150
+ALLOCATE_ATTEMPTS = 5
+_PREFIX_QUERY_CHUNK = 200
+
+
+def vendedor_base_username(email: str, loja_nome: str) -> str:
+    loja_slug = slugify(loja_nome)[:10]  # exemplo: "loja-super"
+    base = f"{slugify(email.split('@')[0])}_{loja_slug}"
+    # deixa espaço para o sufixo "_<n>"
+    return base[: USERNAME_MAX_LENGTH - 8]
+
+
+def taken_usernames(bases: Iterable[str]) -> dict[str, set[int]]:
+    """
+    {base: sufixos já usados} para cada base (0 = a base sem sufixo), com
+    uma query por lote de bases (LIKE 'base%', que usa o índice do username).
+    """
+    bases = sorted(set(bases))
+    taken: dict[str, set[int]] = {base: set() for base in bases}
+    patterns = {base: re.compile(rf"{re.escape(base)}(?:_(\d+))?") for base in bases}
+    user_model = get_user_model()
+    for i in range(0, len(bases), _PREFIX_QUERY_CHUNK):
+        chunk = bases[i : i + _PREFIX_QUERY_CHUNK]
+        query = reduce(or_, (Q(username__startswith=base) for base in chunk))
+        for username in user_model.objects.filter(query).values_list(
+            "username", flat=True
+        ):
+            for base in chunk:
+                match = patterns[base].fullmatch(username)
+                if match:
+                    taken[base].add(int(match.group(1) or 0))
+    return taken
+
+
+def free_usernames(base: str, count: int, taken: set[int]) -> list[str]:
+    """Os `count` primeiros usernames livres: base, base_1, base_2..."""
+    names, suffix = [], 0
+    while len(names) < count:
+        if suffix not in taken:
+            names.append(f"{base}_{suffix}" if suffix else base)
+        suffix += 1
+    return names
+
+
+def create_user_with_unique_username(base: str, **fields):
+    """
+    create_user() com o primeiro username livre a partir de `base`: 1 query
+    para os usernames existentes e, se outra transação pegar o mesmo nome
+    antes, tenta de novo (até ALLOCATE_ATTEMPTS vezes).
+    """
+    user_model = get_user_model()
+    for attempt in range(ALLOCATE_ATTEMPTS):
+        taken = taken_usernames([base])[base]
+        # numa nova tentativa, pula também os nomes que acabaram de conflitar
+        username = free_usernames(base, attempt + 1, taken)[-1]
+        try:
+            with transaction.atomic():
+                return user_model.objects.create_user(username=username, **fields)
+        except IntegrityError:
+            if attempt == ALLOCATE_ATTEMPTS - 1:
+                raise
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+
+from custom_auth.models import Loja
+from custom_auth.onboarding import onboard_vendedores, password_pool
+
+# Importação de vendedores de uma planilha (CSV com cabeçalho nome,email) ou
+# JSON ([{"nome": ..., "email": ...}]). Valida tudo antes e grava em lotes
+# de IMPORT_CHUNK_SIZE via custom_auth.onboarding, cada lote na sua
+# transação, reaproveitando o mesmo pool de hash de senha.
+
+IMPORT_CHUNK_SIZE = 1000
+FORMATS = ("csv", "json")
+_NOME_MAX_LENGTH = 150
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    skipped: list[str] = field(default_factory=list)
+    # (linha/posição, erro)
+    invalid: list[tuple[int, str]] = field(default_factory=list)
+    chunks: int = 0
+    # (e-mail, username, senha temporária), só com notify=False: sem a
+    # mensagem de boas-vindas, é a única cópia da senha
+    credentials: list[tuple[str, str, str]] = field(default_factory=list)
+
+
+def _records(content: str, fmt: str) -> Iterable[tuple[int, dict]]:
+    if fmt == "json":
+        data = json.loads(content)
+        if not isinstance(data, list):
+            raise ValueError("O JSON precisa ser uma lista de objetos.")
+        for position, item in enumerate(data, start=1):
+            yield position, item if isinstance(item, dict) else {}
+    else:
+        reader = csv.DictReader(io.StringIO(content))
+        # linha 1 é o cabeçalho
+        for line, row in enumerate(reader, start=2):
+            yield line, {(k or "").strip().lower(): v for k, v in row.items()}
+
+
+def parse_vendedores(
+    content: str, fmt: str = "csv"
+) -> tuple[list[tuple[str, str]], list[tuple[int, str]]]:
+    """
+    ([(nome, email)], [(linha, erro)]) a partir do conteúdo do arquivo.
+    Formato inválido (JSON malformado, raiz que não é lista) levanta ValueError.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Formato desconhecido: {fmt}")
+    rows, errors = [], []
+    for line, record in _records(content, fmt):
+        nome = str(record.get("nome") or record.get("name") or "").strip()
+        email = str(record.get("email") or "").strip()
+        if not nome:
+            errors.append((line, "nome vazio"))
+            continue
+        if len(nome) > _NOME_MAX_LENGTH:
+            errors.append((line, f"nome com mais de {_NOME_MAX_LENGTH} caracteres"))
+            continue
+        try:
+            validate_email(email)
+        except ValidationError:
+            errors.append((line, f"e-mail inválido: {email!r}"))
+            continue
+        rows.append((nome, email))
+    return rows, errors
+
+
+def import_vendedores(
+    loja: Loja,
+    rows: list[tuple[str, str]],
+    *,
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+    workers: Optional[int] = None,
+    processes: bool = False,
+    notify: bool = True,
+    on_chunk=None,
+) -> ImportResult:
+    """
+    Cadastra os vendedores em lotes de `chunk_size` (um lote com erro não
+    desfaz os anteriores). As mensagens de boas-vindas de cada lote saem
+    num único INSERT em lote; com notify=False, as senhas temporárias
+    voltam em `credentials` para serem entregues por outro meio.
+    """
+    result = ImportResult()
+    with password_pool(workers, processes=processes) as pool:
+        for start in range(0, len(rows), chunk_size):
+            chunk = onboard_vendedores(
+                loja,
+                rows[start : start + chunk_size],
+                notify=notify,
+                workers=workers,
+                executor=pool,
+            )
+            result.created += len(chunk.created)
+            if not notify:
+                result.credentials += [
+                    (vendedor.email, vendedor.user.username, password)
+                    for vendedor, password in chunk.created
+                ]
+            result.skipped += chunk.skipped
+            result.chunks += 1
+            if on_chunk:
+                on_chunk(result)
+    return result
@@ -5,21 +5,33 @@ from django.contrib.auth.tokens import PasswordResetTokenGenerator
 from django.contrib.auth.views import LoginView
 from django.utils.encoding import force_bytes, force_str
 from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
-from rest_framework import decorators, mixins, permissions, response, status, viewsets
+from rest_framework import (
+    decorators,
+    mixins,
+    parsers,
+    permissions,
+    response,
+    status,
+    viewsets,
+)
 from rest_framework.throttling import ScopedRateThrottle
 from rest_framework.views import APIView
 
 from mail.utils import notificar_usuario, send_internal_message
 
+from .assignments import bulk_assign
 from .permissions import IsReadOnlyOrAdmin, IsSelfOrAdmin
 from .serializers import (
+    BulkAssignmentSerializer,
     ChangePasswordSerializer,
     GroupSerializer,
     PasswordResetConfirmSerializer,
     PasswordResetRequestSerializer,
     UserCreateSerializer,
     UserSerializer,
+    VendedorImportSerializer,
 )
+from .vendor_import import import_vendedores
 
 User = get_user_model()
 token_generator = PasswordResetTokenGenerator()
@@ -148,5 +160,57 @@ class PasswordResetConfirmView(APIView):
         )
 
 
+class BulkPermissionAssignmentView(APIView):
+    """
+    Atribui papéis/permissões de front a vários usuários em várias lojas de uma
+    vez. Ex.: {"users": [1, 2], "roles": [3], "lojas": [10, 11]}
+    """
+
+    permission_classes = [permissions.IsAdminUser]
+
+    def post(self, request):
+        ser = BulkAssignmentSerializer(data=request.data)
+        ser.is_valid(raise_exception=True)
+        data = ser.validated_data
+        result = bulk_assign(
+            data["users"],
+            role_ids=data["roles"],
+            permission_ids=data["permissions"],
+            loja_ids=data["loja_ids"],
+        )
+        return response.Response(result, status=status.HTTP_201_CREATED)
+
+
+class VendedorImportView(APIView):
+    """
+    Importa vendedores para uma loja (CSV/JSON, ver VendedorImportSerializer).
+    Roda na própria requisição, com hash de senha em threads; arquivos acima
+    de VENDEDOR_IMPORT_MAX_ROWS vão pelo comando import_vendedores.
+    """
+
+    permission_classes = [permissions.IsAdminUser]
+    parser_classes = [parsers.JSONParser, parsers.MultiPartParser]
+
+    def post(self, request):
+        ser = VendedorImportSerializer(data=request.data)
+        ser.is_valid(raise_exception=True)
+        data = ser.validated_data
+        result = import_vendedores(data["loja"], data["rows"], notify=data["notify"])
+        payload = {
+            "created": result.created,
+            "skipped": result.skipped,
+            "invalid": [
+                {"line": line, "error": error} for line, error in data["invalid"]
+            ],
+        }
+        if not data["notify"]:
+            # sem mensagem de boas-vindas, as senhas temporárias só saem aqui
+            payload["credentials"] = [
+                {"email": email, "username": username, "password": password}
+                for email, username, password in result.credentials
+            ]
+        return response.Response(payload, status=status.HTTP_201_CREATED)
+
+
 class CustomLoginView(LoginView):
     template_name = "login.html"
@@ -2,6 +2,8 @@
 from rest_framework.generics import GenericAPIView
 from rest_framework.permissions import IsAuthenticated
 
+from subscription.permissions import HasActiveSubscription
+
 from .permissions import HasFrontPerm
 
 
@@ -20,7 +22,7 @@ class BaseFrontPerm(GenericAPIView):
             }
     """
 
-    permission_classes = [IsAuthenticated, HasFrontPerm]
+    permission_classes = [IsAuthenticated, HasActiveSubscription, HasFrontPerm]
     required_perm_map: dict[str, str] = {}
 
     def get_required_permissions(self):
@@ -2,11 +2,22 @@
 
 # Aguarda o banco de dados PostgreSQL ficar disponível
 echo "Aguardando o banco de dados iniciar..."
-until nc -z -v -w30 db 5432; do
+until nc -z -v -w30 "${DB_HOST:-db}" "${DB_PORT:-5432}"; do
   echo "Banco de dados ainda não está disponível, esperando..."
   sleep 1
 done
 
 echo "Banco de dados está de pé! Iniciando Django..."
 python manage.py migrate
-python manage.py runserver 0.0.0.0:8000qq
+# tabela do cache em banco (CACHE_BACKEND=db); nos outros backends não faz nada
+python manage.py createcachetable
+
+# SERVE_PROFILE=prod: gunicorn multiprocesso (core/gunicorn.conf.py), DEBUG
+# desligado; qualquer outro valor: runserver de desenvolvimento.
+if [ "${SERVE_PROFILE:-dev}" = "prod" ]; then
+  # estáticos em STATIC_ROOT, servidos pelo WhiteNoise (core/settings.py)
+  python manage.py collectstatic --noinput
+  exec gunicorn -c core/gunicorn.conf.py
+else
+  exec python manage.py runserver 0.0.0.0:8000
+fi
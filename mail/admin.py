@@ -1,7 +1,9 @@
 from django.contrib import admin
 from django.urls import reverse
 from django.utils.html import format_html
-from mail.models.mailbox import MessageThread, Message
+
+from mail.models.mailbox import Message, MessageThread
+from mail.search import search_filter
 
 
 class MessageInline(admin.TabularInline):
@@ -35,6 +37,7 @@ class MessageThreadAdmin(admin.ModelAdmin):
 
     def get_participants(self, obj):
         return ", ".join(sorted(u.username for u in obj.participants.all()))
+
     get_participants.short_description = "Participantes"
 
     def get_last_preview(self, obj):
@@ -43,6 +46,7 @@ class MessageThreadAdmin(admin.ModelAdmin):
             return "-"
         txt = (last.body or "").strip().replace("\n", " ")
         return (txt[:60] + "…") if len(txt) > 60 else txt
+
     get_last_preview.short_description = "Última mensagem"
 
 
@@ -50,4 +54,14 @@ class MessageThreadAdmin(admin.ModelAdmin):
 class MessageAdmin(admin.ModelAdmin):
     list_display = ("thread", "sender", "recipient", "sent_at", "is_read")
     list_filter = ("is_read", "sent_at")
-    search_fields = ("sender__username", "recipient__username", "body", "thread__subject")
+    # body/assunto saem do LIKE '%q%' e vão para o índice full-text
+    search_fields = ("sender__username", "recipient__username")
+
+    def get_search_results(self, request, queryset, search_term):
+        results, may_have_duplicates = super().get_search_results(
+            request, queryset, search_term
+        )
+        if search_term:
+            # sem teto de ids: o paginador do changelist pagina o índice
+            results = results | queryset.filter(search_filter(search_term))
+        return results, may_have_duplicates
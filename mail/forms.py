@@ -1,9 +1,40 @@
 from django import forms
 from django.conf import settings
-from django.core.exceptions import ValidationError
+from django.urls import reverse
 
-from custom_auth.models import Loja, User, Vendedor
+from custom_auth.models import User
 from mail.models.mailbox import Message, MessageThread
+from mail.utils import store_peers
+
+
+class RecipientAutocompleteWidget(forms.Select):
+    """
+    <select> que renderiza só a opção selecionada; as demais chegam pelo
+    endpoint de autocomplete (evita despejar a loja inteira no HTML).
+    """
+
+    def __init__(self, url_name="mailbox:recipient_autocomplete", attrs=None):
+        self.url_name = url_name
+        super().__init__(attrs=attrs)
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        context["widget"]["attrs"]["data-autocomplete-url"] = reverse(self.url_name)
+        return context
+
+    def optgroups(self, name, value, attrs=None):
+        selected = {str(v) for v in value if v not in (None, "")}
+        queryset = self.choices.queryset
+        if selected:
+            queryset = queryset.filter(pk__in=selected)
+        else:
+            queryset = queryset.none()
+
+        groups = [(None, [self.create_option(name, "", "---------", False, 0)], 0)]
+        for index, user in enumerate(queryset, start=1):
+            option = self.create_option(name, str(user.pk), str(user), True, index)
+            groups.append((None, [option], index))
+        return groups
 
 
 class ComposeForm(forms.ModelForm):
@@ -11,6 +42,12 @@ class ComposeForm(forms.ModelForm):
         queryset=User.objects.none(),
         label="Destinatário",
         required=True,
+        widget=RecipientAutocompleteWidget(),
+        error_messages={
+            "invalid_choice": (
+                "Você só pode enviar mensagens para usuários da mesma loja."
+            ),
+        },
     )
     subject = forms.CharField(label="Assunto", max_length=255)
     body = forms.CharField(label="Mensagem", widget=forms.Textarea(attrs={"rows": 4}))
@@ -23,51 +60,9 @@ class ComposeForm(forms.ModelForm):
         self.user = kwargs.pop("user")
         super().__init__(*args, **kwargs)
 
-        # 🔹 agora verifica ManyToMany
-        vendedor = (
-            Vendedor.objects.filter(user=self.user).select_related("nome_loja").first()
-        )
-
-        if vendedor and vendedor.nome_loja:
-            # 🔹 Pega todos os vendedores da mesma loja
-            vendedores_mesma_loja = Vendedor.objects.filter(
-                nome_loja=vendedor.nome_loja
-            )
-
-            # 🔹 Extrai apenas os usuários desses vendedores
-            usuarios_mesma_loja = User.objects.filter(
-                id__in=vendedores_mesma_loja.values_list("user_id", flat=True)
-            ).exclude(id=self.user.id)
-
-            self.fields["recipient"].queryset = usuarios_mesma_loja
-        else:
-            self.fields["recipient"].queryset = User.objects.none()
-
-    def clean_recipient(self):
-        recipient = self.cleaned_data["recipient"]
-
-        # 🔹 Busca o vendedor do usuário logado
-        vendedor_origem = (
-            Vendedor.objects.filter(user=self.user).select_related("nome_loja").first()
-        )
-
-        # 🔹 Busca o vendedor do destinatário
-        vendedor_destino = (
-            Vendedor.objects.filter(user=recipient).select_related("nome_loja").first()
-        )
-
-        # 🔒 Valida se ambos têm loja e são da mesma
-        if not vendedor_origem or not vendedor_destino:
-            raise ValidationError(
-                "Ambos os usuários precisam estar vinculados a uma loja para enviar mensagens."
-            )
-
-        if vendedor_origem.nome_loja != vendedor_destino.nome_loja:
-            raise ValidationError(
-                "Você só pode enviar mensagens para usuários da mesma loja."
-            )
-
-        return recipient
+        # 🔹 colegas de loja num único JOIN (sem buscar o Vendedor antes);
+        # a própria validação do ModelChoiceField garante a mesma loja
+        self.fields["recipient"].queryset = store_peers(self.user)
 
     def save(self, commit=True):
         recipient = self.cleaned_data["recipient"]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.16 on 2026-10-19 14:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("mail", "0002_alter_message_sender"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="message",
+            index=models.Index(
+                fields=["recipient", "id"], name="mail_messag_recipie_1dce87_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,148 @@
+from django.db import migrations
+
+# Índice full-text de Message (assunto da thread + corpo), mantido por triggers
+# no próprio banco: cobre save(), bulk_create() e updates em massa.
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS mail_message_fts USING fts5(
+        subject, body, tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS mail_message_fts_ai AFTER INSERT ON mail_message
+    BEGIN
+        INSERT INTO mail_message_fts (rowid, subject, body)
+        SELECT new.id, t.subject, new.body
+        FROM mail_messagethread t WHERE t.id = new.thread_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS mail_message_fts_ad AFTER DELETE ON mail_message
+    BEGIN
+        DELETE FROM mail_message_fts WHERE rowid = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS mail_message_fts_au
+    AFTER UPDATE OF body, thread_id ON mail_message
+    BEGIN
+        DELETE FROM mail_message_fts WHERE rowid = old.id;
+        INSERT INTO mail_message_fts (rowid, subject, body)
+        SELECT new.id, t.subject, new.body
+        FROM mail_messagethread t WHERE t.id = new.thread_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS mail_messagethread_fts_au
+    AFTER UPDATE OF subject ON mail_messagethread
+    BEGIN
+        UPDATE mail_message_fts SET subject = new.subject
+        WHERE rowid IN (SELECT id FROM mail_message WHERE thread_id = new.id);
+    END
+    """,
+    """
+    INSERT INTO mail_message_fts (rowid, subject, body)
+    SELECT m.id, t.subject, m.body
+    FROM mail_message m JOIN mail_messagethread t ON t.id = m.thread_id
+    """,
+]
+
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS mail_messagethread_fts_au",
+    "DROP TRIGGER IF EXISTS mail_message_fts_au",
+    "DROP TRIGGER IF EXISTS mail_message_fts_ad",
+    "DROP TRIGGER IF EXISTS mail_message_fts_ai",
+    "DROP TABLE IF EXISTS mail_message_fts",
+]
+
+POSTGRES_DOCUMENT = (
+    "setweight(to_tsvector('portuguese', coalesce({subject}, '')), 'A') || "
+    "setweight(to_tsvector('portuguese', coalesce({body}, '')), 'B')"
+)
+
+POSTGRES_FORWARD = [
+    """
+    CREATE TABLE IF NOT EXISTS mail_message_search (
+        message_id bigint PRIMARY KEY
+            REFERENCES mail_message (id) ON DELETE CASCADE,
+        document tsvector NOT NULL
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS mail_message_search_document_idx
+    ON mail_message_search USING GIN (document)
+    """,
+    """
+    CREATE OR REPLACE FUNCTION mail_message_search_refresh() RETURNS trigger AS $$
+    BEGIN
+        INSERT INTO mail_message_search (message_id, document)
+        SELECT NEW.id, %s
+        FROM mail_messagethread t WHERE t.id = NEW.thread_id
+        ON CONFLICT (message_id) DO UPDATE SET document = EXCLUDED.document;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """
+    % POSTGRES_DOCUMENT.format(subject="t.subject", body="NEW.body"),
+    """
+    CREATE TRIGGER mail_message_search_refresh
+    AFTER INSERT OR UPDATE OF body, thread_id ON mail_message
+    FOR EACH ROW EXECUTE FUNCTION mail_message_search_refresh()
+    """,
+    """
+    CREATE OR REPLACE FUNCTION mail_messagethread_search_refresh()
+    RETURNS trigger AS $$
+    BEGIN
+        UPDATE mail_message_search s SET document = %s
+        FROM mail_message m
+        WHERE m.id = s.message_id AND m.thread_id = NEW.id;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """
+    % POSTGRES_DOCUMENT.format(subject="NEW.subject", body="m.body"),
+    """
+    CREATE TRIGGER mail_messagethread_search_refresh
+    AFTER UPDATE OF subject ON mail_messagethread
+    FOR EACH ROW WHEN (OLD.subject IS DISTINCT FROM NEW.subject)
+    EXECUTE FUNCTION mail_messagethread_search_refresh()
+    """,
+    """
+    INSERT INTO mail_message_search (message_id, document)
+    SELECT m.id, %s
+    FROM mail_message m JOIN mail_messagethread t ON t.id = m.thread_id
+    ON CONFLICT (message_id) DO NOTHING
+    """
+    % POSTGRES_DOCUMENT.format(subject="t.subject", body="m.body"),
+]
+
+POSTGRES_BACKWARD = [
+    "DROP TRIGGER IF EXISTS mail_messagethread_search_refresh ON mail_messagethread",
+    "DROP FUNCTION IF EXISTS mail_messagethread_search_refresh()",
+    "DROP TRIGGER IF EXISTS mail_message_search_refresh ON mail_message",
+    "DROP FUNCTION IF EXISTS mail_message_search_refresh()",
+    "DROP TABLE IF EXISTS mail_message_search",
+]
+
+
+def _run(statements_by_vendor):
+    def run(apps, schema_editor):
+        statements = statements_by_vendor.get(schema_editor.connection.vendor, [])
+        for sql in statements:
+            schema_editor.execute(sql, params=None)
+
+    return run
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("mail", "0003_message_recipient_id_index"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            _run({"sqlite": SQLITE_FORWARD, "postgresql": POSTGRES_FORWARD}),
+            _run({"sqlite": SQLITE_BACKWARD, "postgresql": POSTGRES_BACKWARD}),
+        ),
+    ]
@@ -0,0 +1,73 @@
+from django.db import migrations
+
+# Postgres: a FK de mail_message_search para mail_message fazia o TRUNCATE do
+# `flush` (e do teardown dos testes) falhar, já que o Django não conhece essa
+# tabela. A limpeza passa para triggers: DELETE por linha e TRUNCATE em lote.
+# No SQLite o índice FTS5 já é limpo pelo trigger de DELETE.
+
+POSTGRES_FORWARD = [
+    """
+    ALTER TABLE mail_message_search
+    DROP CONSTRAINT IF EXISTS mail_message_search_message_id_fkey
+    """,
+    """
+    CREATE OR REPLACE FUNCTION mail_message_search_delete() RETURNS trigger AS $$
+    BEGIN
+        DELETE FROM mail_message_search WHERE message_id = OLD.id;
+        RETURN OLD;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER mail_message_search_delete
+    AFTER DELETE ON mail_message
+    FOR EACH ROW EXECUTE FUNCTION mail_message_search_delete()
+    """,
+    """
+    CREATE OR REPLACE FUNCTION mail_message_search_truncate() RETURNS trigger AS $$
+    BEGIN
+        TRUNCATE mail_message_search;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER mail_message_search_truncate
+    AFTER TRUNCATE ON mail_message
+    FOR EACH STATEMENT EXECUTE FUNCTION mail_message_search_truncate()
+    """,
+]
+
+POSTGRES_BACKWARD = [
+    "DROP TRIGGER IF EXISTS mail_message_search_truncate ON mail_message",
+    "DROP FUNCTION IF EXISTS mail_message_search_truncate()",
+    "DROP TRIGGER IF EXISTS mail_message_search_delete ON mail_message",
+    "DROP FUNCTION IF EXISTS mail_message_search_delete()",
+    "DELETE FROM mail_message_search s WHERE NOT EXISTS "
+    "(SELECT 1 FROM mail_message m WHERE m.id = s.message_id)",
+    """
+    ALTER TABLE mail_message_search
+    ADD CONSTRAINT mail_message_search_message_id_fkey
+    FOREIGN KEY (message_id) REFERENCES mail_message (id) ON DELETE CASCADE
+    """,
+]
+
+
+def _run(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != "postgresql":
+            return
+        for sql in statements:
+            schema_editor.execute(sql, params=None)
+
+    return run
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("mail", "0004_message_search_index"),
+    ]
+
+    operations = [
+        migrations.RunPython(_run(POSTGRES_FORWARD), _run(POSTGRES_BACKWARD)),
+    ]
@@ -1,9 +1,16 @@
 from django.conf import settings
 from django.db import models
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.utils import timezone
 
+from core import cache as app_cache
+
 User = settings.AUTH_USER_MODEL
 
+# namespace (core.cache) do contador de não lidas por destinatário
+UNREAD_CACHE_NAMESPACE = "mail_unread"
+
 
 class MessageThread(models.Model):
     """
@@ -54,7 +61,14 @@ class Message(models.Model):
         indexes = [
             models.Index(fields=["recipient", "is_read"]),
             models.Index(fields=["thread", "sent_at"]),
+            models.Index(fields=["recipient", "id"]),
         ]
 
     def __str__(self):
         return f"{self.sender} → {self.recipient} ({self.sent_at:%d/%m %H:%M})"
+
+
+@receiver(post_save, sender=Message)
+@receiver(post_delete, sender=Message)
+def invalidate_unread_count(sender, instance, **kwargs):
+    app_cache.delete(UNREAD_CACHE_NAMESPACE, instance.recipient_id)
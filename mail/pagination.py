@@ -0,0 +1,66 @@
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.encoding import force_bytes, force_str
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+
+from mail.models.mailbox import Message, MessageThread
+
+THREAD_PAGE_SIZE = 30
+
+
+def encode_cursor(message: Message) -> str:
+    """
+    Cursor opaco com a posição (sent_at, id) da mensagem.
+    O id desempata mensagens enviadas no mesmo instante.
+    """
+    raw = f"{message.sent_at.isoformat()}|{message.pk}"
+    return urlsafe_base64_encode(force_bytes(raw))
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime, int]]:
+    """Retorna (sent_at, id) ou None se o cursor estiver ausente/inválido."""
+    if not cursor:
+        return None
+    try:
+        sent_at, pk = force_str(urlsafe_base64_decode(cursor)).rsplit("|", 1)
+        parsed = parse_datetime(sent_at)
+        if parsed is None:
+            return None
+        return parsed, int(pk)
+    except (ValueError, TypeError):
+        return None
+
+
+def latest_messages(
+    thread: MessageThread,
+    *,
+    before: Optional[str] = None,
+    limit: int = THREAD_PAGE_SIZE,
+) -> Tuple[List[Message], Optional[str]]:
+    """
+    Carrega as `limit` mensagens mais recentes da thread (anteriores ao cursor,
+    se informado) usando o índice (thread, sent_at).
+
+    Retorna a página em ordem cronológica e o cursor para buscar as mais antigas
+    (None quando não há mais mensagens).
+    """
+    qs = thread.messages.select_related("sender", "recipient").order_by(
+        "-sent_at", "-id"
+    )
+
+    position = decode_cursor(before)
+    if position:
+        sent_at, pk = position
+        qs = qs.filter(Q(sent_at__lt=sent_at) | Q(sent_at=sent_at, id__lt=pk))
+
+    # busca 1 a mais só para saber se existe página anterior
+    page = list(qs[: limit + 1])
+    has_older = len(page) > limit
+    page = page[:limit]
+    page.reverse()
+
+    older_cursor = encode_cursor(page[0]) if has_older and page else None
+    return page, older_cursor
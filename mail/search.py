@@ -0,0 +1,145 @@
+import re
+from typing import List
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from mail.models.mailbox import Message
+
+SEARCH_LIMIT = 50
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _fts5_query(query: str) -> str:
+    """
+    Converte texto livre em uma query FTS5 segura: cada termo vira um
+    prefixo entre aspas ("termo"*), todos obrigatórios.
+    """
+    return " ".join(f'"{token}"*' for token in _TOKEN_RE.findall(query))
+
+
+def _participant_filter(alias: str, user) -> tuple[str, list]:
+    if user is None:
+        return "", []
+    return f" AND ({alias}.recipient_id = %s OR {alias}.sender_id = %s)", [
+        user.pk,
+        user.pk,
+    ]
+
+
+def _sqlite_ids(query: str, user, limit: int) -> List[int]:
+    match = _fts5_query(query)
+    if not match:
+        return []
+    scope, scope_params = _participant_filter("m", user)
+    sql = (
+        "SELECT m.id FROM mail_message_fts f "
+        "JOIN mail_message m ON m.id = f.rowid "
+        "WHERE mail_message_fts MATCH %s" + scope + " "
+        "ORDER BY bm25(mail_message_fts, 2.0, 1.0) LIMIT %s"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [match, *scope_params, limit])
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _postgres_ids(query: str, user, limit: int) -> List[int]:
+    scope, scope_params = _participant_filter("m", user)
+    sql = (
+        "SELECT m.id FROM mail_message_search s "
+        "JOIN mail_message m ON m.id = s.message_id, "
+        "websearch_to_tsquery('portuguese', %s) q "
+        "WHERE s.document @@ q" + scope + " "
+        "ORDER BY ts_rank(s.document, q) DESC, m.id DESC LIMIT %s"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [query, *scope_params, limit])
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _fallback_ids(query: str, user, limit: int) -> List[int]:
+    qs = Message.objects.filter(
+        Q(body__icontains=query) | Q(thread__subject__icontains=query)
+    )
+    if user is not None:
+        qs = qs.filter(Q(recipient=user) | Q(sender=user))
+    return list(qs.order_by("-sent_at").values_list("id", flat=True)[:limit])
+
+
+_SEARCH_TABLES = {
+    "sqlite": ("mail_message_fts", _sqlite_ids),
+    "postgresql": ("mail_message_search", _postgres_ids),
+}
+
+# (alias, banco) -> índice existe? Checado uma vez por processo: o catálogo
+# custa uma query e o índice só aparece/some numa migration.
+_index_available: dict = {}
+
+
+def _search_backend():
+    """Função de busca do banco atual, ou None sem índice full-text."""
+    table, backend = _SEARCH_TABLES.get(connection.vendor, (None, None))
+    if backend is None:
+        return None
+    cache_key = (connection.alias, str(connection.settings_dict["NAME"]))
+    if cache_key not in _index_available:
+        _index_available[cache_key] = table in connection.introspection.table_names()
+    return backend if _index_available[cache_key] else None
+
+
+def search_message_ids(
+    query: str, *, user=None, limit: int = SEARCH_LIMIT
+) -> List[int]:
+    """
+    Ids de Message ordenados por relevância (assunto pesa mais que o corpo).
+    Usa FTS5 no SQLite e tsvector no Postgres; sem índice disponível,
+    cai para o LIKE antigo. Com `user`, restringe às mensagens dele.
+    """
+    query = (query or "").strip()
+    if not query:
+        return []
+
+    backend = _search_backend()
+    if backend is None:
+        return _fallback_ids(query, user, limit)
+    return backend(query, user, limit)
+
+
+def search_filter(query: str) -> Q:
+    """
+    Condição "casa com a busca" para filtrar um queryset de Message, sem
+    limite nem ranking (ex.: admin, que pagina o resultado): o índice
+    entra como subquery e o banco só devolve a página pedida.
+    """
+    query = (query or "").strip()
+    backend = _search_backend()
+    if backend is _sqlite_ids:
+        match = _fts5_query(query)
+        if not match:
+            return Q(pk__in=[])
+        return Q(
+            pk__in=RawSQL(
+                "SELECT rowid FROM mail_message_fts WHERE mail_message_fts MATCH %s",
+                [match],
+            )
+        )
+    if backend is _postgres_ids:
+        return Q(
+            pk__in=RawSQL(
+                "SELECT message_id FROM mail_message_search "
+                "WHERE document @@ websearch_to_tsquery('portuguese', %s)",
+                [query],
+            )
+        )
+    return Q(body__icontains=query) | Q(thread__subject__icontains=query)
+
+
+def search_messages(
+    query: str, *, user=None, limit: int = SEARCH_LIMIT
+) -> List[Message]:
+    """Como search_message_ids, mas já carrega as mensagens na ordem do ranking."""
+    ids = search_message_ids(query, user=user, limit=limit)
+    found = Message.objects.select_related("thread", "sender", "recipient").in_bulk(ids)
+    return [found[pk] for pk in ids if pk in found]
@@ -1,6 +1,6 @@
 from django import template
 
-from mail.models.mailbox import Message
+from mail.utils import unread_count as user_unread_count
 
 register = template.Library()
 
@@ -10,4 +10,4 @@ def unread_count(context):
     user = context["user"]
     if not user.is_authenticated:
         return 0
-    return Message.objects.filter(recipient=user, is_read=False).count()
+    return user_unread_count(user)
@@ -1,3 +1,294 @@
-from django.test import TestCase
+import time
+from datetime import timedelta
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core import cache as app_cache
+from custom_auth.models import Loja
+from custom_auth.onboarding import onboard_vendedores
+from mail.forms import ComposeForm
+from mail.models.mailbox import UNREAD_CACHE_NAMESPACE, Message, MessageThread
+from mail.pagination import THREAD_PAGE_SIZE, latest_messages
+from mail.search import search_filter, search_message_ids
+from mail.utils import mark_messages_as_read, unread_count
+from mail.views import RECIPIENTS_PAGE_SIZE
+
+User = get_user_model()
+
+
+class NewMessagesNotificationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username="ana", email="ana@example.com", password="x"
+        )
+        cls.other = User.objects.create_user(
+            username="bia", email="bia@example.com", password="x"
+        )
+        cls.thread = MessageThread.objects.create(subject="Olá")
+        cls.thread.participants.set([cls.user, cls.other])
+
+    def send(self, body="oi"):
+        return Message.objects.create(
+            thread=self.thread, sender=self.other, recipient=self.user, body=body
+        )
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    @override_settings(MAIL_STREAM_ENABLED=False)
+    def test_inbox_polls_instead_of_streaming_under_wsgi(self):
+        response = self.client.get(reverse("mailbox:inbox"))
+        self.assertNotContains(response, "new EventSource")
+        self.assertContains(response, reverse("mailbox:poll"))
+
+    @override_settings(MAIL_STREAM_ENABLED=True)
+    def test_inbox_streams_under_asgi(self):
+        response = self.client.get(reverse("mailbox:inbox"))
+        self.assertContains(response, "new EventSource")
+
+    @override_settings(MAIL_STREAM_ENABLED=False)
+    def test_stream_is_refused_without_holding_a_worker(self):
+        response = self.client.get(reverse("mailbox:stream"))
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(response.streaming)
+
+    def test_poll_returns_messages_after_cursor(self):
+        first = self.send()
+        response = self.client.get(reverse("mailbox:poll"))
+        self.assertEqual(response.json(), {"messages": [], "last_id": first.id})
+
+        second = self.send("de novo")
+        data = self.client.get(reverse("mailbox:poll"), {"since": first.id}).json()
+        self.assertEqual([m["id"] for m in data["messages"]], [second.id])
+        self.assertEqual(data["last_id"], second.id)
+
+        data = self.client.get(reverse("mailbox:poll"), {"since": second.id}).json()
+        self.assertEqual(data, {"messages": [], "last_id": second.id})
+
+    def test_poll_ignores_messages_to_other_users(self):
+        Message.objects.create(
+            thread=self.thread, sender=self.user, recipient=self.other, body="x"
+        )
+        data = self.client.get(reverse("mailbox:poll"), {"since": 0}).json()
+        self.assertEqual(data["messages"], [])
+
+
+class MessageSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username="ana", email="ana@example.com", password="x"
+        )
+        cls.other = User.objects.create_user(
+            username="bia", email="bia@example.com", password="x"
+        )
+        thread = MessageThread.objects.create(subject="Fechamento de caixa")
+        cls.mine = Message.objects.create(
+            thread=thread, sender=cls.other, recipient=cls.user, body="Conferir sangria"
+        )
+        cls.theirs = Message.objects.create(
+            thread=thread, sender=cls.other, recipient=cls.other, body="Sangria ok"
+        )
+
+    def test_ranked_search_is_scoped_to_user(self):
+        self.assertEqual(search_message_ids("sangria", user=self.user), [self.mine.id])
+        self.assertCountEqual(
+            search_message_ids("sangria"), [self.mine.id, self.theirs.id]
+        )
+
+    def test_index_lookup_is_not_repeated_per_search(self):
+        search_message_ids("caixa")
+        with CaptureQueriesContext(connection) as ctx:
+            search_message_ids("caixa")
+        self.assertEqual(len(ctx.captured_queries), 1)
+
+    def test_search_filter_has_no_id_cap(self):
+        qs = Message.objects.filter(search_filter("fechamento"))
+        self.assertCountEqual(qs, [self.mine, self.theirs])
+        self.assertFalse(Message.objects.filter(search_filter("inexistente")))
+
+    def test_deleted_messages_leave_the_index(self):
+        self.theirs.delete()
+        self.assertEqual(search_message_ids("sangria"), [self.mine.id])
+
+
+class UnreadCountCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username="ana", email="ana@example.com", password="x"
+        )
+        cls.other = User.objects.create_user(
+            username="bia", email="bia@example.com", password="x"
+        )
+        cls.thread = MessageThread.objects.create(subject="Olá")
+
+    def setUp(self):
+        cache.clear()
+
+    def send(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Message.objects.create(
+                thread=self.thread, sender=self.other, recipient=self.user, body="oi"
+            )
+
+    def test_count_is_cached_and_invalidated(self):
+        message = self.send()
+        self.assertEqual(unread_count(self.user), 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(unread_count(self.user), 1)
+
+        self.send()
+        self.assertEqual(unread_count(self.user), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            mark_messages_as_read([message], self.user)
+        self.assertEqual(unread_count(self.user), 1)
+
+    def test_stale_value_is_served_while_another_process_recomputes(self):
+        cache_key = app_cache.key(UNREAD_CACHE_NAMESPACE, self.user.pk)
+        cache.set(cache_key, (7, time.time() - 1))  # vencido, ainda no grace
+        cache.add(cache_key + ":lock", 1)  # outro processo recalculando
+        with self.assertNumQueries(0):
+            self.assertEqual(unread_count(self.user), 7)
+
+        cache.delete(cache_key + ":lock")
+        self.assertEqual(unread_count(self.user), 0)
+        self.assertFalse(cache.get(cache_key + ":lock"))
+
+    def test_missing_value_is_computed_after_waiting_for_the_lock(self):
+        cache_key = app_cache.key("teste", 1)
+        cache.add(cache_key + ":lock", 1)
+        value = app_cache.read_through("teste", (1,), lambda: "calculado", wait=0.1)
+        self.assertEqual(value, "calculado")
+        # quem não tem a trava não grava: o dono dela grava ao terminar
+        self.assertIsNone(cache.get(cache_key))
+
+
+class ThreadPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username="ana", email="ana@example.com", password="x"
+        )
+        cls.other = User.objects.create_user(
+            username="bia", email="bia@example.com", password="x"
+        )
+        cls.thread = MessageThread.objects.create(subject="Olá")
+        cls.thread.participants.set([cls.user, cls.other])
+
+    def create(self, count, sent_at=None):
+        start = timezone.now() - timedelta(days=1)
+        return Message.objects.bulk_create(
+            Message(
+                thread=self.thread,
+                sender=self.other,
+                recipient=self.user,
+                body=f"m{i}",
+                sent_at=sent_at or start + timedelta(seconds=i),
+            )
+            for i in range(count)
+        )
+
+    def pages(self, limit):
+        pages, cursor = [], None
+        while True:
+            page, cursor = latest_messages(self.thread, before=cursor, limit=limit)
+            pages.append([m.id for m in page])
+            if cursor is None:
+                return pages
+
+    def test_pages_walk_back_in_chronological_order(self):
+        ids = [m.id for m in self.create(5)]
+        self.assertEqual(self.pages(2), [ids[3:], ids[1:3], ids[:1]])
+
+    def test_equal_sent_at_is_broken_by_id(self):
+        ids = [m.id for m in self.create(5, sent_at=timezone.now())]
+        pages = self.pages(2)
+        self.assertEqual(pages, [ids[3:], ids[1:3], ids[:1]])
+
+    def test_invalid_cursor_means_latest_page(self):
+        ids = [m.id for m in self.create(3)]
+        page, cursor = latest_messages(self.thread, before="lixo", limit=2)
+        self.assertEqual([m.id for m in page], ids[1:])
+        self.assertIsNotNone(cursor)
+
+    def test_only_displayed_page_is_marked_read(self):
+        messages = self.create(THREAD_PAGE_SIZE + 2)
+        self.client.force_login(self.user)
+        url = reverse("mailbox:thread_detail", args=[self.thread.id])
+
+        response = self.client.get(url)
+        self.assertTemplateUsed(response, "mail/thread_detail.html")
+        cursor = response.context["older_cursor"]
+        unread = Message.objects.filter(recipient=self.user, is_read=False)
+        self.assertEqual([m.id for m in unread], [m.id for m in messages[:2]])
+
+        response = self.client.get(url, {"before": cursor, "partial": 1})
+        self.assertTemplateUsed(response, "mail/_message_list.html")
+        self.assertTemplateNotUsed(response, "mail/thread_detail.html")
+        self.assertEqual(list(response.context["messages"]), messages[:2])
+        self.assertIsNone(response.context["older_cursor"])
+        self.assertFalse(unread.all().exists())
+
+
+class RecipientTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        owner = User.objects.create_user(username="dono", password="x")
+        centro = Loja.objects.create(nome="Centro", dono=owner)
+        norte = Loja.objects.create(nome="Norte", dono=owner)
+        entries = [(f"Pessoa {i:02}", f"p{i:02}@example.com") for i in range(22)]
+        created = onboard_vendedores(centro, entries, notify=False).created
+        cls.user, *cls.peers = [vendedor.user for vendedor, _ in created]
+        ((stranger, _),) = onboard_vendedores(
+            norte, [("Outra", "outra@example.com")], notify=False
+        ).created
+        cls.stranger = stranger.user
+
+    def compose(self, recipient):
+        data = {"recipient": recipient.pk, "subject": "Oi", "body": "Tudo bem?"}
+        return ComposeForm(data, user=self.user)
+
+    def test_recipient_from_another_loja_is_rejected(self):
+        form = self.compose(self.stranger)
+        self.assertFalse(form.is_valid())
+        self.assertEqual(form.errors.as_data()["recipient"][0].code, "invalid_choice")
+
+        form = self.compose(self.peers[0])
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual(form.save().recipient, self.peers[0])
+
+    def autocomplete(self, **params):
+        self.client.force_login(self.user)
+        return self.client.get(reverse("mailbox:recipient_autocomplete"), params).json()
+
+    def test_autocomplete_pages_through_store_peers(self):
+        first = self.autocomplete()
+        self.assertEqual(len(first["results"]), RECIPIENTS_PAGE_SIZE)
+        self.assertTrue(first["more"])
+
+        second = self.autocomplete(page=2)
+        self.assertFalse(second["more"])
+        ids = [r["id"] for r in first["results"] + second["results"]]
+        self.assertCountEqual(ids, [u.pk for u in self.peers])
+
+    def test_autocomplete_bad_page_falls_back_to_first(self):
+        first = self.autocomplete()
+        self.assertEqual(self.autocomplete(page="x"), first)
+        self.assertEqual(self.autocomplete(page=0), first)
+
+    def test_autocomplete_filters_by_term(self):
+        data = self.autocomplete(q="Pessoa 07")
+        self.assertEqual(
+            data,
+            {"results": [{"id": self.peers[6].pk, "text": "Pessoa 07"}], "more": False},
+        )
+        self.assertEqual(self.autocomplete(q="Outra")["results"], [])
@@ -7,5 +7,9 @@ app_name = "mailbox"
 urlpatterns = [
     path("", views.inbox, name="inbox"),
     path("compose/", views.compose, name="compose"),
+    path("stream/", views.message_stream, name="stream"),
+    path("poll/", views.message_poll, name="poll"),
+    path("search/", views.search, name="search"),
+    path("recipients/", views.recipient_autocomplete, name="recipient_autocomplete"),
     path("thread/<int:thread_id>/", views.thread_detail, name="thread_detail"),
 ]
@@ -1,13 +1,25 @@
 # mail/utils.py
-from typing import Iterable, List, Optional, Union
+from typing import Iterable, List, Optional, Tuple, Union
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
 
-from mail.models.mailbox import Message, MessageThread
+from core import cache as app_cache
+from mail.models.mailbox import UNREAD_CACHE_NAMESPACE, Message, MessageThread
 
 User = get_user_model()
 
 
+def store_peers(user: User):
+    """
+    Usuários vinculados (via Vendedor) à mesma loja de `user`, exceto ele.
+    Resolve tudo em um único JOIN: user → vendedor → loja → vendedores → user.
+    """
+    return User.objects.filter(vendedor__nome_loja__vendedores__user=user).exclude(
+        id=user.id
+    )
+
+
 def send_internal_message(
     subject: str, body: str, sender: Optional[User], recipients: List[User]
 ):
@@ -34,6 +46,42 @@ def send_internal_message(
     return msgs
 
 
+def send_private_messages(
+    subject: str,
+    messages: Iterable[Tuple[User, str]],
+    *,
+    sender: Optional[User] = None,
+) -> List[Message]:
+    """
+    Uma thread própria por destinatário (ex.: boas-vindas com senha), para
+    muitos destinatários de uma vez: 3 INSERTs em lote (threads, participantes
+    e mensagens), sem os SELECTs por usuário do send_internal_message.
+    """
+    messages = [(u, body) for u, body in messages if u is not None]
+    if not messages:
+        return []
+    threads = MessageThread.objects.bulk_create(
+        [MessageThread(subject=subject) for _ in messages]
+    )
+    Participant = MessageThread.participants.through
+    Participant.objects.bulk_create(
+        [
+            Participant(messagethread_id=thread.id, user_id=uid)
+            for thread, (u, _) in zip(threads, messages)
+            for uid in {u.id, sender.id if sender else None} - {None}
+        ]
+    )
+    created = Message.objects.bulk_create(
+        [
+            Message(thread=thread, sender=sender, recipient=u, body=body)
+            for thread, (u, body) in zip(threads, messages)
+        ]
+    )
+    # bulk_create não dispara post_save
+    app_cache.delete_many(UNREAD_CACHE_NAMESPACE, [(u.id,) for u, _ in messages])
+    return created
+
+
 def notificar_usuario(
     destinatarios: Union[User, Iterable[User]],
     subject: str,
@@ -55,3 +103,29 @@ def notificar_usuario(
     return send_internal_message(
         subject=subject, body=message, sender=sender, recipients=recipients
     )
+
+
+def mark_messages_as_read(messages: Iterable[Message], user: User) -> int:
+    """
+    Marca como lidas apenas as mensagens informadas (ex.: a página exibida)
+    que foram recebidas por `user` e ainda não estavam lidas.
+    """
+    unread_ids = [m.id for m in messages if m.recipient_id == user.id and not m.is_read]
+    if not unread_ids:
+        return 0
+    updated = Message.objects.filter(id__in=unread_ids).update(is_read=True)
+    app_cache.delete(UNREAD_CACHE_NAMESPACE, user.id)
+    return updated
+
+
+def unread_count(user: User) -> int:
+    """
+    Mensagens não lidas de `user` (badge de todas as páginas), em cache por
+    usuário via core.cache.read_through; enviar ou ler mensagens invalida.
+    """
+    return app_cache.read_through(
+        UNREAD_CACHE_NAMESPACE,
+        (user.id,),
+        lambda: Message.objects.filter(recipient=user, is_read=False).count(),
+        timeout=settings.MAIL_UNREAD_COUNT_TIMEOUT,
+    )
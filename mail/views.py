@@ -1,18 +1,46 @@
-from django.shortcuts import render, redirect, get_object_or_404
+import asyncio
+import json
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
-from django.db.models import Q
-from django.http import HttpResponseForbidden
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Max, Q
+from django.http import (
+    HttpResponse,
+    HttpResponseForbidden,
+    JsonResponse,
+    StreamingHttpResponse,
+)
+from django.shortcuts import get_object_or_404, redirect, render
+
 from .forms import ComposeForm, ReplyForm
-from .models.mailbox import MessageThread, Message
+from .models.mailbox import Message, MessageThread
+from .pagination import latest_messages
+from .search import search_messages
+from .utils import mark_messages_as_read, store_peers
+
+RECIPIENTS_PAGE_SIZE = 20
 
 
 @login_required
 def inbox(request):
-    threads = MessageThread.objects.filter(participants=request.user).order_by("-created_at")
+    threads = MessageThread.objects.filter(participants=request.user).order_by(
+        "-created_at"
+    )
     # anexa contagem de não lidas
     for t in threads:
         t.unread_count = t.unread_count_for(request.user)
-    return render(request, "mail/inbox.html", {"threads": threads})
+    return render(
+        request,
+        "mail/inbox.html",
+        {
+            "threads": threads,
+            "stream_enabled": settings.MAIL_STREAM_ENABLED,
+            "poll_interval": settings.MAIL_POLL_INTERVAL,
+        },
+    )
 
 
 @login_required
@@ -21,12 +49,18 @@ def thread_detail(request, thread_id):
     if not thread.participants.filter(id=request.user.id).exists():
         return HttpResponseForbidden("Você não participa desta conversa.")
 
-    messages = thread.messages.select_related("sender", "recipient").order_by("sent_at")
+    # Só as N mais recentes; páginas anteriores chegam via ?before=<cursor>
+    messages, older_cursor = latest_messages(thread, before=request.GET.get("before"))
+
+    # Marcar como lidas apenas as mensagens exibidas
+    mark_messages_as_read(messages, request.user)
 
-    # Marcar como lidas as recebidas pelo usuário nesta thread
-    Message.objects.filter(
-        thread=thread, recipient=request.user, is_read=False
-    ).update(is_read=True)
+    if request.GET.get("partial"):
+        return render(
+            request,
+            "mail/_message_list.html",
+            {"messages": messages, "older_cursor": older_cursor},
+        )
 
     if request.method == "POST":
         form = ReplyForm(request.POST, user=request.user, thread=thread)
@@ -39,8 +73,59 @@ def thread_detail(request, thread_id):
     return render(
         request,
         "mail/thread_detail.html",
-        {"thread": thread, "messages": messages, "form": form},
+        {
+            "thread": thread,
+            "messages": messages,
+            "older_cursor": older_cursor,
+            "form": form,
+        },
+    )
+
+
+@login_required
+def search(request):
+    query = request.GET.get("q", "").strip()
+    results = search_messages(query, user=request.user) if query else []
+    return render(request, "mail/search.html", {"query": query, "results": results})
+
+
+@login_required
+def recipient_autocomplete(request):
+    """
+    Colegas de loja paginados para o campo 'Destinatário' do ComposeForm.
+    Formato: {"results": [{"id", "text"}], "more": bool}
+    """
+    term = request.GET.get("q", "").strip()
+    try:
+        page = max(int(request.GET.get("page", 1)), 1)
+    except ValueError:
+        page = 1
+
+    qs = store_peers(request.user)
+    if term:
+        qs = qs.filter(
+            Q(username__icontains=term)
+            | Q(first_name__icontains=term)
+            | Q(display_name__icontains=term)
+        )
+
+    offset = (page - 1) * RECIPIENTS_PAGE_SIZE
+    rows = list(
+        qs.order_by("username").values(
+            "id", "username", "display_name", "first_name", "last_name"
+        )[offset : offset + RECIPIENTS_PAGE_SIZE + 1]
     )
+    more = len(rows) > RECIPIENTS_PAGE_SIZE
+    results = [
+        {
+            "id": row["id"],
+            "text": row["display_name"]
+            or f"{row['first_name']} {row['last_name']}".strip()
+            or row["username"],
+        }
+        for row in rows[:RECIPIENTS_PAGE_SIZE]
+    ]
+    return JsonResponse({"results": results, "more": more})
 
 
 @login_required
@@ -53,3 +138,106 @@ def compose(request):
     else:
         form = ComposeForm(user=request.user)
     return render(request, "mail/compose.html", {"form": form})
+
+
+# ---------- Stream de novas mensagens (SSE) ----------
+
+STREAM_POLL_INTERVAL = 2  # segundos entre cada checagem "id > since"
+STREAM_MAX_DURATION = 55  # encerra e deixa o EventSource reconectar
+STREAM_BATCH_SIZE = 50
+
+
+def _authenticated_user(request):
+    user = request.user
+    return user if user.is_authenticated else None
+
+
+def _sse(event: str, data: dict, event_id=None) -> str:
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, cls=DjangoJSONEncoder)}")
+    return "\n".join(lines) + "\n\n"
+
+
+def _new_messages(user, since: int):
+    """Mensagens recebidas depois de `since` (índice recipient, id)."""
+    return (
+        Message.objects.filter(recipient=user, id__gt=since)
+        .order_by("id")
+        .values("id", "thread_id", "thread__subject", "sender__username", "sent_at")
+    )[:STREAM_BATCH_SIZE]
+
+
+def _event_data(row) -> dict:
+    return {
+        "id": row["id"],
+        "thread_id": row["thread_id"],
+        "subject": row["thread__subject"],
+        "sender": row["sender__username"],
+        "sent_at": row["sent_at"],
+    }
+
+
+async def _new_message_events(user, since: int):
+    deadline = time.monotonic() + STREAM_MAX_DURATION
+    yield "retry: 3000\n\n"
+
+    while time.monotonic() < deadline:
+        sent = False
+        async for row in _new_messages(user, since):
+            since = row["id"]
+            sent = True
+            yield _sse("message", _event_data(row), event_id=row["id"])
+        if not sent:
+            # comentário SSE: mantém a conexão viva em proxies
+            yield ": keepalive\n\n"
+        await asyncio.sleep(STREAM_POLL_INTERVAL)
+
+
+async def message_stream(request):
+    """
+    Server-Sent Events com as mensagens recebidas pelo usuário logado.
+    Cada checagem é um 'id > since' barato no índice (recipient, id);
+    o cliente não precisa mais recarregar a inbox para descobrir novidades.
+    Só sob ASGI: no WSGI o gerador assíncrono seria consumido inteiro antes
+    de enviar qualquer byte, prendendo uma thread por STREAM_MAX_DURATION.
+    """
+    if not settings.MAIL_STREAM_ENABLED:
+        # 204 faz o EventSource desistir de reconectar; a inbox usa o poll
+        return HttpResponse(status=204)
+    user = await sync_to_async(_authenticated_user)(request)
+    if user is None:
+        return HttpResponseForbidden("Autenticação necessária.")
+
+    since = request.headers.get("Last-Event-ID") or request.GET.get("since")
+    try:
+        since = int(since)
+    except (TypeError, ValueError):
+        # primeira conexão: começa do que já existe, sem reenviar histórico
+        agg = await Message.objects.filter(recipient=user).aaggregate(last=Max("id"))
+        since = agg["last"] or 0
+
+    response = StreamingHttpResponse(
+        _new_message_events(user, since), content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+@login_required
+def message_poll(request):
+    """
+    Alternativa ao stream sob WSGI: a inbox consulta a cada
+    MAIL_POLL_INTERVAL segundos. Sem `since`, só devolve o último id.
+    """
+    try:
+        since = int(request.GET["since"])
+    except (KeyError, ValueError):
+        agg = Message.objects.filter(recipient=request.user).aggregate(last=Max("id"))
+        return JsonResponse({"messages": [], "last_id": agg["last"] or 0})
+    messages = [_event_data(row) for row in _new_messages(request.user, since)]
+    last_id = messages[-1]["id"] if messages else since
+    return JsonResponse({"messages": messages, "last_id": last_id})
@@ -2,6 +2,22 @@ document.addEventListener("DOMContentLoaded", function () {
   const lojaSelect = document.querySelector("#id_loja_responsavel");
   if (!lojaSelect) return;
 
+  // A API é paginada: percorre as páginas (as maiores possíveis).
+  // O navegador guarda cada página e revalida com If-None-Match, então
+  // trocar de loja de novo custa só um 304 por página.
+  async function fetchVendedores(lojaId) {
+    const vendedores = [];
+    let url = `/api/vendedores/?loja=${encodeURIComponent(lojaId)}&page_size=500`;
+    while (url) {
+      const response = await fetch(url, { credentials: "same-origin" });
+      if (!response.ok) break;
+      const data = await response.json();
+      vendedores.push(...data.results);
+      url = data.next;
+    }
+    return vendedores;
+  }
+
   lojaSelect.addEventListener("change", async function () {
     const lojaId = this.value;
     if (!lojaId) return;
@@ -15,8 +31,10 @@ document.addEventListener("DOMContentLoaded", function () {
     const selectedIds = Array.from(selectTo.options).map((opt) => opt.value);
 
     // Busca os novos vendedores
-    const response = await fetch(`/api/vendedores/?loja=${lojaId}`);
-    const data = await response.json();
+    const data = await fetchVendedores(lojaId);
+
+    // A loja pode ter mudado enquanto as páginas chegavam
+    if (lojaSelect.value !== lojaId) return;
 
     // Limpa o box da esquerda corretamente via API do Django Admin
     SelectBox.cache["id_user_from"] = [];
@@ -1,9 +1,18 @@
 from datetime import date, timedelta
 
 from django.contrib import admin
+from django.db import transaction
+from django.db.models import F
 from django.utils.html import format_html
 
 from custom_auth.models import Vendedor
+from subscription.billing import (
+    RENEWAL_DAYS,
+    issue_bills,
+    next_period,
+    transition_bills,
+)
+from subscription.entitlement import invalidate_subscriptions
 from subscription.models.bills import Bills
 
 from .forms import SubscriptionForm
@@ -20,6 +29,7 @@ class SubscriptionAdmin(admin.ModelAdmin):
         "valido_ate",
         "pay",
         "recurrence",
+        "price",
         "status_color",
         "created_at",
     )
@@ -43,33 +53,88 @@ class SubscriptionAdmin(admin.ModelAdmin):
     # ===============================
     # AÇÕES PERSONALIZADAS
     # ===============================
+    # Ações em lote: um UPDATE por ação (e um bulk_create de faturas na
+    # renovação), em vez de um save() por assinatura. UPDATE não dispara
+    # signals, então o cache de acesso é invalidado à parte.
     @admin.action(description="Ativar assinaturas selecionadas")
     def ativar_assinaturas(self, request, queryset):
-        for sub in queryset:
-            sub.activate()
-        self.message_user(request, f"{queryset.count()} assinatura(s) ativada(s).")
+        # mesmo efeito do Subscription.activate()
+        with transaction.atomic():
+            ids = list(queryset.values_list("pk", flat=True))
+            ativadas = Subscription.objects.filter(pk__in=ids).update(
+                is_active=True, valido_ate=date.today() + timedelta(days=RENEWAL_DAYS)
+            )
+            invalidate_subscriptions(ids)
+        self.message_user(request, f"{ativadas} assinatura(s) ativada(s).")
 
     @admin.action(description="Desativar assinaturas selecionadas")
     def desativar_assinaturas(self, request, queryset):
-        for sub in queryset:
-            sub.deactivate()
-        self.message_user(request, f"{queryset.count()} assinatura(s) desativada(s).")
+        # mesmo efeito do Subscription.deactivate()
+        with transaction.atomic():
+            ids = list(queryset.values_list("pk", flat=True))
+            desativadas = Subscription.objects.filter(pk__in=ids).update(
+                is_active=False, valido_ate=None
+            )
+            invalidate_subscriptions(ids)
+        self.message_user(request, f"{desativadas} assinatura(s) desativada(s).")
 
     @admin.action(description="Renovar assinaturas (+30 dias)")
     def renovar_assinaturas(self, request, queryset):
-        renovadas = 0
-        for sub in queryset:
-            sub.update_date_new_renew()
-            # Cria uma nova fatura a cada renovação
-            Bills.objects.create(
-                sub=sub,
-                status=Bills.Status.PENDING,
-                created_at=date.today(),
+        # como update_date_new_renew(): só estende quem já tem validade
+        with transaction.atomic():
+            rows = list(
+                queryset.filter(valido_ate__isnull=False).values_list(
+                    "pk", "valido_ate", "price"
+                )
+            )
+            ids = [pk for pk, *_ in rows]
+            Subscription.objects.filter(pk__in=ids).update(
+                valido_ate=F("valido_ate") + timedelta(days=RENEWAL_DAYS)
+            )
+            # Fatura do novo período (não duplica se já emitida)
+            issue_bills(
+                (pk, *next_period(valido_ate), price) for pk, valido_ate, price in rows
             )
-            renovadas += 1
-        self.message_user(
-            request, f"{renovadas} assinatura(s) renovada(s) com sucesso."
-        )
+            invalidate_subscriptions(ids)
+        self.message_user(request, f"{len(ids)} assinatura(s) renovada(s) com sucesso.")
 
     class Media:
         js = ("admin/js/subscription_filter.js",)
+
+
+@admin.register(Bills)
+class BillsAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "sub",
+        "status",
+        "amount",
+        "period_start",
+        "period_end",
+        "created_at",
+    )
+    list_filter = ("status", "period_start")
+    list_select_related = ("sub",)
+    search_fields = ("idempotency_key",)
+    readonly_fields = ("idempotency_key", "created_at", "updated_at")
+    raw_id_fields = ("sub",)
+    ordering = ("-created_at",)
+    actions = ["marcar_pagas", "marcar_recusadas", "reabrir"]
+
+    # Transições em lote (subscription.billing.transition_bills): um UPDATE
+    # só nas faturas cujo status atual permite a mudança.
+    def _transition(self, request, queryset, status, label):
+        changed = transition_bills(queryset.values_list("pk", flat=True), status)
+        self.message_user(request, f"{changed} fatura(s) {label}.")
+
+    @admin.action(description="Marcar como pagas")
+    def marcar_pagas(self, request, queryset):
+        self._transition(request, queryset, Bills.Status.PAY, "marcada(s) como paga(s)")
+
+    @admin.action(description="Marcar como recusadas")
+    def marcar_recusadas(self, request, queryset):
+        self._transition(request, queryset, Bills.Status.REFUSE, "recusada(s)")
+
+    @admin.action(description="Reabrir faturas recusadas")
+    def reabrir(self, request, queryset):
+        self._transition(request, queryset, Bills.Status.PENDING, "reaberta(s)")
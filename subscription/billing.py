@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Iterable, Optional
+
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery, Sum
+from django.utils import timezone
+
+from subscription.models import Bills, Subscription
+
+# Livro de faturas das assinaturas. Cada fatura cobre um período
+# [period_start, period_end] e tem uma chave de idempotência por
+# (assinatura, início do período): a rodada de faturamento, o sweeper e a
+# renovação pelo admin emitem pela mesma função (issue_bills) e nunca
+# duplicam a fatura de um período, então qualquer um deles pode rodar de novo.
+
+RENEWAL_DAYS = 30
+BILLING_CHUNK_SIZE = 1000
+
+# status de destino -> status de onde a transição é permitida
+TRANSITIONS = {
+    Bills.Status.PAY: (Bills.Status.PENDING, Bills.Status.REFUSE),
+    Bills.Status.REFUSE: (Bills.Status.PENDING,),
+    Bills.Status.PENDING: (Bills.Status.REFUSE,),
+}
+
+
+def next_period(valido_ate: date) -> tuple[date, date]:
+    """Período de renovação que começa no dia seguinte ao fim da validade."""
+    return (
+        valido_ate + timedelta(days=1),
+        valido_ate + timedelta(days=RENEWAL_DAYS),
+    )
+
+
+def issue_bills(rows: Iterable[tuple[int, date, date, Decimal]]) -> int:
+    """
+    Emite faturas pendentes para linhas (sub_id, period_start, period_end,
+    amount) e devolve quantas foram criadas. Períodos já faturados são
+    ignorados: 1 SELECT pelas chaves existentes e 1 INSERT em lote, com
+    ignore_conflicts cobrindo a corrida entre duas emissões simultâneas.
+    """
+    bills = {}
+    for sub_id, period_start, period_end, amount in rows:
+        key = Bills.key_for(sub_id, period_start)
+        bills[key] = Bills(
+            sub_id=sub_id,
+            status=Bills.Status.PENDING,
+            amount=amount,
+            period_start=period_start,
+            period_end=period_end,
+            idempotency_key=key,
+        )
+    if not bills:
+        return 0
+    existing = set(
+        Bills.objects.filter(idempotency_key__in=list(bills)).values_list(
+            "idempotency_key", flat=True
+        )
+    )
+    missing = [bill for key, bill in bills.items() if key not in existing]
+    Bills.objects.bulk_create(missing, ignore_conflicts=True)
+    return len(missing)
+
+
+def _latest_bill_id():
+    """
+    Subquery com o id da fatura mais recente da assinatura (OuterRef "pk"):
+    maior período e, no empate ou em faturas antigas sem período, maior id.
+    """
+    return Subquery(
+        Bills.objects.filter(sub=OuterRef("pk"))
+        .order_by(F("period_start").desc(nulls_last=True), "-id")
+        .values("id")[:1]
+    )
+
+
+def transition_bills(bill_ids: Iterable[int], status: str) -> int:
+    """
+    Muda o status das faturas em um UPDATE, só a partir dos status permitidos
+    em TRANSITIONS (as demais ficam como estão). A fatura mais recente da
+    assinatura decide se ela está paga: pagar ou recusar uma fatura antiga
+    não mexe em `pay`. Faturas e assinaturas ficam travadas
+    (select_for_update) até o fim, para um pagamento concorrente não se
+    perder entre a leitura e o UPDATE. Devolve quantas faturas mudaram.
+    """
+    allowed = TRANSITIONS[status]
+    with transaction.atomic():
+        rows = list(
+            Bills.objects.select_for_update()
+            .filter(id__in=list(bill_ids), status__in=allowed)
+            .values_list("id", "sub_id")
+        )
+        if not rows:
+            return 0
+        ids = [pk for pk, _ in rows]
+        sub_ids = {sub_id for _, sub_id in rows}
+        subs = Subscription.objects.filter(id__in=sub_ids)
+        list(subs.select_for_update().values_list("id", flat=True))
+        changed = Bills.objects.filter(id__in=ids).update(
+            status=status, updated_at=timezone.now()
+        )
+        if status != Bills.Status.PENDING:
+            subs.alias(latest_bill=_latest_bill_id()).filter(
+                latest_bill__in=ids
+            ).update(pay=status == Bills.Status.PAY)
+    return changed
+
+
+@dataclass
+class BillingRunResult:
+    subscriptions: int = 0
+    created: int = 0
+    skipped: int = 0
+    amount: Decimal = Decimal("0.00")  # total faturado no período
+    chunks: int = 0
+
+
+def due_for_billing(period_start: date, period_end: date):
+    """Assinaturas recorrentes ativas cuja validade acaba dentro do período."""
+    # is_active__in: ver subscription.sweeper.due_subscriptions (índice)
+    return Subscription.objects.filter(
+        is_active__in=[True],
+        valido_ate__range=(period_start, period_end),
+        recurrence=True,
+    )
+
+
+def run_billing(
+    period_start: date,
+    period_end: date,
+    *,
+    chunk_size: int = BILLING_CHUNK_SIZE,
+    dry_run: bool = False,
+) -> BillingRunResult:
+    """
+    Fatura antecipadamente o próximo período (next_period) de toda assinatura
+    que vence entre `period_start` e `period_end`. Percorre as assinaturas por
+    id em lotes (keyset, sem OFFSET); cada lote custa um SELECT das
+    assinaturas e a emissão (issue_bills) numa transação curta. Rodar de
+    novo não duplica nada; quando o sweeper renovar essas assinaturas, a
+    fatura do período já existe e não é recriada.
+    """
+    result = BillingRunResult()
+    last_id = 0
+    due = due_for_billing(period_start, period_end).order_by("id")
+    while True:
+        chunk = list(
+            due.filter(id__gt=last_id).values_list("id", "valido_ate", "price")[
+                :chunk_size
+            ]
+        )
+        if not chunk:
+            break
+        last_id = chunk[-1][0]
+        rows = [
+            (pk, *next_period(valido_ate), price) for pk, valido_ate, price in chunk
+        ]
+        result.subscriptions += len(rows)
+        result.amount += sum((price for *_, price in rows), Decimal("0.00"))
+        result.chunks += 1
+        if dry_run:
+            continue
+        with transaction.atomic():
+            created = issue_bills(rows)
+        result.created += created
+        result.skipped += len(rows) - created
+    return result
+
+
+def billing_summary(period_start: date, period_end: Optional[date] = None) -> dict:
+    """{status: {"bills": n, "amount": total}} das faturas do período."""
+    bills = Bills.objects.filter(period_start__gte=period_start)
+    if period_end is not None:
+        bills = bills.filter(period_start__lte=period_end)
+    summary = {
+        status: {"bills": 0, "amount": Decimal("0.00")}
+        for status in Bills.Status.values
+    }
+    for row in bills.values("status").annotate(n=Count("id"), total=Sum("amount")):
+        # SQLite devolve a soma de decimais sem escala fixa
+        amount = Decimal(row["total"] or 0).quantize(Decimal("0.01"))
+        summary[row["status"]] = {"bills": row["n"], "amount": amount}
+    return summary
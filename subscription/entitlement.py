@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+from datetime import date, datetime, time, timedelta
+from typing import Iterable, Optional
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+# Cache do "direito de uso" (assinatura ativa) por loja, e da loja de cada
+# usuário-vendedor: o vendedor vale pela assinatura da loja dele (nome_loja).
+# A entrada da loja guarda a data até quando o acesso vale e expira sozinha
+# na virada desse dia; saves/bulk updates de Subscription apagam as entradas
+# afetadas (invalidate_subscriptions) e saves de Vendedor, a do vendedor
+# (invalidate_sellers). Assim o gate não faz query por request.
+#   sub_entitlement:seller:<user_id> -> loja do vendedor (0 = não é vendedor)
+#   sub_entitlement:store:<loja_id>  -> (tem_assinatura, válido_até)
+# válido_até: None = sem assinatura ativa; date.max = ativa sem vencimento.
+
+_SELLER_KEY = "sub_entitlement:seller:{user_id}"
+_LOJA_KEY = "sub_entitlement:store:{loja_id}"
+
+
+def _cap() -> int:
+    return getattr(settings, "SUBSCRIPTION_ENTITLEMENT_TIMEOUT", 3600)
+
+
+def _timeout_for(valid_until: Optional[date]) -> int:
+    cap = _cap()
+    if valid_until is None or valid_until == date.max:
+        return cap
+    expires = datetime.combine(valid_until + timedelta(days=1), time.min)
+    seconds = int((expires - datetime.now()).total_seconds())
+    return max(1, min(cap, seconds))
+
+
+def _valid_until(rows: Iterable[tuple[bool, Optional[date]]]) -> Optional[date]:
+    today = date.today()
+    best = None
+    for is_active, valido_ate in rows:
+        if not is_active:
+            continue
+        if valido_ate is None:
+            return date.max
+        if valido_ate >= today and (best is None or valido_ate > best):
+            best = valido_ate
+    return best
+
+
+def _is_valid(valid_until: Optional[date]) -> bool:
+    return valid_until is not None and valid_until >= date.today()
+
+
+def seller_loja_id(user_id) -> Optional[int]:
+    """Loja do vendedor do usuário (None se não é vendedor) — 1 query, no miss."""
+    key = _SELLER_KEY.format(user_id=user_id)
+    loja_id = cache.get(key)
+    if loja_id is None:
+        vendedor_model = apps.get_model("custom_auth", "Vendedor")
+        loja_id = (
+            vendedor_model.objects.filter(user_id=user_id)
+            .values_list("nome_loja_id", flat=True)
+            .first()
+        ) or 0
+        cache.set(key, loja_id, timeout=_cap())
+    return loja_id or None
+
+
+def user_entitlement(user_id) -> tuple[bool, bool]:
+    """
+    (é vendedor?, pode usar?) pela assinatura da loja do vendedor; loja sem
+    nenhuma Subscription está fora da cobrança e libera. No máximo 2 queries,
+    no miss.
+    """
+    loja_id = seller_loja_id(user_id)
+    if loja_id is None:
+        return False, False
+    has_subscription, active = loja_entitlement(loja_id)
+    return True, active or not has_subscription
+
+
+def loja_entitlement(loja_id) -> tuple[bool, bool]:
+    """(loja tem assinatura?, ela está ativa?) — no máximo 1 query, no miss."""
+    key = _LOJA_KEY.format(loja_id=loja_id)
+    entry = cache.get(key)
+    if entry is None:
+        subscription_model = apps.get_model("subscription", "Subscription")
+        rows = list(
+            subscription_model.objects.filter(loja_responsavel_id=loja_id).values_list(
+                "is_active", "valido_ate"
+            )
+        )
+        entry = (bool(rows), _valid_until(rows))
+        cache.set(key, entry, timeout=_timeout_for(entry[1]))
+    has_subscription, valid_until = entry
+    return has_subscription, _is_valid(valid_until)
+
+
+def loja_has_active_subscription(loja_id) -> bool:
+    return loja_entitlement(loja_id)[1]
+
+
+# ---------- Invalidação ----------
+
+
+def _delete_on_commit(keys: set[str]) -> None:
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(list(keys)))
+
+
+def invalidate_subscriptions(subscription_ids: Iterable[int]) -> None:
+    """Apaga as entradas das lojas das assinaturas (1 query)."""
+    subscription_model = apps.get_model("subscription", "Subscription")
+    loja_ids = subscription_model.objects.filter(
+        id__in=list(subscription_ids)
+    ).values_list("loja_responsavel_id", flat=True)
+    _delete_on_commit({_LOJA_KEY.format(loja_id=loja_id) for loja_id in loja_ids})
+
+
+def invalidate_sellers(user_ids: Iterable[Optional[int]]) -> None:
+    """Apaga a loja em cache dos usuários (vendedor criado, movido, apagado)."""
+    _delete_on_commit(
+        {_SELLER_KEY.format(user_id=uid) for uid in user_ids if uid is not None}
+    )
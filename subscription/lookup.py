@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import time
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+# Cache das páginas de GET /api/vendedores/ (seleção de vendedores no admin de
+# assinaturas). Cada loja tem um carimbo de geração; as páginas ficam sob uma
+# chave que inclui o carimbo, então salvar/apagar um Vendedor só troca o
+# carimbo da loja (on_commit) e as páginas antigas expiram sozinhas.
+#   vendedores_gen:<loja_id>                       -> carimbo da loja
+#   vendedores_page:<loja_id>:<carimbo>:<consulta> -> (etag, dados)
+
+_GEN_KEY = "vendedores_gen:{loja_id}"
+_PAGE_KEY = "vendedores_page:{loja_id}:{gen}:{query}"
+
+
+def _timeout() -> int:
+    return getattr(settings, "VENDEDORES_LOOKUP_TIMEOUT", 300)
+
+
+def loja_generation(loja_id) -> int:
+    key = _GEN_KEY.format(loja_id=loja_id)
+    gen = cache.get(key)
+    if gen is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        gen = cache.get(key)
+    return gen
+
+
+def bump_lojas(loja_ids: Iterable[int]) -> None:
+    """Invalida as páginas em cache das lojas (depois do commit)."""
+    keys = [_GEN_KEY.format(loja_id=lid) for lid in set(loja_ids) if lid]
+    if not keys:
+        return
+
+    def bump():
+        gen = time.time_ns()
+        cache.set_many({key: gen for key in keys}, timeout=None)
+
+    transaction.on_commit(bump)
+
+
+def _page_key(loja_id, gen: int, query: dict) -> str:
+    raw = json.dumps(query, sort_keys=True)
+    digest = hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest()
+    return _PAGE_KEY.format(loja_id=loja_id, gen=gen, query=digest)
+
+
+def get_page(loja_id, query: dict) -> tuple[str, Optional[tuple[str, dict]]]:
+    """(chave, (etag, dados) ou None) da página descrita por `query`."""
+    key = _page_key(loja_id, loja_generation(loja_id), query)
+    return key, cache.get(key)
+
+
+def set_page(key: str, data: dict) -> str:
+    """Guarda a página e devolve o ETag (hash do conteúdo)."""
+    body = json.dumps(data, sort_keys=True, cls=DjangoJSONEncoder)
+    etag = '"%s"' % hashlib.md5(body.encode(), usedforsecurity=False).hexdigest()
+    cache.set(key, (etag, data), timeout=_timeout())
+    return etag
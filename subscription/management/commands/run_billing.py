@@ -0,0 +1,67 @@
+import calendar
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from subscription.billing import BILLING_CHUNK_SIZE, billing_summary, run_billing
+from subscription.models import Bills
+
+
+class Command(BaseCommand):
+    help = (
+        "Emite as faturas do próximo período de todas as assinaturas recorrentes "
+        "que vencem no intervalo (padrão: mês corrente). Pode rodar de novo: "
+        "períodos já faturados são ignorados."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--start", type=date.fromisoformat, help="Início (AAAA-MM-DD)."
+        )
+        parser.add_argument("--end", type=date.fromisoformat, help="Fim (AAAA-MM-DD).")
+        parser.add_argument("--chunk-size", type=int, default=BILLING_CHUNK_SIZE)
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Só conta as assinaturas e o valor, sem emitir faturas.",
+        )
+        parser.add_argument(
+            "--summary",
+            action="store_true",
+            help="Mostra as faturas dos períodos emitidos, por status.",
+        )
+
+    def handle(self, *args, **options):
+        today = date.today()
+        start = options["start"] or today.replace(day=1)
+        end = options["end"] or today.replace(
+            day=calendar.monthrange(today.year, today.month)[1]
+        )
+        if end < start:
+            raise CommandError("--end precisa ser igual ou posterior a --start.")
+
+        began = time.perf_counter()
+        result = run_billing(
+            start, end, chunk_size=options["chunk_size"], dry_run=options["dry_run"]
+        )
+        elapsed = time.perf_counter() - began
+        prefix = "[dry-run] " if options["dry_run"] else ""
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{prefix}{start} a {end}: {result.subscriptions} assinatura(s), "
+                f"{result.created} fatura(s) emitida(s), {result.skipped} já "
+                f"existente(s), total {result.amount}, {result.chunks} lote(s), "
+                f"{elapsed:.1f}s."
+            )
+        )
+
+        if options["summary"]:
+            # next_period começa no dia seguinte ao vencimento
+            one_day = timedelta(days=1)
+            summary = billing_summary(start + one_day, end + one_day)
+            for status, row in summary.items():
+                self.stdout.write(
+                    f"  {str(Bills.Status(status).label):<10}{row['bills']:>8}"
+                    f"{row['amount']:>14}"
+                )
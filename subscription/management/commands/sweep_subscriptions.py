@@ -0,0 +1,77 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from subscription.sweeper import (
+    SWEEP_CHUNK_SIZE,
+    due_subscriptions,
+    sweep_subscriptions,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Vence/renova assinaturas com validade expirada (rodar todo dia via cron, "
+        "ou com --loop como daemon)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=SWEEP_CHUNK_SIZE)
+        parser.add_argument(
+            "--max-seconds",
+            type=float,
+            help="Tempo máximo por rodada; o restante fica para a próxima.",
+        )
+        parser.add_argument(
+            "--today",
+            type=date.fromisoformat,
+            help="Data de referência (AAAA-MM-DD), padrão: hoje.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Só conta as assinaturas vencidas, sem alterar nada.",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Fica rodando, uma varredura a cada --interval segundos.",
+        )
+        parser.add_argument("--interval", type=float, default=3600)
+
+    def handle(self, *args, **options):
+        while True:
+            self._run_once(options)
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
+
+    def _run_once(self, options):
+        today = options["today"] or date.today()
+        if options["dry_run"]:
+            due = due_subscriptions(today)
+            self.stdout.write(
+                f"[dry-run] {due.filter(recurrence=True).count()} a renovar, "
+                f"{due.filter(recurrence=False).count()} a desativar."
+            )
+            return
+
+        start = time.perf_counter()
+        result = sweep_subscriptions(
+            today=today,
+            chunk_size=options["chunk_size"],
+            max_seconds=options["max_seconds"],
+        )
+        elapsed = time.perf_counter() - start
+        message = (
+            f"{result.renewed} renovada(s), {result.expired} desativada(s), "
+            f"{result.bills_created} fatura(s) em {result.chunks} lote(s), "
+            f"{elapsed:.1f}s."
+        )
+        if result.finished:
+            self.stdout.write(self.style.SUCCESS(message))
+        else:
+            self.stdout.write(
+                self.style.WARNING(message + " Tempo esgotado, restante na próxima.")
+            )
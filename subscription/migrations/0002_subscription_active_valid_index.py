@@ -0,0 +1,18 @@
+# Generated by Django 4.2.16 on 2026-10-19 14:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("subscription", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="subscription",
+            index=models.Index(
+                fields=["is_active", "valido_ate"], name="idx_sub_active_valid"
+            ),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 4.2.16 on 2026-10-19 14:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("subscription", "0002_subscription_active_valid_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="bills",
+            name="amount",
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10),
+        ),
+        migrations.AddField(
+            model_name="bills",
+            name="idempotency_key",
+            field=models.CharField(
+                blank=True, editable=False, max_length=64, null=True, unique=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="bills",
+            name="period_end",
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="bills",
+            name="period_start",
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="bills",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name="subscription",
+            name="price",
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10),
+        ),
+        migrations.AddIndex(
+            model_name="bills",
+            index=models.Index(
+                fields=["status", "period_start"], name="idx_bill_status_period"
+            ),
+        ),
+    ]
@@ -10,13 +10,37 @@ class Bills(models.Model):
 
     sub = models.ForeignKey("Subscription", on_delete=models.PROTECT)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     status = models.CharField(
         max_length=4, choices=Status.choices, default=Status.PENDING
     )
+    amount = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    period_start = models.DateField(null=True, blank=True)
+    period_end = models.DateField(null=True, blank=True)
+    # "sub-<id>:<period_start>" — uma fatura por assinatura e período; faturas
+    # antigas (sem período) ficam com NULL e não conflitam entre si
+    idempotency_key = models.CharField(
+        max_length=64, unique=True, null=True, blank=True, editable=False
+    )
 
     class Meta:
         verbose_name = "Bill"
         verbose_name_plural = "Bills"
+        indexes = [
+            # transições de status em lote e relatórios por período
+            models.Index(
+                fields=["status", "period_start"], name="idx_bill_status_period"
+            ),
+        ]
+
+    @staticmethod
+    def key_for(sub_id, period_start) -> str:
+        return f"sub-{sub_id}:{period_start.isoformat()}"
+
+    def save(self, *args, **kwargs):
+        if self.idempotency_key is None and self.period_start is not None:
+            self.idempotency_key = self.key_for(self.sub_id, self.period_start)
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"Bill #{self.id} - {self.get_status_display()}"
@@ -1,10 +1,13 @@
 from datetime import date, timedelta
 
 from django.db import models
-from django.db.models.signals import post_save
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
 from django.dispatch import receiver
 
 from custom_auth.models import Loja, User, Vendedor
+from custom_auth.signals import vendedores_bulk_created
+from subscription import entitlement, lookup
 from subscription.models.bills import Bills
 
 
@@ -18,10 +21,26 @@ class Subscription(models.Model):
     valido_ate = models.DateField(null=True, blank=True)
     pay = models.BooleanField(default=False)
     recurrence = models.BooleanField(default=False)
+    # valor cobrado a cada período (copiado para Bills.amount na emissão)
+    price = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+
+    class Meta:
+        indexes = [
+            # varredura de vencimento (subscription.sweeper)
+            models.Index(
+                fields=["is_active", "valido_ate"], name="idx_sub_active_valid"
+            ),
+        ]
 
     @classmethod
     def user_has_active_subscription(cls, user):
-        return cls.objects.filter(user=user, is_active=True).exists()
+        # não confia só no flag: a validade pode ter passado antes da varredura
+        # (o gate das views usa subscription.entitlement, pela loja do vendedor)
+        return (
+            cls.objects.filter(user=user, is_active=True)
+            .filter(Q(valido_ate__isnull=True) | Q(valido_ate__gte=date.today()))
+            .exists()
+        )
 
     def activate(self):
         """Ativa a assinatura e define validade para +30 dias."""
@@ -51,26 +70,95 @@ class Subscription(models.Model):
 
 
 # ===========================================
-# SIGNAL — cria fatura e ativa assinatura
+# SIGNALS — ativa a assinatura e cria a fatura
 # ===========================================
-@receiver(
-    post_save, sender=Subscription, dispatch_uid="reset_valid_date_and_create_bill"
-)
-def reset_valid_date_and_create_bill(sender, instance, created, **kwargs):
+@receiver(pre_save, sender=Subscription, dispatch_uid="activate_new_subscription")
+def activate_new_subscription(sender, instance, **kwargs):
     """
-    Quando uma Subscription é criada:
-    - Ativa e define validade para +30 dias
-    - Cria uma Bill pendente vinculada
+    Quando uma Subscription é criada, já vai para o banco ativa e com validade
+    de +30 dias — no mesmo INSERT, sem um segundo save() no post_save.
     """
-    if created:
-        # Ativa e define validade
+    if instance._state.adding and instance.pk is None:
         instance.is_active = True
         instance.valido_ate = date.today() + timedelta(days=30)
-        instance.save(update_fields=["is_active", "valido_ate"])
 
-        # Cria a fatura pendente
+
+@receiver(
+    post_save, sender=Subscription, dispatch_uid="reset_valid_date_and_create_bill"
+)
+def reset_valid_date_and_create_bill(sender, instance, created, **kwargs):
+    """Cria a fatura pendente do primeiro período (hoje até a validade)."""
+    if created:
         Bills.objects.create(
             sub=instance,
             status=Bills.Status.PENDING,
-            created_at=instance.created_at,
+            amount=instance.price,
+            period_start=instance.created_at,
+            period_end=instance.valido_ate,
         )
+
+
+# ===========================================
+# SIGNALS — invalidam o cache de acesso (subscription.entitlement)
+# ===========================================
+@receiver(post_save, sender=Subscription, dispatch_uid="subscription_entitlement_save")
+def _invalidate_entitlement_on_save(sender, instance, **kwargs):
+    entitlement.invalidate_subscriptions([instance.pk])
+
+
+@receiver(
+    pre_delete, sender=Subscription, dispatch_uid="subscription_entitlement_delete"
+)
+def _invalidate_entitlement_on_delete(sender, instance, **kwargs):
+    entitlement.invalidate_subscriptions([instance.pk])
+
+
+@receiver([post_save, post_delete], sender=Vendedor, dispatch_uid="seller_entitlement")
+def _invalidate_seller_entitlement(sender, instance, **kwargs):
+    # o vendedor vale pela assinatura da loja dele: mudou a loja (ou o
+    # vendedor surgiu/sumiu), a loja em cache do usuário deixa de valer
+    entitlement.invalidate_sellers([instance.user_id])
+
+
+@receiver(vendedores_bulk_created, dispatch_uid="seller_entitlement_bulk")
+def _invalidate_seller_entitlement_bulk(sender, vendedores, **kwargs):
+    entitlement.invalidate_sellers([v.user_id for v in vendedores])
+
+
+# ===========================================
+# SIGNALS — invalidam o cache de /api/vendedores/ (subscription.lookup)
+# ===========================================
+@receiver(pre_save, sender=Vendedor, dispatch_uid="vendedores_lookup_previous_loja")
+def _remember_previous_loja(sender, instance, update_fields=None, **kwargs):
+    # trocar de loja invalida também a lista da loja antiga
+    instance._previous_loja_id = None
+    if instance._state.adding or instance.pk is None:
+        return
+    if update_fields is not None and "nome_loja" not in update_fields:
+        return
+    try:
+        # carregada em Vendedor.from_db / atualizada em Vendedor.save
+        previous = instance._loaded_loja_id
+    except AttributeError:
+        # instância montada à mão ou com nome_loja adiado: pergunta ao banco
+        previous = (
+            Vendedor.objects.filter(pk=instance.pk)
+            .values_list("nome_loja_id", flat=True)
+            .first()
+        )
+    if previous != instance.nome_loja_id:
+        instance._previous_loja_id = previous
+
+
+@receiver(
+    [post_save, post_delete], sender=Vendedor, dispatch_uid="vendedores_lookup_bump"
+)
+def _invalidate_vendedores_lookup(sender, instance, **kwargs):
+    lookup.bump_lojas(
+        [instance.nome_loja_id, getattr(instance, "_previous_loja_id", None)]
+    )
+
+
+@receiver(vendedores_bulk_created, dispatch_uid="vendedores_lookup_bulk_bump")
+def _invalidate_vendedores_lookup_bulk(sender, loja_ids, **kwargs):
+    lookup.bump_lojas(loja_ids)
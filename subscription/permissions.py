@@ -0,0 +1,36 @@
+from rest_framework.permissions import BasePermission
+
+from custom_auth.permissions import _extract_loja_id
+from subscription.entitlement import loja_entitlement, user_entitlement
+
+
+class HasActiveSubscription(BasePermission):
+    """
+    Bloqueia vendedores cuja loja (nome_loja) tem assinatura vencida e
+    requisições para lojas (?loja_id=, X-Loja-Id, URL) com assinatura
+    vencida. Decide pelo cache de subscription.entitlement, sem query por
+    requisição.
+    Anônimos passam (quem os barra é o IsAuthenticated), staff também, e
+    lojas sem nenhuma Subscription (fora da cobrança) não são barradas.
+    Vai nas views de negócio (BaseFrontPerm), não no padrão do DRF.
+    """
+
+    message = "Assinatura inativa ou vencida."
+
+    def has_permission(self, request, view) -> bool:
+        user = request.user
+        if not (user and user.is_authenticated) or user.is_staff:
+            return True
+
+        is_seller, active = user_entitlement(user.pk)
+        if is_seller and not active:
+            return False
+
+        try:
+            loja_id = _extract_loja_id(request, view)
+        except (TypeError, ValueError):
+            loja_id = None
+        if loja_id is not None:
+            has_subscription, active = loja_entitlement(loja_id)
+            return active or not has_subscription
+        return True
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Optional
+
+from django.db import transaction
+from django.db.models import F
+
+from subscription.billing import RENEWAL_DAYS, issue_bills, next_period
+from subscription.entitlement import invalidate_subscriptions
+from subscription.models import Subscription
+
+SWEEP_CHUNK_SIZE = 1000
+
+
+@dataclass
+class SweepResult:
+    renewed: int = 0
+    expired: int = 0
+    bills_created: int = 0
+    chunks: int = 0
+    finished: bool = True
+
+
+def due_subscriptions(today: date):
+    """Ativas com validade vencida — casa com o índice (is_active, valido_ate)."""
+    # is_active=True vira só `WHERE "is_active"`, que o SQLite não casa com
+    # a 1ª coluna do índice; `IN (true)` é uma igualdade e usa o índice.
+    return Subscription.objects.filter(is_active__in=[True], valido_ate__lt=today)
+
+
+def _sweep_chunk(today: date, chunk_size: int) -> Optional[SweepResult]:
+    with transaction.atomic():
+        # skip_locked: vários sweepers (ou admin editando) não se bloqueiam;
+        # no SQLite o select_for_update é ignorado
+        due = list(
+            due_subscriptions(today)
+            .select_for_update(skip_locked=True)
+            .order_by("valido_ate", "id")
+            .values_list("id", "recurrence", "valido_ate", "price")[:chunk_size]
+        )
+        if not due:
+            return None
+
+        renew = [(pk, valido_ate, price) for pk, rec, valido_ate, price in due if rec]
+        renew_ids = [pk for pk, *_ in renew]
+        expire_ids = [pk for pk, rec, *_ in due if not rec]
+        bills_created = 0
+
+        if renew_ids:
+            Subscription.objects.filter(id__in=renew_ids).update(
+                valido_ate=F("valido_ate") + timedelta(days=RENEWAL_DAYS)
+            )
+            # a rodada de faturamento pode já ter emitido a fatura do período
+            bills_created = issue_bills(
+                (pk, *next_period(valido_ate), price) for pk, valido_ate, price in renew
+            )
+        if expire_ids:
+            # mesmo efeito do Subscription.deactivate()
+            Subscription.objects.filter(id__in=expire_ids).update(
+                is_active=False, valido_ate=None
+            )
+        # UPDATE em lote não dispara signals
+        invalidate_subscriptions(renew_ids + expire_ids)
+
+    return SweepResult(
+        renewed=len(renew_ids),
+        expired=len(expire_ids),
+        bills_created=bills_created,
+        chunks=1,
+    )
+
+
+def sweep_subscriptions(
+    *,
+    today: Optional[date] = None,
+    chunk_size: int = SWEEP_CHUNK_SIZE,
+    max_seconds: Optional[float] = None,
+) -> SweepResult:
+    """
+    Vence ou renova as assinaturas ativas com `valido_ate` no passado.
+      - recurrence=True: +RENEWAL_DAYS na validade e a Bill pendente do
+        novo período (se ainda não emitida — subscription.billing);
+      - recurrence=False: desativada.
+    Trabalha em lotes de `chunk_size`, cada um numa transação curta com
+    poucos comandos SQL, e para ao esgotar `max_seconds` (o resto fica para a
+    próxima rodada). Uma assinatura com vários períodos atrasados é renovada
+    (e cobrada) uma vez por período.
+    """
+    today = today or date.today()
+    deadline = None if max_seconds is None else time.monotonic() + max_seconds
+    total = SweepResult()
+
+    while True:
+        if deadline is not None and time.monotonic() >= deadline:
+            total.finished = False
+            break
+        chunk = _sweep_chunk(today, chunk_size)
+        if chunk is None:
+            break
+        total.renewed += chunk.renewed
+        total.expired += chunk.expired
+        total.bills_created += chunk.bills_created
+        total.chunks += 1
+    return total
@@ -1,3 +1,322 @@
-from django.test import TestCase
+from datetime import date, timedelta
 
-# Create your tests here.
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from custom_auth.models import Loja, Vendedor
+from custom_auth.onboarding import onboard_vendedores
+from subscription.admin import SubscriptionAdmin
+from subscription.billing import (
+    RENEWAL_DAYS,
+    next_period,
+    run_billing,
+    transition_bills,
+)
+from subscription.entitlement import (
+    _timeout_for,
+    loja_has_active_subscription,
+    user_entitlement,
+)
+from subscription.models import Bills, Subscription
+from subscription.permissions import HasActiveSubscription
+from subscription.sweeper import sweep_subscriptions
+
+User = get_user_model()
+
+
+class SubscriptionFixtureMixin:
+    """Loja com um vendedor e uma assinatura ativa (+30 dias)."""
+
+    def setUp(self):
+        cache.clear()
+        self.owner = User.objects.create_user(
+            username="dono", email="dono@example.com", password="x"
+        )
+        self.loja = Loja.objects.create(nome="Centro", dono=self.owner)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.vendedor = Vendedor.objects.create(
+                nome="Ana", email="ana@example.com", nome_loja=self.loja
+            )
+            self.sub = Subscription.objects.create(
+                loja_responsavel=self.loja, price="49.90"
+            )
+            self.sub.user.add(self.vendedor)
+        self.seller = self.vendedor.user
+
+    def lapse(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.sub.deactivate()
+
+
+class EntitlementCacheTests(SubscriptionFixtureMixin, TestCase):
+    def test_entitlement_is_served_from_cache(self):
+        self.assertEqual(user_entitlement(self.seller.pk), (True, True))
+        self.assertTrue(loja_has_active_subscription(self.loja.pk))
+        with self.assertNumQueries(0):
+            self.assertEqual(user_entitlement(self.seller.pk), (True, True))
+            self.assertTrue(loja_has_active_subscription(self.loja.pk))
+
+    def test_save_invalidates_seller_and_loja(self):
+        user_entitlement(self.seller.pk)
+        loja_has_active_subscription(self.loja.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.sub.deactivate()
+        self.assertEqual(user_entitlement(self.seller.pk), (True, False))
+        self.assertFalse(loja_has_active_subscription(self.loja.pk))
+
+    def test_bulk_sweep_invalidates(self):
+        self.assertEqual(user_entitlement(self.seller.pk), (True, True))
+        # vencida por UPDATE direto: o cache ainda diz "ativa até +30"
+        Subscription.objects.filter(pk=self.sub.pk).update(
+            valido_ate=date.today() - timedelta(days=1)
+        )
+        self.assertEqual(user_entitlement(self.seller.pk), (True, True))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            result = sweep_subscriptions()
+        self.assertEqual(result.expired, 1)
+        self.assertEqual(user_entitlement(self.seller.pk), (True, False))
+        self.assertFalse(loja_has_active_subscription(self.loja.pk))
+
+    def test_seller_follows_the_loja_subscription(self):
+        # a assinatura da loja vale para o vendedor, esteja ele ou não na M2M
+        with self.captureOnCommitCallbacks(execute=True):
+            self.sub.user.remove(self.vendedor)
+        self.assertEqual(user_entitlement(self.seller.pk), (True, True))
+        self.lapse()
+        self.assertEqual(user_entitlement(self.seller.pk), (True, False))
+
+    def test_moving_seller_changes_entitlement(self):
+        self.lapse()
+        self.assertEqual(user_entitlement(self.seller.pk), (True, False))
+        other = Loja.objects.create(nome="Sem cobrança", dono=self.owner)
+        self.vendedor.nome_loja = other
+        with self.captureOnCommitCallbacks(execute=True):
+            self.vendedor.save()
+        self.assertEqual(user_entitlement(self.seller.pk), (True, True))
+
+    def test_delete_invalidates_loja(self):
+        self.lapse()
+        self.assertEqual(user_entitlement(self.seller.pk), (True, False))
+        with self.captureOnCommitCallbacks(execute=True):
+            Bills.objects.filter(sub=self.sub).delete()
+            self.sub.delete()
+        self.assertFalse(loja_has_active_subscription(self.loja.pk))
+        # sem assinatura nenhuma a loja sai da cobrança
+        self.assertEqual(user_entitlement(self.seller.pk), (True, True))
+
+    def test_cached_entry_expires_at_end_of_validity_day(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.sub.reset_valid_until(days=0)
+        self.assertEqual(user_entitlement(self.seller.pk), (True, True))
+        self.assertLessEqual(_timeout_for(date.today()), 24 * 3600)
+
+    def test_non_seller_is_not_gated(self):
+        self.assertEqual(user_entitlement(self.owner.pk), (False, False))
+
+
+class HasActiveSubscriptionTests(SubscriptionFixtureMixin, TestCase):
+    def allowed(self, user, path="/x/"):
+        request = Request(APIRequestFactory().get(path))
+        request.user = user
+        return HasActiveSubscription().has_permission(request, view=None)
+
+    def test_lapsed_seller_keeps_account_endpoints(self):
+        self.lapse()
+        self.seller.set_password("senha-antiga-123")
+        self.seller.save()
+        client = APIClient()
+        client.force_authenticate(self.seller)
+        self.assertEqual(client.get("/api/users/me/").status_code, 200)
+        response = client.post(
+            "/api/users/me/change_password/",
+            {"current_password": "senha-antiga-123", "new_password": "Nova-senha-987"},
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_lapsed_seller_is_blocked_on_business_views(self):
+        self.assertTrue(self.allowed(self.seller))
+        self.lapse()
+        self.assertFalse(self.allowed(self.seller))
+
+    def test_loja_without_billing_is_not_blocked(self):
+        other = Loja.objects.create(nome="Sem cobrança", dono=self.owner)
+        self.assertTrue(self.allowed(self.owner, f"/x/?loja_id={other.pk}"))
+
+    def test_seller_of_loja_without_billing_is_not_blocked(self):
+        other = Loja.objects.create(nome="Sem cobrança", dono=self.owner)
+        with self.captureOnCommitCallbacks(execute=True):
+            result = onboard_vendedores(other, [("Bia", "bia@example.com")])
+        ((vendedor, _),) = result.created
+        self.assertTrue(self.allowed(vendedor.user))
+        self.assertTrue(self.allowed(vendedor.user, f"/x/?loja_id={other.pk}"))
+
+    def test_lapsed_loja_is_blocked_for_non_sellers(self):
+        path = f"/x/?loja_id={self.loja.pk}"
+        self.assertTrue(self.allowed(self.owner, path))
+        self.lapse()
+        self.assertFalse(self.allowed(self.owner, path))
+        self.owner.is_staff = True
+        self.assertTrue(self.allowed(self.owner, path))
+
+
+class SubscriptionAdminActionTests(SubscriptionFixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.other_loja = Loja.objects.create(nome="Norte", dono=self.owner)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.other = Subscription.objects.create(
+                loja_responsavel=self.other_loja, price="19.90"
+            )
+            self.other.deactivate()
+        self.admin = SubscriptionAdmin(Subscription, admin.site)
+        self.admin.message_user = lambda request, message: None
+
+    def run_action(self, name, *subs):
+        queryset = Subscription.objects.filter(pk__in=[sub.pk for sub in subs])
+        with self.captureOnCommitCallbacks(execute=True):
+            getattr(self.admin, name)(RequestFactory().post("/"), queryset)
+
+    def test_activate_updates_selected_and_invalidates(self):
+        self.lapse()
+        self.assertFalse(loja_has_active_subscription(self.loja.pk))
+        self.run_action("ativar_assinaturas", self.sub)
+
+        self.sub.refresh_from_db()
+        self.assertTrue(self.sub.is_active)
+        self.assertEqual(
+            self.sub.valido_ate, date.today() + timedelta(days=RENEWAL_DAYS)
+        )
+        self.assertTrue(loja_has_active_subscription(self.loja.pk))
+        self.other.refresh_from_db()
+        self.assertFalse(self.other.is_active)
+
+    def test_deactivate_updates_selected_and_invalidates(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.other.activate()
+        self.assertTrue(loja_has_active_subscription(self.loja.pk))
+        self.run_action("desativar_assinaturas", self.sub)
+
+        self.sub.refresh_from_db()
+        self.assertEqual((self.sub.is_active, self.sub.valido_ate), (False, None))
+        self.assertFalse(loja_has_active_subscription(self.loja.pk))
+        self.assertEqual(user_entitlement(self.seller.pk), (True, False))
+        self.assertTrue(loja_has_active_subscription(self.other_loja.pk))
+
+    def test_renew_extends_dated_subscriptions_and_bills_next_period(self):
+        expired = date.today() - timedelta(days=5)
+        Subscription.objects.filter(pk=self.sub.pk).update(valido_ate=expired)
+        cache.clear()
+        self.assertFalse(loja_has_active_subscription(self.loja.pk))
+        other_bills = Bills.objects.filter(sub=self.other).count()
+        self.run_action("renovar_assinaturas", self.sub, self.other)
+
+        self.sub.refresh_from_db()
+        self.assertEqual(self.sub.valido_ate, expired + timedelta(days=RENEWAL_DAYS))
+        self.assertTrue(loja_has_active_subscription(self.loja.pk))
+        self.other.refresh_from_db()
+        self.assertIsNone(self.other.valido_ate)
+        self.assertEqual(Bills.objects.filter(sub=self.other).count(), other_bills)
+        start, end = next_period(expired)
+        bill = Bills.objects.get(sub=self.sub, period_start=start)
+        self.assertEqual((bill.period_end, bill.status), (end, Bills.Status.PENDING))
+
+
+class BillingTests(SubscriptionFixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        Subscription.objects.filter(pk=self.sub.pk).update(recurrence=True)
+
+    def due_window(self):
+        return self.sub.valido_ate, self.sub.valido_ate
+
+    def test_run_billing_issues_next_period_once(self):
+        result = run_billing(*self.due_window())
+        self.assertEqual((result.subscriptions, result.created), (1, 1))
+        start, end = next_period(self.sub.valido_ate)
+        bill = Bills.objects.get(sub=self.sub, period_start=start)
+        self.assertEqual(bill.period_end, end)
+        self.assertEqual(bill.status, Bills.Status.PENDING)
+
+        again = run_billing(*self.due_window())
+        self.assertEqual((again.created, again.skipped), (0, 1))
+        self.assertEqual(Bills.objects.filter(sub=self.sub).count(), 2)
+
+    def test_run_billing_dry_run_writes_nothing(self):
+        result = run_billing(*self.due_window(), dry_run=True)
+        self.assertEqual(result.subscriptions, 1)
+        self.assertEqual(str(result.amount), "49.90")
+        self.assertEqual(Bills.objects.filter(sub=self.sub).count(), 1)
+
+    def test_run_billing_skips_non_recurring(self):
+        Subscription.objects.filter(pk=self.sub.pk).update(recurrence=False)
+        self.assertEqual(run_billing(*self.due_window()).subscriptions, 0)
+
+    def test_transition_respects_allowed_statuses(self):
+        bill = Bills.objects.get(sub=self.sub)
+        self.assertEqual(transition_bills([bill.pk], Bills.Status.PAY), 1)
+        self.assertEqual(transition_bills([bill.pk], Bills.Status.REFUSE), 0)
+        bill.refresh_from_db()
+        self.assertEqual(bill.status, Bills.Status.PAY)
+
+    def test_latest_bill_decides_pay(self):
+        old = Bills.objects.get(sub=self.sub)
+        run_billing(*self.due_window())
+        latest = Bills.objects.exclude(pk=old.pk).get(sub=self.sub)
+
+        transition_bills([latest.pk], Bills.Status.PAY)
+        self.sub.refresh_from_db()
+        self.assertTrue(self.sub.pay)
+
+        # recusar a fatura antiga não desfaz o pagamento da atual
+        self.assertEqual(transition_bills([old.pk], Bills.Status.REFUSE), 1)
+        self.sub.refresh_from_db()
+        self.assertTrue(self.sub.pay)
+
+    def test_refusing_latest_bill_marks_unpaid(self):
+        Subscription.objects.filter(pk=self.sub.pk).update(pay=True)
+        run_billing(*self.due_window())
+        latest = Bills.objects.filter(sub=self.sub).latest("period_start")
+        transition_bills([latest.pk], Bills.Status.REFUSE)
+        self.sub.refresh_from_db()
+        self.assertFalse(self.sub.pay)
+
+
+class VendedoresLookupTests(SubscriptionFixtureMixin, TestCase):
+    def get(self, loja, **headers):
+        return APIClient().get("/api/vendedores/", {"loja": loja.pk}, **headers)
+
+    def test_etag_matches_exact_tags_only(self):
+        etag = self.get(self.loja)["ETag"]
+        weak = f"W/{etag}"
+        for header in (etag, f'"x", {etag}', weak, "*"):
+            response = self.get(self.loja, HTTP_IF_NONE_MATCH=header)
+            self.assertEqual(response.status_code, 304, header)
+        # uma tag que só contém a atual não é a atual
+        partial = etag[:-1] + 'x"'
+        for header in (etag[1:-1], partial, f'"x{etag[1:]}'):
+            response = self.get(self.loja, HTTP_IF_NONE_MATCH=header)
+            self.assertEqual(response.status_code, 200, header)
+
+    def test_moving_vendedor_invalidates_both_lojas_without_extra_select(self):
+        other = Loja.objects.create(nome="Norte", dono=self.owner)
+        self.assertEqual(len(self.get(self.loja).data["results"]), 1)
+        self.assertEqual(len(self.get(other).data["results"]), 0)
+
+        vendedor = Vendedor.objects.get(pk=self.vendedor.pk)
+        vendedor.nome_loja = other
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertNumQueries(1):
+                vendedor.save()
+        self.assertEqual(len(self.get(self.loja).data["results"]), 0)
+        self.assertEqual(len(self.get(other).data["results"]), 1)
+
+        # a loja carregada acompanha o save: voltar invalida a "Norte" de novo
+        vendedor.nome_loja = self.loja
+        with self.captureOnCommitCallbacks(execute=True):
+            vendedor.save()
+        self.assertEqual(len(self.get(other).data["results"]), 0)
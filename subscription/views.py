@@ -1,24 +1,72 @@
 from django.shortcuts import render
+from django.utils.cache import get_conditional_response, patch_cache_control
 from rest_framework.generics import GenericAPIView
+from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 
 from custom_auth.models import Vendedor
+from subscription import lookup
+
+
+class VendedoresPagination(PageNumberPagination):
+    page_size = 100
+    page_size_query_param = "page_size"
+    max_page_size = 500
 
 
 # Create your views here.
 class Vendedores(GenericAPIView):
+    """
+    Vendedores da loja (?loja=), paginados e com busca por nome (?search=).
+    As páginas ficam em cache (subscription.lookup) e saem com ETag: com
+    If-None-Match que casa com ele, a resposta é um 304 sem corpo.
+    """
+
     permission_classes = [
         AllowAny,
     ]
+    pagination_class = VendedoresPagination
 
     def get(self, request):
         loja_id = request.query_params.get("loja")
 
         if not loja_id:
             return Response({"detail": "Informe o parâmetro ?loja="}, status=400)
+        try:
+            loja_id = int(loja_id)
+        except ValueError:
+            return Response({"detail": "Parâmetro ?loja= inválido."}, status=400)
 
-        vendedores = Vendedor.objects.filter(nome_loja_id=loja_id).values("id", "nome")
-        data = list(vendedores)
+        search = request.query_params.get("search", "").strip()
+        # os links next/previous são absolutos: o host entra na chave
+        query = {
+            "host": request.get_host(),
+            "search": search,
+            "page": request.query_params.get(self.paginator.page_query_param, ""),
+            "page_size": request.query_params.get(
+                self.paginator.page_size_query_param, ""
+            ),
+        }
+        key, cached = lookup.get_page(loja_id, query)
+        if cached is None:
+            # ordem do índice (nome_loja, nome); id desempata homônimos
+            vendedores = Vendedor.objects.filter(nome_loja_id=loja_id).order_by(
+                "nome", "id"
+            )
+            if search:
+                vendedores = vendedores.filter(nome__icontains=search)
+            page = self.paginate_queryset(vendedores.values("id", "nome"))
+            data = self.get_paginated_response(page).data
+            etag = lookup.set_page(key, data)
+        else:
+            etag, data = cached
 
-        return Response(data)
+        # If-None-Match com a lista de tags, "*" e W/ (comparação fraca)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = Response(data)
+        response["ETag"] = etag
+        # o navegador guarda, mas revalida sempre (If-None-Match -> 304)
+        patch_cache_control(response, private=True, no_cache=True)
+        return response